@@ -1,11 +1,87 @@
 import flet as ft
-from Zeli_Dialog import ZeliDialog2
-import sqlite3
+from Zeli_Dialog import ZeliDialog2, batched
 import os
 import shutil
+import threading
+import weakref
 from pathlib import Path
 from time import sleep
+from typing import Optional
 from db_manager import get_db_connection
+from data_access import get_class_overview, get_class_roster
+from session import session_for
+from sync_events import subscribe, is_pending
+
+
+class GradingViews:
+    """
+    Vues déjà construites de la saisie des notes d'un enseignant :
+    la grille des classes et la liste de chaque classe ouverte
+    « Retour » et les allers-retours entre classes les réaffichent sans
+    requête ; une vue n'est reconstruite qu'après une écriture de notes
+    qui la concerne (invalidate_grades), une écriture locale dans Notes ou
+    Students (sync_manager.notify_local_change) ou une sync de ces tables
+    """
+    
+    def __init__(self, session, dialog):
+        self.session = session
+        self.dialog = dialog
+        self.main_dialog = None
+        self.refresh_grid = None
+        self.grid_stale = False
+        self.class_views = {}       # classe → dialog de la liste des élèves
+        self.generation = 0         # incrémenté à chaque invalidation
+        self._lock = threading.Lock()
+        self._unsubscribe = subscribe(["Students", "Notes"], self._on_sync, local_writes=True)
+    
+    def invalidate(self, classe: Optional[str] = None):
+        """La grille et la liste de la classe (toutes sans classe) sont périmées"""
+        with self._lock:
+            self.generation += 1
+            self.grid_stale = True
+            if classe is None:
+                self.class_views.clear()
+            else:
+                self.class_views.pop(classe, None)
+    
+    def store(self, classe: str, view, generation: int):
+        """Garde la liste construite, sauf si une écriture est arrivée pendant sa construction"""
+        with self._lock:
+            if generation == self.generation:
+                self.class_views[classe] = view
+    
+    def reopen(self):
+        """Réaffiche la grille (rechargée seulement si elle est périmée)"""
+        with self.dialog.overlay.render.batch("saisie des notes"):
+            if self.grid_stale:
+                self.refresh_grid()
+            self.dialog.overlay.show(self.main_dialog)
+    
+    def _on_sync(self, table):
+        self.invalidate()
+        # Grille affichée : rechargée tout de suite
+        if self.main_dialog is not None and self.main_dialog.open:
+            self.refresh_grid()
+    
+    def close(self):
+        """Fin de session : plus de rechargement sur les événements de sync"""
+        self._unsubscribe()
+
+
+# Parcours de saisie construit, par page
+_grading_views = weakref.WeakKeyDictionary()
+
+
+def invalidate_grades(classe: Optional[str] = None, matiere: Optional[str] = None):
+    """
+    À appeler après une écriture de notes (commit fait) : la liste de la
+    classe et la grille des classes seront reconstruites au prochain affichage
+    Sans classe : toutes les vues ; sans matière : tous les enseignants
+    """
+    for views in list(_grading_views.values()):
+        if matiere is None or views.session.matiere == matiere:
+            views.invalidate(classe)
+
 
 def Saisie_Notes(page, Donner):
     """Saisie des notes par le professeur pour sa matière uniquement"""
@@ -22,103 +98,51 @@ def Saisie_Notes(page, Donner):
         )
         return
     
-    def Return(Ident):
-        """Récupère une information depuis la table User"""
-        con = None
-        try:
-            con = get_db_connection()
-            cur = con.cursor()
-            cur.execute(
-                f"SELECT {Ident} FROM User WHERE identifiant = ? AND titre = ? AND passwords = ?",
-                (Donner.get("ident"), Donner.get("role"), Donner.get("pass"))
-            )
-            donne = cur.fetchall()
-            cur.close()
-            return donne
-        except Exception as e:
-            Dialog.error_toast(f"Erreur de récupération: {str(e)}")
-            return []
-        finally:
-            if con:
-                con.close()
+    # Établissement et matière lus une fois à la connexion
+    session = session_for(Donner)
+    
+    # Parcours déjà construit pour cette session : réaffiché tel quel
+    views = _grading_views.get(page)
+    if views is not None and views.session is session and views.main_dialog is not None:
+        views.reopen()
+        return
+    if views is not None:
+        views.close()
+    views = _grading_views[page] = GradingViews(session, Dialog)
     
     def get_teacher_subject():
-        """Récupère la matière du professeur"""
-        con = None
-        try:
-            con = get_db_connection()
-            cur = con.cursor()
-            cur.execute("SELECT matiere FROM Teacher WHERE ident = ?", (Donner.get("ident"),))
-            result = cur.fetchone()
-            return result[0] if result else None
-        except:
-            return None
-        finally:
-            if con:
-                con.close()
+        """Matière du professeur (contexte de session)"""
+        return session.matiere
     
     def load_classes_with_students():
-        """Charge les classes qui ont des élèves"""
-        Etat = Return("etablissement")
-        if not Etat:
+        """Classes qui ont des élèves : [(classe, effectif, notes saisies)] en une requête"""
+        etablissement = session.etablissement
+        matiere = get_teacher_subject()
+        if not etablissement or not matiere:
             return []
         
-        con = None
         try:
-            con = get_db_connection()
-            cur = con.cursor()
-            cur.execute("""
-                SELECT DISTINCT classe, COUNT(*) as effectif
-                FROM Students 
-                WHERE etablissement = ?
-                GROUP BY classe
-                ORDER BY classe
-            """, (Etat[0][0],))
-            return cur.fetchall()
+            return get_class_overview(etablissement, matiere)
         except:
             return []
-        finally:
-            if con:
-                con.close()
     
-    def load_students_by_class(classe_nom):
-        """Charge tous les élèves d'une classe"""
-        Etat = Return("etablissement")
-        if not Etat:
-            return []
+    def load_students_by_class(classe_nom, matiere):
+        """
+        Charge les élèves d'une classe et leurs notes dans la matière (une requête)
+        Retourne (élèves, {matricule: ligne Notes})
+        """
+        etablissement = session.etablissement
+        if not etablissement:
+            return [], {}
         
-        con = None
         try:
-            con = get_db_connection()
-            cur = con.cursor()
-            cur.execute("""
-                SELECT * FROM Students 
-                WHERE classe = ? AND etablissement = ?
-                ORDER BY nom, prenom
-            """, (classe_nom, Etat[0][0]))
-            return cur.fetchall()
+            return get_class_roster(etablissement, classe_nom, matiere)
         except:
-            return []
-        finally:
-            if con:
-                con.close()
+            return [], {}
     
     def get_matiere_coefficient(matiere_nom):
-        """Récupère le coefficient d'une matière"""
-        Etat = Return("etablissement")
-        if not Etat:
-            return "2"
-        
-        con = None
-        try:
-            con = get_db_connection()
-            cur = con.cursor()
-            return "2"
-        except:
-            return "2"
-        finally:
-            if con:
-                con.close()
+        """Récupère le coefficient d'une matière (pas encore stocké localement)"""
+        return "2"
     
     def check_note_exists(matricule, matiere, classe):
         """Vérifie si une note existe déjà"""
@@ -127,23 +151,6 @@ def Saisie_Notes(page, Donner):
             con = get_db_connection()
             cur = con.cursor()
             
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS Notes (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    classe TEXT NOT NULL,
-                    matricule TEXT NOT NULL,
-                    matiere TEXT NOT NULL,
-                    coefficient TEXT NOT NULL,
-                    note_interrogation TEXT NOT NULL,
-                    note_devoir TEXT NOT NULL,
-                    note_composition TEXT NOT NULL,
-                    moyenne TEXT,
-                    date_saisie TEXT,
-                    UNIQUE(matricule, matiere, classe)
-                )
-            """)
-            con.commit()
-            
             cur.execute("""
                 SELECT * FROM Notes 
                 WHERE matricule = ? AND matiere = ? AND classe = ?
@@ -175,17 +182,25 @@ def Saisie_Notes(page, Donner):
         """Affiche la liste des élèves d'une classe"""
         nonlocal student_list_dialog  # ✅ Utiliser nonlocal pour modifier la variable
         
-        students = load_students_by_class(classe_nom)
+        # Liste déjà construite et toujours à jour : réaffichée sans requête
+        cached = views.class_views.get(classe_nom)
+        if cached is not None:
+            student_list_dialog = Dialog.overlay.show(cached)
+            return
+        
         matiere = get_teacher_subject()
         
         if not matiere:
             Dialog.error_toast("Impossible de récupérer votre matière")
             return
         
+        generation = views.generation
+        students, notes = load_students_by_class(classe_nom, matiere)
+        
         # Créer les cartes élèves
         student_cards = []
         for student in students:
-            student_cards.append(create_student_card(student, classe_nom, matiere))
+            student_cards.append(create_student_card(student, classe_nom, matiere, notes.get(student[2])))
         
         if not student_cards:
             student_cards = [
@@ -203,7 +218,7 @@ def Saisie_Notes(page, Donner):
         
         # Statistiques
         total_students = len(students)
-        notes_saisies = sum(1 for s in students if check_note_exists(s[2], matiere, classe_nom))
+        notes_saisies = len(notes)
         reste = total_students - notes_saisies
         
         student_list_dialog = Dialog.custom_dialog(
@@ -274,18 +289,20 @@ def Saisie_Notes(page, Donner):
                 )
             ]
         )
+        views.store(classe_nom, student_list_dialog, generation)
     
+    @batched(page)
     def back_to_class_selection():
-        """Retourne à la sélection de classe"""
+        """Retourne à la sélection de classe (la grille est restée ouverte dessous)"""
         if student_list_dialog:
             Dialog.close_dialog(student_list_dialog)
-        # Recharger la page principale
-        Saisie_Notes(page, Donner)
+        if views.grid_stale:
+            refresh_classes()
+        if not main_dialog.open:
+            Dialog.overlay.show(main_dialog)
     
-    def create_student_card(student, classe_nom, matiere):
-        """Crée une carte pour un élève"""
-        
-        note_exists = check_note_exists(student[2], matiere, classe_nom)
+    def create_student_card(student, classe_nom, matiere, note_exists):
+        """Crée une carte pour un élève (note_exists : sa ligne Notes ou None)"""
         
         status_icon = ft.Icons.CHECK_CIRCLE if note_exists else ft.Icons.ADD_CIRCLE
         status_color = ft.Colors.GREEN if note_exists else ft.Colors.ORANGE
@@ -361,28 +378,7 @@ def Saisie_Notes(page, Donner):
     
     def create_class_card(classe):
         """Crée une carte pour une classe"""
-        classe_nom = classe[0]
-        effectif = classe[1]
-        
-        matiere = get_teacher_subject()
-        
-        notes_count = 0
-        if matiere:
-            con = None
-            try:
-                con = get_db_connection()
-                cur = con.cursor()
-                cur.execute("""
-                    SELECT COUNT(*) FROM Notes 
-                    WHERE classe = ? AND matiere = ?
-                """, (classe_nom, matiere))
-                result = cur.fetchone()
-                notes_count = result[0] if result else 0
-            except:
-                pass
-            finally:
-                if con:
-                    con.close()
+        classe_nom, effectif, notes_count = classe
         
         pourcentage = int((notes_count / effectif * 100)) if effectif > 0 else 0
         
@@ -451,27 +447,51 @@ def Saisie_Notes(page, Donner):
         )
         return
     
-    classes = load_classes_with_students()
+    def build_class_cards():
+        """Cartes des classes (ou message si aucune classe)"""
+        class_cards = [create_class_card(classe) for classe in load_classes_with_students()]
+        
+        if not class_cards:
+            # Élèves encore en cours de téléchargement après la connexion
+            loading = is_pending("Students")
+            class_cards = [
+                ft.Container(
+                    content=ft.Column([
+                        ft.Icon(ft.Icons.SYNC if loading else ft.Icons.CLASS_, size=60, color=ft.Colors.GREY_400),
+                        ft.Text(
+                            "Synchronisation en cours..." if loading else "Aucune classe disponible",
+                            size=16,
+                            color=ft.Colors.GREY_600
+                        ),
+                    ],
+                    horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+                    spacing=10
+                    ),
+                    padding=30
+                )
+            ]
+        return class_cards
     
-    class_cards = [create_class_card(classe) for classe in classes]
+    class_grid = ft.GridView(
+        controls=build_class_cards(),
+        runs_count=2,
+        max_extent=240,
+        child_aspect_ratio=1.0,
+        spacing=10,
+        run_spacing=10,
+    )
     
-    if not class_cards:
-        class_cards = [
-            ft.Container(
-                content=ft.Column([
-                    ft.Icon(ft.Icons.CLASS_, size=60, color=ft.Colors.GREY_400),
-                    ft.Text(
-                        "Aucune classe disponible",
-                        size=16,
-                        color=ft.Colors.GREY_600
-                    ),
-                ],
-                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                spacing=10
-                ),
-                padding=30
-            )
-        ]
+    def refresh_classes():
+        """Recharge les cartes des classes (grille périmée ou sync)"""
+        views.grid_stale = False
+        class_grid.controls = build_class_cards()
+        # Seule la grille change (et seulement si elle est affichée)
+        if class_grid.page:
+            class_grid.update()
+    
+    def close_main(e):
+        # Le parcours reste en mémoire pour la prochaine ouverture
+        Dialog.close_dialog(main_dialog)
     
     main_dialog = Dialog.custom_dialog(
         title=f"📝 Saisie des notes - {teacher_subject}",
@@ -513,14 +533,7 @@ def Saisie_Notes(page, Donner):
             ft.Container(height=5),
             
             ft.Container(
-                content=ft.GridView(
-                    controls=class_cards,
-                    runs_count=2,
-                    max_extent=240,
-                    child_aspect_ratio=1.0,
-                    spacing=10,
-                    run_spacing=10,
-                ),
+                content=class_grid,
                 height=350,
             ),
         ],
@@ -533,7 +546,9 @@ def Saisie_Notes(page, Donner):
             ft.TextButton(
                 "Fermer",
                 icon=ft.Icons.CLOSE,
-                on_click=lambda e: Dialog.close_dialog(main_dialog)
+                on_click=close_main
             )
         ]
     )
+    views.main_dialog = main_dialog
+    views.refresh_grid = refresh_classes
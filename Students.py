@@ -1,65 +1,181 @@
 import flet as ft
-from Zeli_Dialog import ZeliDialog2
+from Zeli_Dialog import ZeliDialog2, RenderBatcher, CardRegistry, batched
 import sqlite3
 import os
 import shutil
+import threading
 from pathlib import Path
 from time import sleep
 from db_manager import get_db_connection
+from sync_events import subscribe, is_pending
+from session import session_for
+from data_access import FIRST_PAGE, get_student_page, count_students, get_student_classes, search_students
+from config import STUDENT_SEARCH_DEBOUNCE
+from student_import import import_students
 
-def Gestion_Eleve(page, Donner , view_only=False):
-    Dialog = ZeliDialog2(page)
+# Hauteur d'une carte élève (200) + marges (2 x 10) : permet au ListView
+# de ne construire que les cartes visibles
+STUDENT_CARD_EXTENT = 220
+ALL_CLASSES = ""
 
-    def Return(Ident):
-        """Récupère une information depuis la table User"""
-        con = None
+
+def student_list_view(etablissement, create_card, build_empty, on_total=None):
+    """
+    Liste d'élèves paginée par curseur : la page suivante est chargée quand
+    le défilement approche du bas, le filtre de classe est appliqué en SQL
+    La recherche (nom, prénom, matricule, classe) part après une courte pause
+    de frappe et remplace la liste par les meilleurs résultats
+    on_total(total) est appelé quand le filtre, la recherche ou le nombre
+    d'élèves change
+    Retourne (barre de recherche/filtre, ListView, reload, registre des
+    cartes par matricule, nombre d'élèves)
+    """
+    state = {"classe": None, "query": "", "cursor": FIRST_PAGE, "timer": None, "total": 0}
+    lock = threading.RLock()
+    
+    list_view = ft.ListView(
+        height=280,
+        width=350,
+        item_extent=STUDENT_CARD_EXTENT,
+        on_scroll_interval=100,
+    )
+    search_field = ft.TextField(
+        hint_text="Rechercher un élève",
+        prefix_icon=ft.Icons.SEARCH,
+        dense=True,
+        expand=True,
+    )
+    class_filter = ft.Dropdown(
+        label="Classe",
+        width=140,
+        dense=True,
+        value=ALL_CLASSES,
+        options=[ft.dropdown.Option(key=ALL_CLASSES, text="Toutes les classes")],
+    )
+    
+    def sort_key(student):
+        # Ordre de get_student_page (le rowid départage les ex aequo)
+        key = (student[0] or "", student[1] or "")
+        return key if state["classe"] else (student[5] or "",) + key
+    
+    def position(students, student):
+        """Place d'un nouvel élève parmi les cartes chargées (None : il viendra avec la pagination)"""
+        if state["query"]:
+            return None
+        key = sort_key(student)
+        index = next((i for i, s in enumerate(students) if sort_key(s) > key), len(students))
+        if index == len(students) and state["cursor"] is not None:
+            return None
+        return index
+    
+    def count_changed(delta):
+        state["total"] += delta
+        if on_total:
+            on_total(state["total"])
+    
+    cards = CardRegistry(
+        list_view,
+        create_card,
+        key=lambda student: student[2],
+        build_empty=build_empty,
+        accepts=lambda student: not state["classe"] or student[5] == state["classe"],
+        position=position,
+        on_count=count_changed,
+    )
+    
+    def append_page():
+        """Ajoute la page suivante (verrou pris) ; retourne le nombre de cartes ajoutées"""
         try:
-            con = get_db_connection()
-            cur = con.cursor()
-            cur.execute(
-                f"SELECT {Ident} FROM User WHERE identifiant = ? AND titre = ? AND passwords = ?",
-                (Donner.get("ident"), Donner.get("role"), Donner.get("pass"))
-            )
-            donne = cur.fetchall()
-            cur.close()
-            return donne
+            students, state["cursor"] = get_student_page(etablissement, state["classe"], state["cursor"])
         except Exception as e:
-            Dialog.error_toast(f"Erreur de récupération: {str(e)}")
-            return []
+            print(f"❌ Erreur chargement élèves: {e}")
+            students, state["cursor"] = [], None
+        return cards.extend(students)
+    
+    def load_next_page():
+        """Page suivante au défilement (ignorée si un chargement est en cours)"""
+        if state["cursor"] is None or not lock.acquire(blocking=False):
+            return 0
+        try:
+            return append_page()
         finally:
-            if con:
-                con.close()
+            lock.release()
+    
+    def reload():
+        """Repart de la première page (filtre et recherche courants) ; retourne le nombre d'élèves"""
+        with lock:
+            state["total"] = load()
+            return state["total"]
     
-    def load_student():
-        """Charge la liste de tous les eleves de l'établissement"""
-        Etat = Return("etablissement")
+    def load():
+        cards.clear()
+        if not etablissement:
+            state["cursor"] = None
+            return cards.fill([])
         
-        if not Etat:
-            return []
+        if state["query"]:
+            # Résultats de recherche : une seule page, les plus pertinents
+            state["cursor"] = None
+            try:
+                students = search_students(etablissement, state["query"], state["classe"])
+            except Exception as e:
+                print(f"❌ Erreur recherche élèves: {e}")
+                students = []
+            return cards.fill(students)
+        
+        state["cursor"] = FIRST_PAGE
+        if not append_page():
+            return cards.fill([])
         
-        #Vue que les etudiants ne sont pas des user on les met dans une Autre base de donné
-        con = None
         try:
-            con = get_db_connection() #Connection de la base de donné
-            #===== AU cas ou la base de donner n'est pas encore creer creons la ====
-            cur = con.cursor()
-            cur.execute(f"CREATE TABLE IF NOT EXISTS Students(nom TEXT NOT NULL , prenom TEXT NOT NULL , matricule TEXT NOT NULL , date_naissance TEXT NOT NULL , sexe TEXT NOT NULL , classe TEXT NOT NULL,etablissement TEXT NOT NULL)")
-            con.commit()
-            cur.close()
-            #=======================================================
-            
-            #======================== Selection des etudiant ========#==
-            cur = con.cursor()
-            cur.execute("SELECT * FROM Students WHERE etablissement = ?",(Etat[0][0],))
-            donne = cur.fetchall()
-            #======================================
-            return donne
+            class_filter.options = [ft.dropdown.Option(key=ALL_CLASSES, text="Toutes les classes")] + [
+                ft.dropdown.Option(classe) for classe in get_student_classes(etablissement)
+            ]
+            return count_students(etablissement, state["classe"])
         except Exception as e:
-            Dialog.error_toast(f"Erreur de chargement: {str(e)}")
-            return []
-        finally:
-            if con:
-                con.close()
+            print(f"❌ Erreur chargement classes: {e}")
+            return len(cards)
+    
+    def on_scroll(e):
+        # Deux cartes avant le bas : charger la suite
+        if e.max_scroll_extent and e.pixels >= e.max_scroll_extent - 2 * STUDENT_CARD_EXTENT:
+            if load_next_page():
+                list_view.update()
+    
+    def apply_filters():
+        state["query"] = (search_field.value or "").strip()
+        state["classe"] = class_filter.value or None
+        total = reload()
+        # Liste pas encore (ou plus) affichée : rien à envoyer
+        if list_view.page is None:
+            return
+        # Liste, filtre et titre partent en un seul envoi
+        with RenderBatcher.for_page(list_view.page).batch("filtre des élèves"):
+            if on_total:
+                on_total(total)
+            list_view.update()
+            class_filter.update()
+    
+    def on_search(e):
+        # Une requête par pause de frappe, pas une par caractère
+        if state["timer"]:
+            state["timer"].cancel()
+        state["timer"] = threading.Timer(STUDENT_SEARCH_DEBOUNCE, apply_filters)
+        state["timer"].daemon = True
+        state["timer"].start()
+    
+    list_view.on_scroll = on_scroll
+    search_field.on_change = on_search
+    class_filter.on_change = lambda e: apply_filters()
+    
+    header = ft.Row([search_field, class_filter], width=350, spacing=8)
+    return header, list_view, reload, cards, reload()
+
+def Gestion_Eleve(page, Donner , view_only=False):
+    Dialog = ZeliDialog2(page)
+
+    # Établissement lu une fois à la connexion
+    session = session_for(Donner)
     
     def add_student():
         """Ajoute un nouvel enseignant"""
@@ -96,10 +212,10 @@ def Gestion_Eleve(page, Donner , view_only=False):
             ]
         )
         
-        Etat = Return("etablissement")
+        etablissement = session.etablissement
         Menu = []
         
-        if not Etat:
+        if not etablissement:
             return 
         
         con = None
@@ -107,15 +223,8 @@ def Gestion_Eleve(page, Donner , view_only=False):
             con = get_db_connection()
             cur = con.cursor()
             
-            #==== Create la table si elle n'existe pas =====
-            cur.execute("CREATE TABLE IF NOT EXISTS Class(nom TEXT NOT NULL , etablissement TEXT NOT NULL)")
-            con.commit()
-            #===============================================
-            cur.close()
-            
             #====== Verifier si la classe que l'on veux ajouter existe deja
-            cur = con.cursor()
-            cur.execute("SELECT * FROM Class WHERE etablissement = ?",(Etat[0][0],))
+            cur.execute("SELECT * FROM Class WHERE etablissement = ?",(etablissement,))
 
             for elmt in cur.fetchall():
                 Menu.append(
@@ -143,7 +252,7 @@ def Gestion_Eleve(page, Donner , view_only=False):
             """Efface tous les messages d'erreur"""
             for field in [nom_field, prenom_field, matricule_field, borndate_field, sexe_dropdown , classe_dropdown]:
                 field.error_text = None
-            page.update()
+                field.update()
         
         def validate_fields():
             """Valide tous les champs"""
@@ -156,9 +265,10 @@ def Gestion_Eleve(page, Donner , view_only=False):
                     is_valid = False
                 else:
                     field.error_text = None
-            page.update()
+                field.update()
             return is_valid
         
+        @batched(page)
         def save_student(e):
             """Enregistre l'enseignant"""
             clear_errors()
@@ -168,13 +278,11 @@ def Gestion_Eleve(page, Donner , view_only=False):
             
             con = None
             try:
-                # Récupération établissement
-                etablissement_data = Return("etablissement")
-                if not etablissement_data or not etablissement_data[0]:
+                # Établissement de la session
+                etablissement = session.etablissement
+                if not etablissement:
                     Dialog.error_toast("Impossible de récupérer l'établissement")
                     return
-                
-                etablissement = etablissement_data[0][0]
 
                 con = get_db_connection()
                 cur = con.cursor()
@@ -187,7 +295,8 @@ def Gestion_Eleve(page, Donner , view_only=False):
                 if cur.fetchone():
                     nom_field.error_text = "L'élève existe déjà"
                     prenom_field.error_text = "L'élève existe déjà"
-                    page.update()
+                    nom_field.update()
+                    prenom_field.update()
                     return
                 
                 # Insertion dans Student
@@ -204,18 +313,18 @@ def Gestion_Eleve(page, Donner , view_only=False):
                     etablissement
                 ))
                 con.commit()
+                cur.execute("SELECT * FROM Students WHERE rowid = ?", (cur.lastrowid,))
+                student = cur.fetchone()
             
-                # NOUVEAU : Sync vers Supabase
+                # NOUVEAU : Sync vers Supabase (en arrière-plan, ligne journalisée)
                 try:
                     from sync_manager import sync_manager
-                    sync_manager.sync_table_to_supabase(
-                        "Students",
-                        filter_col="etablissement",
-                        filter_val=etablissement
-                    )
+                    sync_manager.notify_local_change("Students")
                 except Exception as e:
                     Dialog.error_toast(f"⚠️ Erreur sync: {e}")
-                    
+                
+                # Seule la carte du nouvel élève est ajoutée à la liste
+                cards.place(student, new=True)
                 Dialog.alert_dialog(title = "Notification",message="Eleve ajouté avec success !")
                 
             except Exception as ex:
@@ -311,6 +420,7 @@ def Gestion_Eleve(page, Donner , view_only=False):
         etabl_field = ft.TextField(label="classe", value=student[6], read_only=True, disabled=True)
         
         
+        @batched(page)
         def save_changes(e, dialog):
             con = None
             try:
@@ -331,21 +441,23 @@ def Gestion_Eleve(page, Donner , view_only=False):
                     etabl_field.value,
                 ))
                 con.commit()
+                cur.execute(
+                    "SELECT * FROM Students WHERE matricule = ? AND etablissement = ?",
+                    (matricule_field.value, etabl_field.value)
+                )
+                updated = cur.fetchone()
                 
-                # NOUVEAU : Sync vers Supabase
+                # NOUVEAU : Sync vers Supabase (en arrière-plan, ligne journalisée)
                 try:
                     from sync_manager import sync_manager
-                    sync_manager.sync_table_to_supabase(
-                        "Students",
-                        filter_col="etablissement",
-                        filter_val=etabl_field.value
-                    )
+                    sync_manager.notify_local_change("Students")
                 except Exception as e:
                     Dialog.error_toast(f"⚠️ Erreur sync: {e}")
                     
                 Dialog.info_toast("Modifications enregistrées !")
                 Dialog.close_dialog(dialog)
-                refresh_display()
+                if updated:
+                    cards.place(updated)
                 
             except sqlite3.Error as e:
                 Dialog.error_toast(f"Erreur: {str(e)}")
@@ -429,6 +541,7 @@ def Gestion_Eleve(page, Donner , view_only=False):
             ]
         )
     
+    @batched(page)
     def execute_delete(student, dialog):
         """Exécute la suppression"""
         con = None
@@ -441,20 +554,16 @@ def Gestion_Eleve(page, Donner , view_only=False):
             
             con.commit()
             
-            # NOUVEAU : Sync vers Supabase
+            # NOUVEAU : Sync vers Supabase (en arrière-plan, ligne journalisée)
             try:
                 from sync_manager import sync_manager
-                sync_manager.sync_table_to_supabase(
-                    "Students",
-                    filter_col="etablissement",
-                    filter_val=student[6]
-                )
+                sync_manager.notify_local_change("Students")
             except Exception as e:
                 Dialog.error_toast(f"⚠️ Erreur sync: {e}")
                 
             Dialog.info_toast("Eleve supprimé !")
             Dialog.close_dialog(dialog)
-            refresh_display()
+            cards.remove(student[2])
             
         except sqlite3.Error as e:
             Dialog.error_toast(f"Erreur de suppression: {str(e)}")
@@ -462,11 +571,81 @@ def Gestion_Eleve(page, Donner , view_only=False):
             if con:
                 con.close()
     
+    def import_file():
+        """Import d'une liste d'élèves (CSV ou XLSX) en une transaction"""
+        etablissement = session.etablissement
+        if not etablissement:
+            Dialog.error_toast("Impossible de récupérer l'établissement")
+            return
+        
+        @batched(page)
+        def on_result(e):
+            page.overlay.remove(picker)
+            page.update()
+            if not e.files:
+                return
+            
+            try:
+                report = import_students(e.files[0].path, etablissement)
+            except Exception as ex:
+                Dialog.error_toast(f"Erreur d'import: {str(ex)}")
+                return
+            show_import_report(report)
+        
+        picker = ft.FilePicker(on_result=on_result)
+        page.overlay.append(picker)
+        page.update()
+        picker.pick_files(
+            dialog_title="Importer des élèves",
+            allowed_extensions=["csv", "xlsx"],
+        )
+    
+    def show_import_report(report):
+        """Bilan de l'import : lignes rejetées avec leur motif"""
+        errors = ft.ListView(
+            controls=[
+                ft.Text(f"Ligne {line} : {message}", size=13, color=ft.Colors.RED_400)
+                for line, message in report.errors
+            ],
+            height=220,
+            spacing=4,
+        )
+        
+        def close_report(e):
+            Dialog.close_dialog(report_dialog)
+            if report.imported:
+                refresh_display()
+        
+        report_dialog = Dialog.custom_dialog(
+            title="📥 Import des élèves",
+            content=ft.Column([
+                ft.Text(report.summary(), size=15, weight=ft.FontWeight.BOLD),
+                ft.Text(
+                    "Colonnes attendues : nom, prénom, matricule, date de naissance, sexe, classe",
+                    size=12,
+                    color=ft.Colors.GREY_600
+                ),
+                errors if report.errors else ft.Text("✅ Aucune ligne rejetée", size=14),
+            ],
+            width=450,
+            height=320,
+            spacing=10,
+            ),
+            actions=[
+                ft.TextButton(
+                    "Fermer",
+                    icon=ft.Icons.CLOSE,
+                    on_click=close_report
+                )
+            ]
+        )
+    
+    @batched(page)
     def refresh_display():
-        """Rafraîchit l'affichage de la liste"""
-        Dialog.close_dialog(main_dialog)
-        # Réouvre le dialog avec les données à jour
-        Gestion_Eleve(page, Donner, Dialog)
+        """Recharge la liste sur place (import : trop de lignes pour les placer une à une)"""
+        show_total(reload_students())
+        list_header.update()
+        student_list.update()
     
     def create_student_card(student):
         """Crée une carte pour un enseignant"""
@@ -516,13 +695,9 @@ def Gestion_Eleve(page, Donner , view_only=False):
             #bgcolor=ft.Colors.ON_SURFACE_VARIANT,
         )
     
-    # Chargement des enseignants
-    students = load_student()
-    student_cards = [create_student_card(student) for student in students]
-    
-    # Si aucun enseignant
-    if not student_cards:
-        student_cards = [
+    def build_empty():
+        """Message quand l'établissement n'a aucun élève"""
+        return [
             ft.Container(
                 content=ft.Column([
                     ft.Icon(ft.Icons.SCHOOL, size=60, color=ft.Colors.GREY_400),
@@ -544,22 +719,21 @@ def Gestion_Eleve(page, Donner , view_only=False):
             )
         ]
     
+    def show_total(total):
+        main_dialog.title.value = f"👨‍🏫 Liste des élèves ({total})"
+        main_dialog.title.update()
+    
+    # Chargement des élèves : une page, la suite au défilement
+    list_header, student_list, reload_students, cards, total = student_list_view(
+        session.etablissement, create_student_card, build_empty, on_total=show_total
+    )
+    
     # Dialog principal
     main_dialog = Dialog.custom_dialog(
-        title=f"👨‍🏫 Liste des élèves ({len(students)})",
+        title=f"👨‍🏫 Liste des élèves ({total})",
         content=ft.Column([
-            ft.Row(
-                [
-                    ft.Column(
-                        controls=student_cards,
-                        scroll=ft.ScrollMode.AUTO,
-                        height=330,
-                        width = 350,
-                        horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                    )
-                ],
-                scroll=ft.ScrollMode.AUTO,
-            ),
+            list_header,
+            student_list,
             ft.Container(expand=True),
             ft.Divider(),
             ft.ElevatedButton(
@@ -569,10 +743,15 @@ def Gestion_Eleve(page, Donner , view_only=False):
                 ], spacing=8),
                 bgcolor=ft.Colors.GREEN_700,
                 on_click=lambda e: add_student(),
+            ),
+            ft.OutlinedButton(
+                "Importer une liste (CSV/XLSX)",
+                icon=ft.Icons.UPLOAD_FILE,
+                on_click=lambda e: import_file(),
             )
         ],
         width=450,
-        height=450,
+        height=500,
         spacing=10,
         horizontal_alignment=ft.CrossAxisAlignment.CENTER,
         ),
@@ -589,61 +768,12 @@ def Gestion_Eleve(page, Donner , view_only=False):
 def Gestion_Eleve_Liste(page, Donner):
     Dialog = ZeliDialog2(page)
 
-    def Return(Ident):
-        """Récupère une information depuis la table User"""
-        con = None
-        try:
-            con = get_db_connection()
-            cur = con.cursor()
-            cur.execute(
-                f"SELECT {Ident} FROM User WHERE identifiant = ? AND titre = ? AND passwords = ?",
-                (Donner.get("ident"), Donner.get("role"), Donner.get("pass"))
-            )
-            donne = cur.fetchall()
-            cur.close()
-            return donne
-        except Exception as e:
-            Dialog.error_toast(f"Erreur de récupération: {str(e)}")
-            return []
-        finally:
-            if con:
-                con.close()
-    
-    def load_student():
-        """Charge la liste de tous les eleves de l'établissement"""
-        Etat = Return("etablissement")
-        
-        if not Etat:
-            return []
-        
-        #Vue que les etudiants ne sont pas des user on les met dans une Autre base de donné
-        con = None
-        try:
-            con = get_db_connection() #Connection de la base de donné
-            #===== AU cas ou la base de donner n'est pas encore creer creons la ====
-            cur = con.cursor()
-            cur.execute(f"CREATE TABLE IF NOT EXISTS Students(nom TEXT NOT NULL , prenom TEXT NOT NULL , matricule TEXT NOT NULL , date_naissance TEXT NOT NULL , sexe TEXT NOT NULL , classe TEXT NOT NULL,etablissement TEXT NOT NULL)")
-            con.commit()
-            cur.close()
-            #=======================================================
-            
-            #======================== Selection des etudiant ========#==
-            cur = con.cursor()
-            cur.execute("SELECT * FROM Students WHERE etablissement = ?",(Etat[0][0],))
-            donne = cur.fetchall()
-            #======================================
-            return donne
-        except Exception as e:
-            Dialog.error_toast(f"Erreur de chargement: {str(e)}")
-            return []
-        finally:
-            if con:
-                con.close()
+    # Établissement lu une fois à la connexion
+    session = session_for(Donner)
     
     def Close(d):
-        d.open = False
-        page.update()
-        Gestion_Eleve_Liste(page, Donner)
+        # La liste reste ouverte dessous, avec ses cartes déjà patchées
+        Dialog.close_dialog(d)
         
     def create_info_row(label, value):
         """Crée une ligne d'information"""
@@ -717,23 +847,21 @@ def Gestion_Eleve_Liste(page, Donner):
             #bgcolor=ft.Colors.ON_SURFACE_VARIANT,
         )
         
-    # Chargement des enseignants
-    students = load_student()
-    student_cards = [create_student_card(student) for student in students]
-    
-    # Si aucun enseignant
-    if not student_cards:
-        student_cards = [
+    def build_empty():
+        """Message quand la liste est vide (ou encore en cours de téléchargement)"""
+        # Liste encore en cours de téléchargement après la connexion
+        loading = is_pending("Students")
+        return [
             ft.Container(
                 content=ft.Column([
-                    ft.Icon(ft.Icons.SCHOOL, size=60, color=ft.Colors.GREY_400),
+                    ft.Icon(ft.Icons.SYNC if loading else ft.Icons.SCHOOL, size=60, color=ft.Colors.GREY_400),
                     ft.Text(
-                        "Aucun Eleve trouvé",
+                        "Synchronisation en cours..." if loading else "Aucun Eleve trouvé",
                         size=16,
                         color=ft.Colors.GREY_600
                     ),
                     ft.Text(
-                        "Cliquez sur 'Ajouter' pour commencer",
+                        "La liste se mettra à jour automatiquement" if loading else "Cliquez sur 'Ajouter' pour commencer",
                         size=12,
                         color=ft.Colors.GREY_500
                     ),
@@ -745,22 +873,30 @@ def Gestion_Eleve_Liste(page, Donner):
             )
         ]
     
+    def show_total(total):
+        main_dialog.title.value = f"👨‍🏫 Liste des élèves ({total})"
+        main_dialog.title.update()
+    
+    # Chargement des élèves : une page, la suite au défilement
+    list_header, student_list, reload_students, _, total = student_list_view(
+        session.etablissement, create_student_card, build_empty, on_total=show_total
+    )
+    
+    def refresh_students(table):
+        """Recharge la liste quand la sync apporte de nouveaux élèves"""
+        main_dialog.title.value = f"👨‍🏫 Liste des élèves ({reload_students()})"
+        page.update()
+    
+    def close_main(e):
+        unsubscribe()
+        Dialog.close_dialog(main_dialog)
+    
     # Dialog principal
     main_dialog = Dialog.custom_dialog(
-        title=f"👨‍🏫 Liste des élèves ({len(students)})",
+        title=f"👨‍🏫 Liste des élèves ({total})",
         content=ft.Column([
-            ft.Row(
-                [
-                    ft.Column(
-                        controls=student_cards,
-                        scroll=ft.ScrollMode.AUTO,
-                        height=330,
-                        width = 350,
-                        horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                    )
-                ],
-                scroll=ft.ScrollMode.AUTO,
-            ),
+            list_header,
+            student_list,
             ft.Container(expand=True),
         ],
         width=450,
@@ -772,8 +908,9 @@ def Gestion_Eleve_Liste(page, Donner):
             ft.TextButton(
                 "Fermer",
                 icon=ft.Icons.CLOSE,
-                on_click=lambda e: Dialog.close_dialog(main_dialog)
+                on_click=close_main
             )
         ]
     )
+    unsubscribe = subscribe(["Students"], refresh_students)
     
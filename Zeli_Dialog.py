@@ -1,28 +1,513 @@
 import flet as ft
+import functools
+import heapq
+import json
+import math
 import time
+import threading
+import weakref
+from contextlib import contextmanager
 from typing import Callable, Optional, List
 
+from config import UI_RENDER_STATS
+
+
+class RenderBatcher:
+    """
+    Regroupement des page.update() d'une interaction (un par page)
+    Pendant batch(), les page.update() et control.update() du thread sont
+    retenus puis envoyés en un seul aller-retour à la sortie : un
+    page.update() complet s'il y en a eu un, sinon un update des seuls
+    contrôles visés. Hors lot, rien ne change
+    Avec UI_RENDER_STATS, chaque interaction affiche les mises à jour
+    demandées, envoyées et les octets partis vers le client
+    """
+    
+    # False : chaque mise à jour part tout de suite (comparaison, diagnostic)
+    enabled = True
+    
+    _batchers = weakref.WeakKeyDictionary()
+    
+    @classmethod
+    def for_page(cls, page):
+        """Batcher de la page (installé au premier appel)"""
+        batcher = cls._batchers.get(page)
+        if batcher is None:
+            batcher = cls._batchers[page] = cls(page)
+        return batcher
+    
+    def __init__(self, page):
+        self.page = page
+        self._send = page.update
+        self._local = threading.local()
+        self.stats = {"interactions": 0, "requested": 0, "sent": 0, "bytes": 0}
+        self._counting = False
+        # Toutes les mises à jour passent par le batcher, control.update() compris
+        page.update = self.update
+        if UI_RENDER_STATS:
+            self.count_bytes()
+    
+    def update(self, *controls):
+        """Remplace page.update : retenu pendant un lot, envoyé sinon"""
+        self.stats["requested"] += 1
+        pending = getattr(self._local, "pending", None)
+        if pending is None or not self.enabled:
+            self._flush(not controls, list(controls))
+            return
+        if not controls:
+            pending["page"] = True
+        else:
+            pending["controls"].extend(c for c in controls if not any(c is p for p in pending["controls"]))
+    
+    def after_update(self, callback: Callable):
+        """Exécute callback après l'envoi du lot en cours (tout de suite hors lot)"""
+        pending = getattr(self._local, "pending", None)
+        if pending is None or not self.enabled:
+            callback()
+        else:
+            pending["after"].append(callback)
+    
+    @contextmanager
+    def batch(self, name: str = "interaction"):
+        """Regroupe les mises à jour du bloc (imbrication possible)"""
+        depth = getattr(self._local, "depth", 0)
+        if depth == 0:
+            self._local.pending = {"page": False, "controls": [], "after": []}
+            before = dict(self.stats)
+        self._local.depth = depth + 1
+        try:
+            yield self
+        finally:
+            self._local.depth = depth
+            if depth == 0:
+                pending, self._local.pending = self._local.pending, None
+                self._flush(pending["page"], pending["controls"])
+                for callback in pending["after"]:
+                    callback()
+                self._report(name, before)
+    
+    def _flush(self, whole_page: bool, controls: list):
+        # Un contrôle retiré entre-temps ne peut pas être visé seul
+        if not whole_page and any(c.page is None for c in controls):
+            whole_page = True
+        if not whole_page and not controls:
+            return
+        self.stats["sent"] += 1
+        if whole_page:
+            self._send()
+        else:
+            self._send(*controls)
+    
+    def _report(self, name: str, before: dict):
+        self.stats["interactions"] += 1
+        if UI_RENDER_STATS:
+            delta = {key: self.stats[key] - before[key] for key in ("requested", "sent", "bytes")}
+            print(f"🖼️ {name}: {delta['requested']} mise(s) à jour → "
+                  f"{delta['sent']} envoi(s), {delta['bytes']} octets")
+    
+    def count_bytes(self):
+        """Mesure les octets envoyés au client (instrumentation seulement)"""
+        if self._counting:
+            return
+        self._counting = True
+        
+        try:
+            from flet.core.protocol import CommandEncoder
+        except ImportError:
+            # flet < 0.25
+            from flet_core.protocol import CommandEncoder
+        
+        conn = self.page.connection
+        send_commands = conn.send_commands
+        
+        def counting(session_id, commands):
+            self.stats["bytes"] += len(json.dumps(commands, cls=CommandEncoder, separators=(",", ":")))
+            return send_commands(session_id, commands)
+        
+        conn.send_commands = counting
+
+
+def batched(page, name: Optional[str] = None):
+    """
+    Décorateur de gestionnaire d'événement : un seul envoi au client
+    pour tout le gestionnaire (voir RenderBatcher)
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(*args, **kwargs):
+            with RenderBatcher.for_page(page).batch(name or handler.__name__):
+                return handler(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class UiScheduler:
+    """
+    Planificateur unique des effets d'interface temporisés (toasts)
+    Un seul thread pour toute l'application : les échéances sont rangées
+    par tick de TICK secondes (roue de minuterie) ; tout ce qui tombe dans
+    le même tick est appliqué ensemble sur la boucle d'événements de Flet,
+    avec un seul page.update() par page
+    """
+    
+    TICK = 0.1
+    
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._slots = {}        # tick → [(page, action)]
+        self._ticks = []        # tas des ticks qui ont des actions
+        self._thread = None
+        self.stats = {"scheduled": 0, "batches": 0, "updates": 0}
+    
+    def call_later(self, page, delay: float, action: Optional[Callable] = None):
+        """
+        Exécute action() dans delay secondes, puis met la page à jour
+        Sans action : demande seulement un page.update() au prochain tick
+        """
+        tick = math.ceil((time.monotonic() + delay) / self.TICK)
+        with self._cond:
+            if tick not in self._slots:
+                self._slots[tick] = []
+                heapq.heappush(self._ticks, tick)
+            self._slots[tick].append((page, action))
+            self.stats["scheduled"] += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="ui-scheduler", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+    
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._ticks:
+                    self._cond.wait()
+                wait = self._ticks[0] * self.TICK - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                # Tous les ticks échus (rattrape un retard éventuel)
+                now = math.floor(time.monotonic() / self.TICK)
+                due = []
+                while self._ticks and self._ticks[0] <= now:
+                    due.extend(self._slots.pop(heapq.heappop(self._ticks)))
+            
+            by_page = {}
+            for page, action in due:
+                by_page.setdefault(id(page), (page, []))[1].append(action)
+            for page, actions in by_page.values():
+                self._dispatch(page, actions)
+    
+    def _dispatch(self, page, actions):
+        """Applique les actions du tick puis un seul page.update(), sur la boucle de Flet"""
+        def apply():
+            try:
+                with RenderBatcher.for_page(page).batch("effets temporisés"):
+                    for action in actions:
+                        if action is None:
+                            continue
+                        try:
+                            action()
+                        except Exception as e:
+                            print(f"⚠️ Effet d'interface: {e}")
+                    page.update()
+                self.stats["updates"] += 1
+            except Exception as e:
+                print(f"⚠️ Mise à jour de la page: {e}")
+        
+        self.stats["batches"] += 1
+        loop = getattr(page, "loop", None)
+        if loop is not None and loop.is_running():
+            loop.call_soon_threadsafe(apply)
+        else:
+            apply()
+
+
+ui_scheduler = UiScheduler()
+
+
+class OverlayManager:
+    """
+    Cycle de vie de page.overlay (un gestionnaire par page, partagé par
+    tous les ZeliDialog2 de la page)
+    Chaque page.update() parcourt tout l'overlay : les dialogs fermés en
+    sont retirés, les dialogs de chargement et d'alerte sont réutilisés,
+    et l'overlay est plafonné à MAX_OVERLAY contrôles (un dialog ouvert
+    n'est jamais retiré)
+    """
+    
+    MAX_OVERLAY = 20
+    
+    _managers = weakref.WeakKeyDictionary()
+    
+    @classmethod
+    def for_page(cls, page):
+        """Gestionnaire de la page (créé au premier appel)"""
+        manager = cls._managers.get(page)
+        if manager is None:
+            manager = cls._managers[page] = cls(page)
+        return manager
+    
+    def __init__(self, page):
+        self.page = page
+        self.render = RenderBatcher.for_page(page)
+        self.dialogs = []       # dialogs affichés, du plus ancien au plus récent
+        self._closing = []      # fermés, retirés après l'envoi du lot en cours
+        self.pool = {}          # type → dialog réutilisable ("loading", "alert")
+        self.toast_container = None
+        self.toasts = {}        # (message, couleur, position) → toast affiché
+        self.stats = {"shown": 0, "reused": 0, "removed": 0, "evicted": 0}
+    
+    def show(self, dialog):
+        """Ajoute le dialog à l'overlay (s'il n'y est pas) et l'ouvre"""
+        self.prune()
+        if dialog not in self.page.overlay:
+            self.page.overlay.append(dialog)
+        if dialog in self.dialogs:
+            self.dialogs.remove(dialog)
+        self.dialogs.append(dialog)
+        dialog.open = True
+        self.stats["shown"] += 1
+        self.page.update()
+        return dialog
+    
+    def close(self, dialog):
+        """
+        Ferme le dialog puis le retire de l'overlay
+        Le retrait part avec le page.update() suivant : la fermeture
+        elle-même a déjà été envoyée (fin du lot en cours), l'animation
+        n'est pas coupée. Seul le dialog est envoyé : un page.update()
+        reparcourrait tout l'overlay, cartes de l'écran du dessous comprises
+        """
+        dialog.open = False
+        if dialog.page:
+            dialog.update()
+        else:
+            self.page.update()
+        if not self._is_pooled(dialog):
+            self._closing.append(dialog)
+            self.render.after_update(lambda: self._remove_closed(dialog))
+    
+    def pooled(self, kind: str):
+        """Dialog réutilisable de ce type s'il est libre (sinon None)"""
+        dialog = self.pool.get(kind)
+        if dialog is not None and not dialog.open:
+            self.stats["reused"] += 1
+            return dialog
+        return None
+    
+    def keep(self, kind: str, dialog):
+        """Garde le dialog pour les prochains appels de ce type (s'il n'y en a pas déjà un)"""
+        self.pool.setdefault(kind, dialog)
+    
+    def prune(self):
+        """
+        Retire les dialogs fermés autrement que par close() (dismiss,
+        open = False direct), puis plafonne l'overlay en retirant les
+        dialogs réutilisables libres. Les dialogs ouverts restent : au-delà
+        de MAX_OVERLAY, un avertissement est affiché
+        """
+        for dialog in list(self.dialogs):
+            # Les dialogs fermés dans le lot en cours partent après son envoi
+            if not dialog.open and not self._is_pooled(dialog) and dialog not in self._closing:
+                self._remove(dialog)
+        
+        # Place pour le dialog qui va être ajouté
+        excess = len(self.page.overlay) + 1 - self.MAX_OVERLAY
+        for kind, dialog in list(self.pool.items()):
+            if excess <= 0:
+                break
+            if not dialog.open and dialog in self.page.overlay:
+                del self.pool[kind]
+                self._remove(dialog)
+                self.stats["evicted"] += 1
+                excess -= 1
+        
+        if excess > 0:
+            opened = sum(1 for dialog in self.dialogs if dialog.open)
+            print(f"⚠️ Overlay au-delà de {self.MAX_OVERLAY} contrôles : "
+                  f"{opened} dialogs ouverts")
+    
+    def _is_pooled(self, dialog) -> bool:
+        return any(d is dialog for d in self.pool.values())
+    
+    def _remove_closed(self, dialog):
+        # Rouvert dans le même lot : on le garde
+        if dialog.open:
+            if dialog in self._closing:
+                self._closing.remove(dialog)
+        else:
+            self._remove(dialog)
+    
+    def _remove(self, dialog):
+        if dialog in self._closing:
+            self._closing.remove(dialog)
+        if dialog in self.dialogs:
+            self.dialogs.remove(dialog)
+        if dialog in self.page.overlay:
+            self.page.overlay.remove(dialog)
+            self.stats["removed"] += 1
+
+
+class CardRegistry:
+    """
+    Cartes d'une liste indexées par la clé de leur ligne (un registre par écran)
+    Après un ajout, une modification ou une suppression, seule la carte de
+    la ligne est créée, remplacée ou retirée : l'écran n'est plus reconstruit
+    ni rechargé. Chaque carte est posée dans un emplacement fixe : une
+    modification ou une suppression (emplacement masqué, retiré au
+    prochain remplissage) ne renvoie que cet emplacement, un ajout renvoie
+    le conteneur
+    accepts(row) : la ligne a sa place dans la liste (filtre courant)
+    position(rows, row) : index d'une nouvelle ligne parmi les lignes
+    affichées, None si elle tombe hors de la partie chargée
+    on_count(delta) : le nombre de lignes de la liste a changé
+    """
+
+    def __init__(self, container, create_card: Callable, key: Callable,
+                 build_empty: Optional[Callable] = None, accepts: Optional[Callable] = None,
+                 position: Optional[Callable] = None, on_count: Optional[Callable] = None):
+        self.container = container      # contrôle à .controls (Column, ListView)
+        self.create_card = create_card
+        self.key = key
+        self.build_empty = build_empty
+        self.accepts = accepts or (lambda row: True)
+        self.position = position or (lambda rows, row: len(rows))
+        self.on_count = on_count
+        self.entries = {}               # clé → (ligne, emplacement de la carte)
+        self.stats = {"patched": 0, "inserted": 0, "removed": 0}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def rows(self) -> list:
+        """Lignes affichées, dans l'ordre de la liste"""
+        by_slot = {id(slot): row for row, slot in self.entries.values()}
+        return [by_slot[id(c)] for c in self.container.controls if id(c) in by_slot]
+
+    def keys_where(self, predicate: Callable) -> list:
+        """Clés des lignes affichées qui vérifient predicate(row)"""
+        return [key for key, (row, _) in self.entries.items() if predicate(row)]
+
+    def card(self, row):
+        """Crée la carte de la ligne dans son emplacement et l'enregistre"""
+        slot = ft.Container(content=self.create_card(row))
+        self.entries[self.key(row)] = (row, slot)
+        return slot
+
+    def clear(self):
+        """Vide la liste (sans envoi)"""
+        self.entries.clear()
+        self.container.controls = []
+
+    def fill(self, rows) -> int:
+        """Remplace toute la liste (chargement, rechargement), sans envoi"""
+        self.clear()
+        self.container.controls = [self.card(row) for row in rows] or self._empty()
+        return len(rows)
+
+    def extend(self, rows) -> int:
+        """Ajoute des lignes en fin de liste (page suivante), sans envoi"""
+        if rows and not self.entries:
+            self.container.controls = []
+        self.container.controls.extend(self.card(row) for row in rows)
+        return len(rows)
+
+    def place(self, row, new: bool = False):
+        """
+        La ligne vient d'être écrite : sa carte est remplacée sur place,
+        insérée à sa position ou retirée si elle ne passe plus le filtre
+        new : ligne ajoutée en base (comptée même hors de la partie chargée)
+        """
+        key = self.key(row)
+        shown = key in self.entries
+        keep = self.accepts(row)
+        if shown and keep:
+            # Même emplacement, nouvelle carte
+            slot = self.entries[key][1]
+            slot.content = self.create_card(row)
+            self.entries[key] = (row, slot)
+            self.stats["patched"] += 1
+            self._changed(0, [slot])
+        elif shown:
+            self._changed(-1, [self._drop(key)])
+        elif keep:
+            rows = self.rows()
+            index = self.position(rows, row)
+            if index is not None:
+                if not self.entries:
+                    self.container.controls = []
+                # Les emplacements masqués ne comptent pas dans la position
+                at = (self._index(self.entries[self.key(rows[index])][1])
+                      if index < len(rows) else len(self.container.controls))
+                self.container.controls.insert(at, self.card(row))
+                self.stats["inserted"] += 1
+                self._changed(1, [self.container])
+            elif new:
+                # Hors de la partie chargée : seul le compte change
+                self._changed(1, [])
+
+    def remove(self, *keys):
+        """Les lignes ont été supprimées : leurs cartes sont retirées"""
+        slots = [self._drop(key) for key in keys if key in self.entries]
+        self._changed(-len(slots), slots)
+
+    def _index(self, slot) -> int:
+        return next(i for i, c in enumerate(self.container.controls) if c is slot)
+
+    def _drop(self, key):
+        """Masque l'emplacement de la carte (retiré au prochain remplissage)"""
+        _, slot = self.entries.pop(key)
+        slot.visible = False
+        slot.content = None
+        self.stats["removed"] += 1
+        return slot
+
+    def _empty(self) -> list:
+        return self.build_empty() if self.build_empty else []
+
+    def _changed(self, delta: int, targets: list):
+        """Envoie les seuls contrôles touchés (s'ils sont affichés)"""
+        if not self.entries:
+            # Liste vide : le message remplace les emplacements masqués
+            self.container.controls = self._empty()
+            targets = [self.container]
+        if delta and self.on_count:
+            self.on_count(delta)
+        for control in targets:
+            if control.page:
+                control.update()
+
+
 class ZeliDialog2:
     """
     Système complet de dialogs et notifications pour Flet
     Équivalent de MDDialog, Toast, Snackbar de KivyMD
     """
     
+    # Toasts empilés en bas de l'écran au plus
+    MAX_TOASTS = 5
+    
     def __init__(self, page):
         self.page = page
+        self.overlay = OverlayManager.for_page(page)
         self.active_toasts = []
         self.toast_container = None
         self._init_toast_container()
     
     def _init_toast_container(self):
-        """Initialise le conteneur pour les toasts"""
-        self.toast_container = ft.Column(
-            controls=[],
-            spacing=10,
-            right=20,
-            bottom=20,
-            alignment=ft.MainAxisAlignment.END,
-        )
+        """Initialise le conteneur pour les toasts (un seul par page)"""
+        if self.overlay.toast_container is None:
+            self.overlay.toast_container = ft.Column(
+                controls=[],
+                spacing=10,
+                right=20,
+                bottom=20,
+                alignment=ft.MainAxisAlignment.END,
+            )
+        self.toast_container = self.overlay.toast_container
         if self.toast_container not in self.page.overlay:
             self.page.overlay.append(self.toast_container)
     
@@ -47,6 +532,17 @@ class ZeliDialog2:
             icon: Icône optionnelle
             position: Position du toast
         """
+        key = (message, bgcolor, position)
+        live = self.overlay.toasts.get(key)
+        if live:
+            # Même message déjà affiché : compteur et délai prolongés,
+            # pas de nouveau toast (rafales d'erreurs pendant une sync)
+            live["count"] += 1
+            live["expires"] = time.monotonic() + duration
+            live["text"].value = f"{message} (×{live['count']})"
+            ui_scheduler.call_later(self.page, 0)
+            return
+        
         # Créer le contenu du toast
         content_widgets = []
         
@@ -55,9 +551,8 @@ class ZeliDialog2:
                 ft.Icon(icon, size=20, color=color)
             )
         
-        content_widgets.append(
-            ft.Text(message, color=color, size=14, weight=ft.FontWeight.W_500)
-        )
+        text = ft.Text(message, color=color, size=14, weight=ft.FontWeight.W_500)
+        content_widgets.append(text)
         
         toast = ft.Container(
             content=ft.Row(
@@ -80,38 +575,56 @@ class ZeliDialog2:
         
         # Positionner selon la position demandée
         if position == "bottom":
-            if self.toast_container not in self.page.overlay:
-                self.page.overlay.append(self.toast_container)
-            self.toast_container.controls.append(toast)
+            host = self.toast_container.controls
         elif position == "top":
             toast.top = 20
             toast.right = 20
-            self.page.overlay.append(toast)
+            host = self.page.overlay
         else:  # center
             toast.top = self.page.height / 2 - 50
             toast.left = self.page.width / 2 - 150
-            self.page.overlay.append(toast)
+            host = self.page.overlay
         
-        self.page.update()
+        entry = {"control": toast, "text": text, "count": 1, "expires": time.monotonic() + duration}
+        self.overlay.toasts[key] = entry
         
-        # Animation d'entrée
-        toast.opacity = 1
-        self.page.update()
+        def appear():
+            if position == "bottom":
+                if self.toast_container not in self.page.overlay:
+                    self.page.overlay.append(self.toast_container)
+                # Les plus anciens toasts temporisés cèdent la place
+                timed = [e["control"] for e in self.overlay.toasts.values() if e["control"] in host]
+                while len(host) >= self.MAX_TOASTS and timed:
+                    self._drop_toast(timed.pop(0))
+            host.append(toast)
         
-        # Fermeture automatique
-        def close_toast():
-            time.sleep(duration)
-            toast.opacity = 0
-            self.page.update()
-            time.sleep(0.3)
-            if toast in self.toast_container.controls:
-                self.toast_container.controls.remove(toast)
-            elif toast in self.page.overlay:
-                self.page.overlay.remove(toast)
-            self.page.update()
+        # Ajout, animation d'entrée et fermeture : regroupés par tick
+        # avec les autres toasts de la page, jamais de thread par toast
+        ui_scheduler.call_later(self.page, 0, appear)
+        ui_scheduler.call_later(self.page, ui_scheduler.TICK, lambda: setattr(toast, "opacity", 1))
+        ui_scheduler.call_later(self.page, duration, lambda: self._expire_toast(key, entry))
+    
+    def _expire_toast(self, key, entry):
+        """Échéance d'un toast : repoussée si un doublon l'a prolongé, sinon fondu puis retrait"""
+        remaining = entry["expires"] - time.monotonic()
+        if remaining > ui_scheduler.TICK:
+            ui_scheduler.call_later(self.page, remaining, lambda: self._expire_toast(key, entry))
+            return
         
-        import threading
-        threading.Thread(target=close_toast, daemon=True).start()
+        if self.overlay.toasts.get(key) is entry:
+            del self.overlay.toasts[key]
+        entry["control"].opacity = 0
+        ui_scheduler.call_later(self.page, 0.3, lambda: self._drop_toast(entry["control"]))
+    
+    def _drop_toast(self, toast):
+        """Retire un toast de son conteneur"""
+        for key, entry in list(self.overlay.toasts.items()):
+            if entry["control"] is toast:
+                del self.overlay.toasts[key]
+        if toast in self.toast_container.controls:
+            self.toast_container.controls.remove(toast)
+        elif toast in self.page.overlay:
+            self.page.overlay.remove(toast)
     
     def success_toast(self, message: str, duration: int = 3):
         """Toast de succès (vert)"""
@@ -148,7 +661,60 @@ class ZeliDialog2:
             bgcolor="#2196F3",
             icon=ft.Icons.INFO,
         )
-    
+
+    def progress_toast(self, message: str, bgcolor: str = "#323232", color: str = "#FFFFFF"):
+        """
+        Toast persistant avec barre de progression (non modal)
+        L'interface reste utilisable ; fermer avec close_progress_toast
+
+        Args:
+            message: Texte à afficher
+            bgcolor: Couleur de fond
+            color: Couleur du texte
+        """
+        text = ft.Text(message, color=color, size=14, weight=ft.FontWeight.W_500)
+        bar = ft.ProgressBar(value=None, width=260, color="#2196F3", bgcolor="#FFFFFF30")
+
+        toast = ft.Container(
+            content=ft.Column([
+                ft.Row([
+                    ft.Icon(ft.Icons.SYNC, size=20, color=color),
+                    text,
+                ], spacing=10),
+                bar,
+            ], spacing=8, tight=True),
+            bgcolor=bgcolor,
+            padding=ft.padding.symmetric(horizontal=20, vertical=12),
+            border_radius=8,
+            shadow=ft.BoxShadow(
+                spread_radius=0,
+                blur_radius=10,
+                color="#00000040",
+                offset=ft.Offset(0, 2),
+            ),
+            data={"text": text, "bar": bar},
+        )
+
+        if self.toast_container not in self.page.overlay:
+            self.page.overlay.append(self.toast_container)
+        self.toast_container.controls.append(toast)
+        self.page.update()
+
+        return toast
+
+    def update_progress_toast(self, toast, value: Optional[float] = None, message: Optional[str] = None):
+        """Met à jour un toast de progression (value entre 0 et 1, None = indéterminé)"""
+        toast.data["bar"].value = value
+        if message is not None:
+            toast.data["text"].value = message
+        self.page.update()
+
+    def close_progress_toast(self, toast):
+        """Retire un toast de progression"""
+        if toast in self.toast_container.controls:
+            self.toast_container.controls.remove(toast)
+        self.page.update()
+
     # ==================== SNACKBAR ====================
     def show_snackbar(
         self,
@@ -224,11 +790,7 @@ class ZeliDialog2:
             shape=ft.RoundedRectangleBorder(radius=10),
         )
         
-        self.page.overlay.append(dialog)
-        dialog.open = True
-        self.page.update()
-        
-        return dialog
+        return self.overlay.show(dialog)
     
     # ==================== DIALOG DE CONFIRMATION ====================
     def confirm_dialog(
@@ -272,18 +834,14 @@ class ZeliDialog2:
             actions_alignment=ft.MainAxisAlignment.END,
         )
         
-        self.page.overlay.append(dialog)
-        dialog.open = True
-        self.page.update()
-        
-        return dialog
+        return self.overlay.show(dialog)
     
     def _close_and_callback(self, dialog, callback):
-        """Ferme le dialog et exécute le callback"""
-        dialog.open = False
-        self.page.update()
-        if callback:
-            callback()
+        """Ferme le dialog et exécute le callback (un seul envoi pour les deux)"""
+        with self.overlay.render.batch("fermeture du dialog"):
+            self.overlay.close(dialog)
+            if callback:
+                callback()
     
     # ==================== DIALOG D'ALERTE ====================
     def alert_dialog(
@@ -314,29 +872,32 @@ class ZeliDialog2:
         
         icon, color = icon_map.get(type, (ft.Icons.INFO, ft.Colors.BLUE))
         
-        dialog = ft.AlertDialog(
-            modal=True,
-            title=ft.Row([
-                ft.Icon(icon, color=color, size=28),
-                ft.Text(title, weight=ft.FontWeight.BOLD, size=18),
-            ], spacing=10),
-            content=ft.Text(message, size=14),
-            actions=[
-                ft.ElevatedButton(
-                    ok_text,
-                    bgcolor=color,
-                    color=ft.Colors.WHITE,
-                    on_click=lambda e: self._close_and_callback(dialog, on_ok),
-                ),
-            ],
-            actions_alignment=ft.MainAxisAlignment.END,
-        )
+        # Coquille réutilisée si l'alerte précédente est fermée
+        dialog = self.overlay.pooled("alert")
+        if dialog is None:
+            dialog = ft.AlertDialog(
+                modal=True,
+                title=ft.Row([
+                    ft.Icon(size=28),
+                    ft.Text(weight=ft.FontWeight.BOLD, size=18),
+                ], spacing=10),
+                content=ft.Text(size=14),
+                actions=[
+                    ft.ElevatedButton(color=ft.Colors.WHITE),
+                ],
+                actions_alignment=ft.MainAxisAlignment.END,
+            )
+            self.overlay.keep("alert", dialog)
         
-        self.page.overlay.append(dialog)
-        dialog.open = True
-        self.page.update()
+        title_icon, title_text = dialog.title.controls
+        title_icon.name, title_icon.color = icon, color
+        title_text.value = title
+        dialog.content.value = message
+        ok_button = dialog.actions[0]
+        ok_button.text, ok_button.bgcolor = ok_text, color
+        ok_button.on_click = lambda e: self._close_and_callback(dialog, on_ok)
         
-        return dialog
+        return self.overlay.show(dialog)
     
     # ==================== DIALOG DE SAISIE ====================
     def input_dialog(
@@ -375,10 +936,10 @@ class ZeliDialog2:
         
         def submit():
             value = input_field.value
-            dialog.open = False
-            self.page.update()
-            if on_submit:
-                on_submit(value)
+            with self.overlay.render.batch("saisie"):
+                self.overlay.close(dialog)
+                if on_submit:
+                    on_submit(value)
         
         dialog = ft.AlertDialog(
             modal=True,
@@ -396,11 +957,7 @@ class ZeliDialog2:
             actions_alignment=ft.MainAxisAlignment.END,
         )
         
-        self.page.overlay.append(dialog)
-        dialog.open = True
-        self.page.update()
-        
-        return dialog
+        return self.overlay.show(dialog)
     
     # ==================== LOADING DIALOG ====================
     def loading_dialog(
@@ -416,29 +973,31 @@ class ZeliDialog2:
             title: Titre
             message: Message
         """
-        dialog = ft.AlertDialog(
-            modal=True,
-            title=ft.Text(title, weight=ft.FontWeight.BOLD),
-            content=ft.Column([
-                ft.ProgressRing(),
-                ft.Text(message, text_align=ft.TextAlign.CENTER),
-            ], 
-             height=height,
-            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-            spacing=15,
-            ),
-        )
+        # Coquille réutilisée si le chargement précédent est terminé
+        dialog = self.overlay.pooled("loading")
+        if dialog is None:
+            dialog = ft.AlertDialog(
+                modal=True,
+                title=ft.Text(weight=ft.FontWeight.BOLD),
+                content=ft.Column([
+                    ft.ProgressRing(),
+                    ft.Text(text_align=ft.TextAlign.CENTER),
+                ], 
+                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+                spacing=15,
+                ),
+            )
+            self.overlay.keep("loading", dialog)
         
-        self.page.overlay.append(dialog)
-        dialog.open = True
-        self.page.update()
+        dialog.title.value = title
+        dialog.content.height = height
+        dialog.content.controls[1].value = message
         
-        return dialog
+        return self.overlay.show(dialog)
     
     def close_dialog(self, dialog):
-        """Ferme un dialog"""
-        dialog.open = False
-        self.page.update()
+        """Ferme un dialog et le retire de l'overlay"""
+        self.overlay.close(dialog)
     
     # ==================== BOTTOM SHEET ====================
     def bottom_sheet(
@@ -465,11 +1024,7 @@ class ZeliDialog2:
             dismissible=dismissible,
         )
         
-        self.page.overlay.append(bs)
-        bs.open = True
-        self.page.update()
-        
-        return bs
+        return self.overlay.show(bs)
     
     # ==================== DIALOG DE LISTE ====================
     def list_dialog(
@@ -491,10 +1046,10 @@ class ZeliDialog2:
         for item in items:
             def make_click_handler(dialog, on_click):
                 def handler(e):
-                    dialog.open = False
-                    self.page.update()
-                    if on_click:
-                        on_click()
+                    with self.overlay.render.batch("choix dans la liste"):
+                        self.overlay.close(dialog)
+                        if on_click:
+                            on_click()
                 return handler
             
             row_content = []
@@ -524,8 +1079,4 @@ class ZeliDialog2:
         for i, item in enumerate(items):
             list_items[i].on_click = make_click_handler(dialog, item.get("on_click"))
         
-        self.page.overlay.append(dialog)
-        dialog.open = True
-        self.page.update()
-        
-        return dialog
+        return self.overlay.show(dialog)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Requêtes de lecture des écrans
+Une requête par écran au lieu d'un lookup par carte : les dialogues
+construisent leur contenu à partir du résultat
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from config import STUDENT_PAGE_SIZE
+from db_manager import db_connection
+
+
+# Classes d'un établissement avec effectif et nombre d'élèves notés dans une matière
+# Notes a au plus une ligne par (matricule, matiere, classe) : notes <= effectif
+CLASS_OVERVIEW_SQL = """
+    SELECT s.classe, COUNT(*) AS effectif, COUNT(n.matricule) AS notes
+    FROM Students s
+    LEFT JOIN Notes n
+        ON n.matricule = s.matricule AND n.matiere = ? AND n.classe = s.classe
+    WHERE s.etablissement = ?
+    GROUP BY s.classe
+    ORDER BY s.classe
+"""
+
+
+def get_class_overview(etablissement: str, matiere: str) -> List[Tuple[str, int, int]]:
+    """
+    Vue d'ensemble des classes pour la saisie des notes
+    Retourne [(classe, effectif, notes saisies)] triées par classe
+    """
+    with db_connection() as conn:
+        return conn.execute(CLASS_OVERVIEW_SQL, (matiere, etablissement)).fetchall()
+
+
+# Élèves d'une classe (triés) avec leur ligne Notes dans une matière
+# note_rowid sépare les colonnes de Students de celles de Notes
+CLASS_ROSTER_SQL = """
+    SELECT s.*, n.rowid AS note_rowid, n.*
+    FROM Students s
+    LEFT JOIN Notes n
+        ON n.matricule = s.matricule AND n.matiere = ? AND n.classe = s.classe
+    WHERE s.etablissement = ? AND s.classe = ?
+    ORDER BY s.nom, s.prenom
+"""
+
+
+def get_class_roster(etablissement: str, classe: str,
+                     matiere: str) -> Tuple[List[tuple], Dict[str, tuple]]:
+    """
+    Élèves d'une classe et statut de saisie dans une matière, en une requête
+    Retourne (élèves, {matricule: ligne Notes}) : les élèves ont la forme
+    de SELECT * FROM Students, les notes celle de SELECT * FROM Notes
+    """
+    with db_connection() as conn:
+        cursor = conn.execute(CLASS_ROSTER_SQL, (matiere, etablissement, classe))
+        columns = [d[0] for d in cursor.description]
+        split = columns.index("note_rowid")
+        matricule = columns.index("matricule")
+
+        students, notes = [], {}
+        for row in cursor.fetchall():
+            students.append(row[:split])
+            if row[split] is not None:
+                notes[row[matricule]] = row[split + 1:]
+    return students, notes
+
+
+# Page d'élèves par curseur (keyset) suivant l'index idx_students_etab_classe_nom :
+# la page N coûte autant que la première. Curseur = (classe, nom, prenom, rowid) ;
+# avec un filtre de classe, la clé se réduit à (nom, prenom, rowid)
+STUDENT_PAGE_SQL = """
+    SELECT *, rowid AS _rowid FROM Students
+    WHERE etablissement = ?{classe_filter}
+      AND ({key}) > ({marks})
+    ORDER BY {key}
+    LIMIT ?
+"""
+
+# Curseur de départ (avant toute ligne)
+FIRST_PAGE = ("", "", "", -1)
+
+
+def build_student_page_sql(filtered: bool) -> str:
+    """Requête de page, avec ou sans filtre de classe"""
+    key = ["nom", "prenom", "rowid"] if filtered else ["classe", "nom", "prenom", "rowid"]
+    return STUDENT_PAGE_SQL.format(
+        classe_filter=" AND classe = ?" if filtered else "",
+        key=", ".join(key),
+        marks=", ".join("?" for _ in key),
+    )
+
+
+def get_student_page(etablissement: str, classe: Optional[str] = None,
+                     after: Tuple = FIRST_PAGE,
+                     limit: int = STUDENT_PAGE_SIZE) -> Tuple[List[tuple], Optional[Tuple]]:
+    """
+    Une page d'élèves triés par classe puis nom
+    Retourne (élèves au format SELECT * FROM Students, curseur de la page
+    suivante ou None si c'était la dernière)
+    """
+    if classe:
+        params = [etablissement, classe] + list(after[1:])
+    else:
+        params = [etablissement] + list(after)
+
+    with db_connection() as conn:
+        rows = conn.execute(build_student_page_sql(bool(classe)), params + [limit]).fetchall()
+
+    students = [row[:-1] for row in rows]
+    if len(rows) < limit:
+        return students, None
+    last = rows[-1]
+    # Colonnes de Students : nom, prenom, matricule, date_naissance, sexe, classe, ...
+    return students, (last[5], last[0], last[1], last[-1])
+
+
+def count_students(etablissement: str, classe: Optional[str] = None) -> int:
+    """Nombre d'élèves de l'établissement (ou d'une classe)"""
+    sql = "SELECT COUNT(*) FROM Students WHERE etablissement = ?"
+    params = [etablissement]
+    if classe:
+        sql += " AND classe = ?"
+        params.append(classe)
+    with db_connection() as conn:
+        return conn.execute(sql, params).fetchone()[0]
+
+
+def get_student_classes(etablissement: str) -> List[str]:
+    """Classes qui ont au moins un élève, triées"""
+    with db_connection() as conn:
+        rows = conn.execute(
+            "SELECT classe FROM Students WHERE etablissement = ? GROUP BY classe ORDER BY classe",
+            (etablissement,)
+        ).fetchall()
+    return [row[0] for row in rows]
+
+
+# Recherche d'élèves (index plein texte students_fts, voir migrations)
+STUDENT_SEARCH_SQL = """
+    SELECT s.* FROM students_fts
+    JOIN Students s ON s.id = students_fts.rowid
+    WHERE students_fts MATCH ? AND s.etablissement = ?{classe_filter}
+    ORDER BY students_fts.rank, s.nom, s.prenom
+    LIMIT ?
+"""
+
+# Repli sans FTS5 : sensible aux accents, parcourt l'établissement
+STUDENT_SEARCH_LIKE_SQL = """
+    SELECT * FROM Students
+    WHERE etablissement = ?{classe_filter} AND {terms}
+    ORDER BY nom, prenom
+    LIMIT ?
+"""
+
+
+def build_match_query(text: str) -> str:
+    """
+    Saisie libre → requête FTS5 : chaque mot devient un préfixe, tous requis
+    "hél dup" → "hél"* "dup"* (les accents sont ignorés par l'index)
+    """
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", text))
+
+
+def search_students(etablissement: str, text: str, classe: Optional[str] = None,
+                    limit: int = STUDENT_PAGE_SIZE) -> List[tuple]:
+    """
+    Élèves dont le nom, le prénom, le matricule ou la classe commencent
+    par les mots saisis (au format SELECT * FROM Students, les plus
+    pertinents d'abord)
+    """
+    words = re.findall(r"\w+", text)
+    if not words:
+        return []
+
+    classe_filter = " AND s.classe = ?" if classe else ""
+    with db_connection() as conn:
+        has_index = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'students_fts'"
+        ).fetchone()
+
+        if has_index:
+            params = [build_match_query(text), etablissement] + ([classe] if classe else []) + [limit]
+            return conn.execute(STUDENT_SEARCH_SQL.format(classe_filter=classe_filter), params).fetchall()
+
+        term = "(nom LIKE ? OR prenom LIKE ? OR matricule LIKE ? OR classe LIKE ?)"
+        params = [etablissement] + ([classe] if classe else [])
+        for word in words:
+            params += [f"{word}%"] * 4
+        sql = STUDENT_SEARCH_LIKE_SQL.format(
+            classe_filter=classe_filter.replace("s.", ""),
+            terms=" AND ".join(term for _ in words),
+        )
+        return conn.execute(sql, params + [limit]).fetchall()
@@ -8,9 +8,67 @@ Compatible PyInstaller et développement
 
 import sqlite3
 import os
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 import sys
 
+from config import (
+    DB_POOL_SIZE, DB_BUSY_TIMEOUT, DB_PRAGMA_PROFILE, DB_WAL_MAX_BYTES,
+)
+from sync_store import install_change_tracking
+from migrations import run_migrations, ensure_student_search, SCHEMA_VERSION
+
+
+# Profils de PRAGMA (DB_PRAGMA_PROFILE dans config.py)
+# "wal" : lecteurs (interface) et écrivain (sync) ne se bloquent plus
+# "wal_low_memory" : idem avec un cache réduit et sans mmap
+# "legacy" : journal de rollback, comportement historique
+PRAGMA_PROFILES = {
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",        # sûr en WAL, un fsync par checkpoint
+        "cache_size": -16000,           # ~16 Mo par connexion
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "wal_autocheckpoint": 1000,     # pages
+        "journal_size_limit": DB_WAL_MAX_BYTES,
+    },
+    "wal_low_memory": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -2000,
+        "mmap_size": 0,
+        "temp_store": "MEMORY",
+        "wal_autocheckpoint": 1000,
+        "journal_size_limit": DB_WAL_MAX_BYTES,
+    },
+    "legacy": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+    },
+}
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    Connexion SQLite recyclée par DatabaseManager
+    close() la rend au pool du thread au lieu de la fermer : le code
+    existant (get_db_connection() ... con.close()) profite du pool sans changement
+    """
+    
+    manager = None
+    released = False
+    
+    def close(self):
+        if self.released:
+            # Déjà rendue au pool : un second close() ne fait rien
+            return
+        if self.manager is not None:
+            self.manager._release(self)
+        else:
+            sqlite3.Connection.close(self)
+
 
 class DatabaseManager:
     """Gère la connexion et le chemin de la base de données"""
@@ -22,8 +80,17 @@ class DatabaseManager:
         if cls._instance is None:
             cls._instance = super(DatabaseManager, cls).__new__(cls)
             cls._instance._initialize_db_path()
+            cls._instance._initialize_pool()
         return cls._instance
     
+    def _initialize_pool(self):
+        """Pool de connexions par thread + connexion d'écriture de la sync"""
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._stats = {"opened": 0, "reused": 0, "closed": 0}
+        self._writer = None
+        self._writer_lock = threading.RLock()
+    
     def _initialize_db_path(self):
         """Initialise le chemin de la base de données - VERSION PORTABLE"""
         
@@ -69,15 +136,166 @@ class DatabaseManager:
             print(f"❌ Erreur permissions: {e}")
             print("⚠️ L'application pourrait ne pas fonctionner correctement")
     
+    def _count(self, key):
+        with self._stats_lock:
+            self._stats[key] += 1
+    
+    def _open(self, check_same_thread=True):
+        """Ouvre une connexion et applique les PRAGMA (une seule fois)"""
+        conn = sqlite3.connect(
+            self._db_path,
+            factory=PooledConnection,
+            check_same_thread=check_same_thread,
+        )
+        conn.execute(f"PRAGMA busy_timeout = {int(DB_BUSY_TIMEOUT)}")
+        self._apply_profile(conn)
+        conn.db_path = self._db_path
+        self._count("opened")
+        return conn
+    
+    def _apply_profile(self, conn):
+        """Applique le profil de PRAGMA configuré"""
+        profile = PRAGMA_PROFILES.get(DB_PRAGMA_PROFILE)
+        if profile is None:
+            print(f"⚠️ Profil PRAGMA inconnu: {DB_PRAGMA_PROFILE}")
+            return
+        
+        for name, value in profile.items():
+            try:
+                conn.execute(f"PRAGMA {name} = {value}")
+            except sqlite3.OperationalError as e:
+                # journal_mode ne change pas si une autre connexion écrit
+                print(f"⚠️ PRAGMA {name} non appliqué: {e}")
+    
+    def checkpoint(self):
+        """
+        Politique de checkpoint du WAL (à appeler après un cycle de sync)
+        PASSIVE : recopie ce qui peut l'être sans bloquer les lecteurs
+        TRUNCATE : seulement si le WAL dépasse DB_WAL_MAX_BYTES
+        Retourne (busy, pages du WAL, pages recopiées) ou None hors WAL
+        """
+        wal_path = Path(f"{self._db_path}-wal")
+        if not wal_path.exists():
+            return None
+        
+        mode = "TRUNCATE" if wal_path.stat().st_size > DB_WAL_MAX_BYTES else "PASSIVE"
+        with self.writer() as conn:
+            return conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+    
+    def _idle(self):
+        """Connexions libres du thread courant"""
+        if not hasattr(self._local, "idle"):
+            self._local.idle = []
+        return self._local.idle
+    
     def get_connection(self):
-        """Retourne une connexion à la base de données"""
+        """
+        Retourne une connexion à la base de données
+        ✅ Réutilise une connexion libre du thread courant si possible
+        À rendre avec conn.close() (ou via le context manager connection())
+        """
         try:
-            conn = sqlite3.connect(self._db_path)
+            idle = self._idle()
+            while idle:
+                conn = idle.pop()
+                if conn.db_path == self._db_path:
+                    conn.manager = self
+                    conn.released = False
+                    self._count("reused")
+                    return conn
+                # Chemin de base changé : ancienne connexion fermée
+                self._close(conn)
+            
+            conn = self._open()
+            conn.manager = self
             return conn
         except sqlite3.Error as e:
             print(f"❌ Erreur connexion DB: {e}")
             raise
     
+    def _release(self, conn):
+        """Remet une connexion dans le pool du thread (appelé par close())"""
+        conn.manager = None
+        conn.released = True
+        try:
+            # Comme une vraie fermeture : le travail non validé est annulé
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = None
+        except sqlite3.Error:
+            self._close(conn)
+            return
+        
+        idle = self._idle()
+        if conn.db_path == self._db_path and len(idle) < DB_POOL_SIZE:
+            idle.append(conn)
+        else:
+            self._close(conn)
+    
+    def _close(self, conn):
+        sqlite3.Connection.close(conn)
+        self._count("closed")
+    
+    @contextmanager
+    def connection(self):
+        """
+        Connexion prête à l'emploi, rendue au pool à la sortie
+        
+        Usage :
+            with db_manager.connection() as conn:
+                conn.execute(...)
+        """
+        conn = self.get_connection()
+        try:
+            yield conn
+        finally:
+            conn.close()
+    
+    @contextmanager
+    def writer(self):
+        """
+        Connexion d'écriture dédiée à la synchronisation
+        Une seule, partagée par les threads de sync et sérialisée par un verrou :
+        les gros lots distants ne se disputent pas le verrou d'écriture SQLite
+        """
+        with self._writer_lock:
+            if self._writer is None or self._writer.db_path != self._db_path:
+                if self._writer is not None:
+                    self._close(self._writer)
+                self._writer = self._open(check_same_thread=False)
+            try:
+                yield self._writer
+            finally:
+                try:
+                    if self._writer.in_transaction:
+                        self._writer.rollback()
+                except sqlite3.ProgrammingError:
+                    # Fermée par l'appelant : rouverte au prochain appel
+                    self._writer = None
+    
+    @contextmanager
+    def use_path(self, db_path):
+        """
+        Bascule sur une autre base (scripts de mesure, bases jetables)
+        Le schéma est mis à jour ; l'ancien chemin est rétabli à la sortie
+
+        Usage :
+            with db_manager.use_path(Path(tmp) / "bench.db"):
+                ...
+        """
+        previous = self._db_path
+        self._db_path = str(db_path)
+        try:
+            init_all_tables()
+            yield self._db_path
+        finally:
+            self._db_path = previous
+
+    def stats(self):
+        """Compteurs de connexions (ouvertes, réutilisées, fermées)"""
+        with self._stats_lock:
+            return dict(self._stats)
+    
     @property
     def db_path(self):
         """Retourne le chemin de la base de données"""
@@ -96,141 +314,50 @@ def get_db_connection():
     return db_manager.get_connection()
 
 
-def init_all_tables():
+def db_connection():
+    """
+    Context manager : connexion du pool, rendue automatiquement
+    
+        with db_connection() as conn:
+            ...
+    """
+    return db_manager.connection()
+
+
+def init_all_tables(conn=None):
     """
-    Initialise toutes les tables avec la structure Supabase
-    Compatible SQLite
+    Met le schéma local à jour (migrations versionnées, voir migrations.py)
+    puis installe le journal des modifications
+    À appeler une fois au démarrage, jamais dans les écrans
+    
+    Args:
+        conn: Connexion à utiliser (par défaut celle de base.db, fermée à la fin)
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    own_conn = conn is None
+    if own_conn:
+        conn = get_db_connection()
     
     try:
         print("📦 Initialisation des tables...")
         
-        # Table User
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS User (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                identifiant TEXT NOT NULL UNIQUE,
-                passwords TEXT NOT NULL,
-                nom TEXT NOT NULL,
-                prenom TEXT NOT NULL,
-                email TEXT NOT NULL,
-                telephone TEXT NOT NULL,
-                etablissement TEXT NOT NULL,
-                titre TEXT NOT NULL,
-                theme TEXT DEFAULT 'light',
-                language TEXT DEFAULT 'fr',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Table Students
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS Students (
-                nom TEXT NOT NULL,
-                prenom TEXT NOT NULL,
-                matricule TEXT NOT NULL,
-                date_naissance TEXT NOT NULL,
-                sexe TEXT NOT NULL,
-                classe TEXT NOT NULL,
-                etablissement TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(matricule, etablissement)
-            )
-        """)
-        
-        # Table Matieres
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS Matieres (
-                nom TEXT NOT NULL,
-                genre TEXT NOT NULL,
-                etablissement TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(nom, etablissement)
-            )
-        """)
+        applied = run_migrations(conn)
         
-        # Table Teacher
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS Teacher (
-                ident TEXT NOT NULL UNIQUE,
-                pass TEXT NOT NULL,
-                matiere TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+        # Index plein texte des élèves, s'il manquait faute de FTS5
+        ensure_student_search(conn)
         
-        # Table Notes
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS Notes (
-                classe TEXT NOT NULL,
-                matricule TEXT NOT NULL,
-                matiere TEXT NOT NULL,
-                coefficient TEXT NOT NULL,
-                note_interrogation TEXT NOT NULL,
-                note_devoir TEXT NOT NULL,
-                note_composition TEXT NOT NULL,
-                moyenne TEXT,
-                date_saisie TEXT,
-                periode TEXT DEFAULT 'Premier Trimestre',
-                statut TEXT DEFAULT 'en_cours',
-                date_verrouillage TIMESTAMP,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(matricule, matiere, classe)
-            )
-        """)
-        
-        # Index pour Notes
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_notes_periode_statut 
-            ON Notes(periode, statut)
-        """)
-        
-        # Table Class
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS Class (
-                nom TEXT NOT NULL,
-                etablissement TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(nom, etablissement)
-            )
-        """)
-        
-        # Table Trimestre_moyen_save
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS Trimestre_moyen_save (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                matricule TEXT NOT NULL,
-                moyenne REAL NOT NULL,
-                annee_scolaire TEXT NOT NULL,
-                periode TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(matricule, annee_scolaire, periode)
-            )
-        """)
-        
-        # Table de métadonnées de sync
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS sync_metadata (
-                table_name TEXT PRIMARY KEY,
-                last_sync TIMESTAMP,
-                sync_status TEXT DEFAULT 'pending'
-            )
-        """)
+        # Journal des modifications locales + triggers (push incrémental)
+        install_change_tracking(conn)
         
         conn.commit()
-        print("✅ Toutes les tables initialisées avec succès")
+        if applied:
+            print(f"✅ Schéma en version {SCHEMA_VERSION} ({applied} migration(s) appliquée(s))")
+        else:
+            print(f"✅ Schéma à jour (version {SCHEMA_VERSION})")
         
     except Exception as e:
         print(f"❌ Erreur initialisation tables: {e}")
         conn.rollback()
         raise
     finally:
-        conn.close()
+        if own_conn:
+            conn.close()
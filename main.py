@@ -14,6 +14,9 @@ from Students import Gestion_Eleve_Liste
 from Note import Saisie_Notes
 #from Bulletin import Generation_Bulletin
 from sync_manager import sync_manager
+from sync_async import async_sync_manager
+from sync_events import set_pending
+from session import start_session, session_for, invalidate_session
 from db_manager import get_db_connection, db_manager, init_all_tables
 #-----
 
@@ -156,32 +159,94 @@ def Get_on_db_local(mention):
         return []   # return empty list when unknown mention
     return func()
 
+def find_local_user(identifiant):
+    """
+    Cherche un compte local par identifiant
+    ✅ Recherche indexée (identifiant UNIQUE) au lieu de parcourir tous les comptes
+    """
+    con = None
+    try:
+        con = get_db_connection()
+        cur = con.cursor()
+        cur.execute("SELECT * FROM User WHERE identifiant = ?", (identifiant,))
+        return cur.fetchone()
+    except sqlite3.Error:
+        return None
+    finally:
+        if con:
+            con.close()
+
+# Tables chargées après la connexion, dans l'ordre d'affichage
+SCHOOL_TABLES = ["User", "Class", "Students", "Matieres", "Teacher", "Notes"]
+
+async def load_school_in_background(page, etablissement):
+    """
+    Télécharge les données de l'établissement sans bloquer l'interface
+    Toast de progression non modal ; les vues ouvertes se rafraîchissent
+    table par table (sync_events), puis la sync automatique démarre
+    """
+    Dialog = ZeliDialog2(page)
+    set_pending(SCHOOL_TABLES)
+    progress = Dialog.progress_toast("Synchronisation de l'établissement...")
+    loaded = []
+    
+    def on_table_done(table, elapsed):
+        loaded.append(table)
+        Dialog.update_progress_toast(
+            progress,
+            len(loaded) / len(SCHOOL_TABLES),
+            f"Synchronisation {len(loaded)}/{len(SCHOOL_TABLES)} ({table})"
+        )
+    
+    try:
+        await async_sync_manager.sync_school(
+            etablissement,
+            tables=SCHOOL_TABLES,
+            push=False,
+            on_table_done=on_table_done
+        )
+        Dialog.close_progress_toast(progress)
+        Dialog.success_toast("Données de l'établissement à jour")
+    except Exception as e:
+        print(f"❌ Erreur sync établissement: {e}")
+        Dialog.close_progress_toast(progress)
+        Dialog.warning_toast("Synchronisation incomplète, données locales affichées")
+    finally:
+        # Démarrer sync auto
+        sync_manager.start_auto_sync(etablissement)
+
 def Submit(page , Ident , Pass): 
     Dialog = ZeliDialog2(page)
     #================================================================
-    # NOUVEAU : Sync des Users au chargement de la page de login
-    if not hasattr(Submit, 'users_synced'):
+    # NOUVEAU : Sync du compte qui se connecte (une seule ligne)
+    if not hasattr(Submit, 'tables_ready'):
+        # Initialiser tables locales
+        sync_manager.init_local_tables()
+        Submit.tables_ready = True
+    
+    # Recherche indexée du compte (plus de boucle sur tous les comptes)
+    # Compte local d'abord : Supabase n'est interrogé que si le compte est
+    # absent ou si le mot de passe a changé sur un autre poste. Sinon le
+    # compte est rafraîchi avec l'établissement, après la connexion
+    user = find_local_user(Ident.value)
+    if Ident.value and Ident.value != "Deg" and not (user and user[2] == Pass.value):
         loading = Dialog.loading_dialog(
             title="Chargement...",
-            message="Synchronisation des utilisateurs"
+            message="Vérification de votre compte"
         )
         
-        # Initialiser tables locales
-        sync_manager.init_local_tables()
-        
-        # Charger tous les users
+        # Charger le compte (les autres arrivent après la connexion)
         sync_manager.sync_on_login(
+            Ident.value,
             callback=lambda msg: print(msg)
         )
         
         Dialog.close_dialog(loading)
-        Submit.users_synced = True
+        user = find_local_user(Ident.value)
     
     def login_success(donner_info,Dial):
         Dialog.close_dialog(Dial)
         
-        # NOUVEAU : Charger les données de l'établissement
-        
         if donner_info["role"] == "admin":
             Dialog.alert_dialog(
                 title="Impossible",
@@ -189,44 +254,24 @@ def Submit(page , Ident , Pass):
             )
             
             return # Ne pas continuer la connexion
-        elif donner_info.get("role") != "creator":
-            loading = Dialog.loading_dialog(
-                title="Chargement...",
-                message="Synchronisation des données de votre établissement"
-            )
-            
-            # Récupérer l'établissement
-            conn = sync_manager.get_local_connection()
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT etablissement FROM User WHERE identifiant = ? AND titre = ?",
-                (donner_info["ident"], donner_info["role"])
-            )
-            result = cursor.fetchone()
-            conn.close()
-            
-            if result:
-                etablissement = result[0]
-                
-                # Charger données établissement
-                sync_manager.sync_etablissement_data(
-                    etablissement,
-                    callback=lambda msg: print(msg)
-                )
-                
-                # Démarrer sync auto
-                sync_manager.start_auto_sync(etablissement)
-            
-            Dialog.close_dialog(loading)
         
-        # Afficher la page principale
+        # Contexte de session (établissement, matière, préférences) lu une fois
+        session = start_session(donner_info)
+        etablissement = session.etablissement
+
+        # Afficher la page principale tout de suite (données locales)
         page.clean()
         sidebar, main_content = Page1(page, donner_info)
         page.add(ft.Row([sidebar, main_content], spacing=0, expand=True))
         page.update()
+
+        # NOUVEAU : Charger les données de l'établissement en arrière-plan
+        if etablissement:
+            page.run_task(load_school_in_background, page, etablissement)
+        elif donner_info.get("role") == "creator":
+            # Vue créateur : tous les comptes, toutes écoles
+            page.run_task(async_sync_manager.sync_all_accounts)
     
-    # Reste du code inchangé...
-    Donne = Get_on_db_local("User")
     if all([Ident.value == "Deg" , Pass.value == "Deg"]):
         Donner = {
                 "ident": "Deg",
@@ -262,77 +307,41 @@ def Submit(page , Ident , Pass):
             ]
         )
         #pass #Nxte page
-    elif Donne:
-        found = False
-        for elmt in Donne:
-            ident , passs = elmt[1],elmt[2]
-            if ident == Ident.value and passs == Pass.value:
-                found = True
-                
-                Donner = {
-                    "ident": ident,
-                    "pass" : passs,
-                    "name": elmt[3],
-                    "role": elmt[8]
-                    }
-                
-                Dial = Dialog.custom_dialog(
-                    title = "Notification",
-                    content=ft.Column(
-                        [
-                            ft.Icon(
-                                ft.Icons.CHECK_CIRCLE_OUTLINE,
-                                size = 60,
-                                color=ft.Colors.GREEN_200,
-                            ),
-                            ft.Text(
-                                value=f"Bienvenue {Ident.value}"
-                            )
-                        ],
-                        height=100,
-                        horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+    elif user and user[2] == Pass.value:
+        Donner = {
+            "ident": user[1],
+            "pass" : user[2],
+            "name": user[3],
+            "role": user[8]
+            }
+        
+        Dial = Dialog.custom_dialog(
+            title = "Notification",
+            content=ft.Column(
+                [
+                    ft.Icon(
+                        ft.Icons.CHECK_CIRCLE_OUTLINE,
+                        size = 60,
+                        color=ft.Colors.GREEN_200,
                     ),
-                    actions=[
-                        ft.ElevatedButton(
-                            content=ft.Text(
-                                value ="Ok",
-                                color=ft.Colors.WHITE,
-                                ),
-                            bgcolor=ft.Colors.GREEN_200,
-                            on_click=lambda e : login_success(Donner ,Dial )
-                        )
-                    ]
-                )
-                #break  # stop after first match
-        if not found:
-            # show error dialog when no matching credentials found
-            Dial = Dialog.custom_dialog(
-                title = "Notification",
-                content=ft.Column(
-                    [
-                        ft.Icon(
-                            ft.Icons.ERROR_ROUNDED,
-                            size = 60,
-                            color=ft.Colors.RED_200,
-                        ),
-                        ft.Text(
-                            value="Erreur de connexion"
-                        )
-                    ],
-                    height=100,
-                    horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                ),
-                actions=[
-                    ft.ElevatedButton(
-                        content=ft.Text(
-                            value ="Ok",
-                            color=ft.Colors.WHITE,
-                            ),
-                        bgcolor=ft.Colors.RED_200,
-                        on_click=lambda e : Dialog.close_dialog(Dial)
+                    ft.Text(
+                        value=f"Bienvenue {Ident.value}"
                     )
-                ]
-            )
+                ],
+                height=100,
+                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+            ),
+            actions=[
+                ft.ElevatedButton(
+                    content=ft.Text(
+                        value ="Ok",
+                        color=ft.Colors.WHITE,
+                        ),
+                    bgcolor=ft.Colors.GREEN_200,
+                    on_click=lambda e : login_success(Donner ,Dial )
+                )
+            ]
+        )
     else:
         Dial = Dialog.custom_dialog(
             title = "Notification",
@@ -483,7 +492,22 @@ def Page0(page):#page: ft.Page):
                 error_text.value = "Tous les champs sont obligatoires"
                 page.update()
                 return
-                
+            
+            page.run_task(search_account, email_field.value)
+        
+        async def search_account(email):
+            # Le compte n'est peut-être pas encore en local : le chercher par
+            # email, sans bloquer l'interface
+            progress = Dialog.progress_toast("Recherche du compte...")
+            try:
+                await async_sync_manager.sync_account("User", "email", email)
+            except Exception as ex:
+                print(f"⚠️ Recherche distante impossible: {ex}")
+            finally:
+                Dialog.close_progress_toast(progress)
+            show_account()
+        
+        def show_account():
             Donne = Get_on_db_local("User")
             found = False
             
@@ -822,25 +846,10 @@ def Page0(page):#page: ft.Page):
 
 #==============================================================================
 def get_user_preference(setting_name,Donner):
-    """Récupère les préférences utilisateur"""
-    con = None
-    try:
-        con = get_db_connection()
-        cur = con.cursor()
-        
-        if Donner and Donner.get("ident") == "Deg":
-            cur.execute(f"SELECT {setting_name} FROM Dev_Preferences WHERE id = 1")
-        else:
-            cur.execute(f"SELECT {setting_name} FROM User_Preferences WHERE user_id = ?",
-                       (Donner.get("ident") if Donner else None,))
-        
-        result = cur.fetchone()
-        return result[0] if result else "light" if setting_name == "theme" else "fr"
-    except sqlite3.Error:
+    """Récupère les préférences utilisateur (contexte de session)"""
+    if not Donner:
         return "light" if setting_name == "theme" else "fr"
-    finally:
-        if con:
-            con.close()
+    return getattr(session_for(Donner), setting_name)
 
 def User_Config(page, Donner):  # Ajout du paramètre Donner
     """Gestion des préférences utilisateur (mode/langue)
@@ -864,24 +873,7 @@ def User_Config(page, Donner):  # Ajout du paramètre Donner
             con = get_db_connection()
             cur = con.cursor()
             
-            # Table pour développeur
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS Dev_Preferences (
-                    id INTEGER PRIMARY KEY DEFAULT 1,
-                    theme TEXT DEFAULT 'light',
-                    language TEXT DEFAULT 'fr'
-                )
-            """)
-            
-            # Table pour utilisateurs normaux
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS User_Preferences (
-                    user_id TEXT PRIMARY KEY,
-                    theme TEXT DEFAULT 'light',
-                    language TEXT DEFAULT 'fr'
-                )
-            """)
-            
+            # Dev_Preferences / User_Preferences : créées par les migrations
             if Donner and Donner.get("ident") == "Deg":  # Utilisation de Donner
                 cur.execute("""
                     INSERT OR REPLACE INTO Dev_Preferences (id, theme, language)
@@ -894,6 +886,8 @@ def User_Config(page, Donner):  # Ajout du paramètre Donner
                 """, (Donner.get("ident"), theme, language))
             
             con.commit()
+            if Donner:
+                invalidate_session(Donner.get("ident"))
             
             # Appliquer le thème immédiatement
             page.theme_mode = ft.ThemeMode.DARK if theme == "dark" else ft.ThemeMode.LIGHT
@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Migrations du schéma local (base.db)
+La version appliquée est stockée dans PRAGMA user_version : chaque
+migration s'exécute une seule fois, au démarrage, dans sa propre transaction
+"""
+
+import sqlite3
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sync_store import SYNC_TABLES, get_local_columns
+
+
+# Structure de référence des tables (alignée sur Supabase)
+# {name} permet de recréer une table sous un nom temporaire
+# ⚠️ Utilisée par les migrations 1 et 2 : ne plus la modifier, une table
+# qui change reçoit sa nouvelle définition dans sa migration (STUDENTS_V6)
+SCHEMA: Dict[str, str] = {
+    "User": """
+        CREATE TABLE IF NOT EXISTS "{name}" (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            identifiant TEXT NOT NULL UNIQUE,
+            passwords TEXT NOT NULL,
+            nom TEXT NOT NULL,
+            prenom TEXT NOT NULL,
+            email TEXT NOT NULL,
+            telephone TEXT NOT NULL,
+            etablissement TEXT NOT NULL,
+            titre TEXT NOT NULL,
+            theme TEXT DEFAULT 'light',
+            language TEXT DEFAULT 'fr',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    "Students": """
+        CREATE TABLE IF NOT EXISTS "{name}" (
+            nom TEXT NOT NULL,
+            prenom TEXT NOT NULL,
+            matricule TEXT NOT NULL,
+            date_naissance TEXT NOT NULL,
+            sexe TEXT NOT NULL,
+            classe TEXT NOT NULL,
+            etablissement TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(matricule, etablissement)
+        )
+    """,
+    "Matieres": """
+        CREATE TABLE IF NOT EXISTS "{name}" (
+            nom TEXT NOT NULL,
+            genre TEXT NOT NULL,
+            etablissement TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(nom, etablissement)
+        )
+    """,
+    "Teacher": """
+        CREATE TABLE IF NOT EXISTS "{name}" (
+            ident TEXT NOT NULL UNIQUE,
+            pass TEXT NOT NULL,
+            matiere TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    "Notes": """
+        CREATE TABLE IF NOT EXISTS "{name}" (
+            classe TEXT NOT NULL,
+            matricule TEXT NOT NULL,
+            matiere TEXT NOT NULL,
+            coefficient TEXT NOT NULL,
+            note_interrogation TEXT NOT NULL,
+            note_devoir TEXT NOT NULL,
+            note_composition TEXT NOT NULL,
+            moyenne TEXT,
+            date_saisie TEXT,
+            periode TEXT DEFAULT 'Premier Trimestre',
+            statut TEXT DEFAULT 'en_cours',
+            date_verrouillage TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(matricule, matiere, classe)
+        )
+    """,
+    "Class": """
+        CREATE TABLE IF NOT EXISTS "{name}" (
+            nom TEXT NOT NULL,
+            etablissement TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(nom, etablissement)
+        )
+    """,
+    "Trimestre_moyen_save": """
+        CREATE TABLE IF NOT EXISTS "{name}" (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            matricule TEXT NOT NULL,
+            moyenne REAL NOT NULL,
+            annee_scolaire TEXT NOT NULL,
+            periode TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(matricule, annee_scolaire, periode)
+        )
+    """,
+}
+
+
+def table_exists(conn: sqlite3.Connection, table_name: str) -> bool:
+    """La table existe-t-elle dans la base ?"""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)
+    ).fetchone()
+    return row is not None
+
+
+def has_unique_key(conn: sqlite3.Connection, table_name: str, columns) -> bool:
+    """Existe-t-il une contrainte UNIQUE portant exactement sur ces colonnes ?"""
+    wanted = set(columns)
+    for index in conn.execute(f'PRAGMA index_list("{table_name}")').fetchall():
+        # (seq, name, unique, origin, partial)
+        if not index[2]:
+            continue
+        indexed = [row[2] for row in conn.execute(f'PRAGMA index_info("{index[1]}")').fetchall()]
+        if set(indexed) == wanted:
+            return True
+    return False
+
+
+def needs_rebuild(conn: sqlite3.Connection, table_name: str) -> bool:
+    """
+    Une table créée par une ancienne version (colonnes ou clé UNIQUE
+    manquantes) doit être reconstruite : ALTER TABLE ne sait ajouter
+    ni contrainte UNIQUE ni colonne à défaut CURRENT_TIMESTAMP
+    """
+    if not table_exists(conn, table_name):
+        return False
+
+    # Colonnes attendues : lues sur une table vide créée pour l'occasion
+    conn.execute(SCHEMA[table_name].format(name="_schema_probe"))
+    expected = get_local_columns(conn, "_schema_probe")
+    conn.execute('DROP TABLE "_schema_probe"')
+
+    current = get_local_columns(conn, table_name)
+    if any(column not in current for column in expected):
+        return True
+
+    conflict = SYNC_TABLES.get(table_name, {}).get("conflict")
+    return bool(conflict) and not has_unique_key(conn, table_name, conflict)
+
+
+def rebuild_table(conn: sqlite3.Connection, table_name: str, ddl: Optional[str] = None) -> int:
+    """
+    Recrée une table avec la structure de référence (ou ddl, même gabarit
+    {name} que SCHEMA) en conservant ses données
+    Les colonnes communes sont recopiées ; en cas de doublon sur la clé,
+    la ligne la plus récente (rowid le plus grand) l'emporte
+    Retourne le nombre de lignes conservées
+    """
+    temp_name = f"_{table_name}_migration"
+    conn.execute(f'DROP TABLE IF EXISTS "{temp_name}"')
+    conn.execute((ddl or SCHEMA[table_name]).format(name=temp_name))
+
+    new_columns = get_local_columns(conn, temp_name)
+    common = [c for c in get_local_columns(conn, table_name) if c in new_columns]
+    col_list = ", ".join(f'"{c}"' for c in common)
+    conn.execute(
+        f'INSERT OR REPLACE INTO "{temp_name}" ({col_list}) '
+        f'SELECT {col_list} FROM "{table_name}" ORDER BY rowid'
+    )
+    kept = conn.execute(f'SELECT COUNT(*) FROM "{temp_name}"').fetchone()[0]
+
+    conn.execute(f'DROP TABLE "{table_name}"')
+    conn.execute(f'ALTER TABLE "{temp_name}" RENAME TO "{table_name}"')
+    return kept
+
+
+# ============ MIGRATIONS ============
+
+def migration_001_base_schema(conn: sqlite3.Connection):
+    """Tables de l'application et métadonnées de sync"""
+    for table_name, sql in SCHEMA.items():
+        conn.execute(sql.format(name=table_name))
+
+    # Une ligne par table et par établissement
+    # L'ancienne version (clé = table_name seule) n'était jamais écrite
+    meta_columns = get_local_columns(conn, "sync_metadata")
+    if meta_columns and "scope" not in meta_columns:
+        conn.execute("DROP TABLE sync_metadata")
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sync_metadata (
+            table_name TEXT NOT NULL,
+            scope TEXT NOT NULL DEFAULT '',
+            last_sync TIMESTAMP,
+            watermark TEXT,
+            sync_status TEXT DEFAULT 'pending',
+            PRIMARY KEY (table_name, scope)
+        )
+    """)
+
+
+def migration_002_upgrade_legacy_tables(conn: sqlite3.Connection):
+    """
+    Met à niveau les tables créées par les anciens écrans
+    (Notes sans periode/statut, Students et Class sans clé UNIQUE ni dates)
+    """
+    for table_name in SCHEMA:
+        if needs_rebuild(conn, table_name):
+            kept = rebuild_table(conn, table_name)
+            print(f"🔧 Table {table_name} mise à niveau ({kept} lignes)")
+
+    # Après la mise à niveau : periode/statut existent forcément
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_notes_periode_statut
+        ON Notes(periode, statut)
+    """)
+
+
+def migration_003_preferences(conn: sqlite3.Connection):
+    """Préférences d'affichage (créées auparavant à chaque enregistrement)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS Dev_Preferences (
+            id INTEGER PRIMARY KEY DEFAULT 1,
+            theme TEXT DEFAULT 'light',
+            language TEXT DEFAULT 'fr'
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS User_Preferences (
+            user_id TEXT PRIMARY KEY,
+            theme TEXT DEFAULT 'light',
+            language TEXT DEFAULT 'fr'
+        )
+    """)
+
+
+def migration_004_query_indexes(conn: sqlite3.Connection):
+    """
+    Index des requêtes fréquentes des écrans (voir scripts/check_query_plans.py)
+    Les lookups par identifiant, ident et matricule passent déjà
+    par les index des contraintes UNIQUE
+    """
+    # Note.py : liste/effectifs des classes, élèves d'une classe triés
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_students_etab_classe_nom
+        ON Students(etablissement, classe, nom, prenom)
+    """)
+    # Note.py create_class_card : notes saisies par classe et matière
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_notes_classe_matiere
+        ON Notes(classe, matiere)
+    """)
+    # stats.py : enseignants d'un établissement, suppression d'un établissement
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_user_etab_titre
+        ON User(etablissement, titre)
+    """)
+    # stats.py : liste des administrateurs
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_user_titre
+        ON User(titre)
+    """)
+    # Students.py add_student : classes de l'établissement
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_class_etab_nom
+        ON Class(etablissement, nom)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_matieres_etab
+        ON Matieres(etablissement)
+    """)
+
+
+def fts5_available(conn: sqlite3.Connection) -> bool:
+    """Le SQLite embarqué connaît-il FTS5 ?"""
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp._fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def migration_005_student_search(conn: sqlite3.Connection):
+    """
+    Index plein texte des élèves (nom, prénom, matricule, classe)
+    Table FTS5 à contenu externe : elle ne stocke que l'index, les lignes
+    restent dans Students. Recherche insensible aux accents (remove_diacritics)
+    et préfixes indexés pour la recherche pendant la frappe
+    Sans FTS5, data_access.search_students se rabat sur LIKE
+    """
+    if not fts5_available(conn):
+        print("⚠️ FTS5 indisponible : recherche d'élèves sans index plein texte")
+        return
+
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS students_fts USING fts5(
+            nom, prenom, matricule, classe,
+            content='Students', content_rowid='rowid',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    """)
+
+    # Triggers de maintien (l'UPDATE ne porte que sur les colonnes indexées :
+    # les mises à jour de updated_at par la sync ne réindexent pas)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_students_fts_insert AFTER INSERT ON Students
+        BEGIN
+            INSERT INTO students_fts (rowid, nom, prenom, matricule, classe)
+            VALUES (NEW.rowid, NEW.nom, NEW.prenom, NEW.matricule, NEW.classe);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_students_fts_delete AFTER DELETE ON Students
+        BEGIN
+            INSERT INTO students_fts (students_fts, rowid, nom, prenom, matricule, classe)
+            VALUES ('delete', OLD.rowid, OLD.nom, OLD.prenom, OLD.matricule, OLD.classe);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_students_fts_update
+        AFTER UPDATE OF nom, prenom, matricule, classe ON Students
+        BEGIN
+            INSERT INTO students_fts (students_fts, rowid, nom, prenom, matricule, classe)
+            VALUES ('delete', OLD.rowid, OLD.nom, OLD.prenom, OLD.matricule, OLD.classe);
+            INSERT INTO students_fts (rowid, nom, prenom, matricule, classe)
+            VALUES (NEW.rowid, NEW.nom, NEW.prenom, NEW.matricule, NEW.classe);
+        END
+    """)
+
+    # Indexer les élèves déjà présents
+    conn.execute("INSERT INTO students_fts (students_fts) VALUES ('rebuild')")
+
+
+STUDENT_SEARCH_TRIGGERS = ("trg_students_fts_insert", "trg_students_fts_delete", "trg_students_fts_update")
+
+
+def ensure_student_search(conn: sqlite3.Connection) -> bool:
+    """
+    Crée l'index plein texte des élèves s'il manque (et que FTS5 existe)
+    Appelée à chaque démarrage : une base migrée avec un SQLite sans FTS5
+    reçoit l'index dès que FTS5 est disponible. D'ici là,
+    data_access.search_students se rabat sur LIKE
+    Retourne True si l'index est en place
+    """
+    if table_exists(conn, "students_fts"):
+        return True
+    if not fts5_available(conn):
+        return False
+
+    # content_rowid='id' : alias explicite du rowid, stable après VACUUM
+    conn.execute("""
+        CREATE VIRTUAL TABLE students_fts USING fts5(
+            nom, prenom, matricule, classe,
+            content='Students', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    """)
+    for trigger in STUDENT_SEARCH_TRIGGERS:
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+
+    conn.execute("""
+        CREATE TRIGGER trg_students_fts_insert AFTER INSERT ON Students
+        BEGIN
+            INSERT INTO students_fts (rowid, nom, prenom, matricule, classe)
+            VALUES (NEW.id, NEW.nom, NEW.prenom, NEW.matricule, NEW.classe);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER trg_students_fts_delete AFTER DELETE ON Students
+        BEGIN
+            INSERT INTO students_fts (students_fts, rowid, nom, prenom, matricule, classe)
+            VALUES ('delete', OLD.id, OLD.nom, OLD.prenom, OLD.matricule, OLD.classe);
+        END
+    """)
+    # Le pull réécrit toutes les colonnes de chaque ligne reçue : seules
+    # les lignes dont une colonne indexée change vraiment sont réindexées
+    conn.execute("""
+        CREATE TRIGGER trg_students_fts_update
+        AFTER UPDATE OF nom, prenom, matricule, classe ON Students
+        WHEN OLD.nom IS NOT NEW.nom OR OLD.prenom IS NOT NEW.prenom
+          OR OLD.matricule IS NOT NEW.matricule OR OLD.classe IS NOT NEW.classe
+        BEGIN
+            INSERT INTO students_fts (students_fts, rowid, nom, prenom, matricule, classe)
+            VALUES ('delete', OLD.id, OLD.nom, OLD.prenom, OLD.matricule, OLD.classe);
+            INSERT INTO students_fts (rowid, nom, prenom, matricule, classe)
+            VALUES (NEW.id, NEW.nom, NEW.prenom, NEW.matricule, NEW.classe);
+        END
+    """)
+
+    conn.execute("INSERT INTO students_fts (students_fts) VALUES ('rebuild')")
+    return True
+
+
+# Students à partir de la migration 6 : id INTEGER PRIMARY KEY en plus
+# (SCHEMA reste la structure des migrations 1 et 2, publiées)
+STUDENTS_V6 = """
+    CREATE TABLE IF NOT EXISTS "{name}" (
+        nom TEXT NOT NULL,
+        prenom TEXT NOT NULL,
+        matricule TEXT NOT NULL,
+        date_naissance TEXT NOT NULL,
+        sexe TEXT NOT NULL,
+        classe TEXT NOT NULL,
+        etablissement TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        id INTEGER PRIMARY KEY,
+        UNIQUE(matricule, etablissement)
+    )
+"""
+
+
+def migration_006_student_search_key(conn: sqlite3.Connection):
+    """
+    Index plein texte des élèves sur une clé stable
+    L'index de la migration 5 suivait le rowid implicite de Students, que
+    VACUUM peut renuméroter : Students reçoit id INTEGER PRIMARY KEY (alias
+    du rowid, jamais renuméroté) et l'index est recréé sur id, avec un
+    trigger de mise à jour qui compare OLD et NEW
+    """
+    if "id" not in get_local_columns(conn, "Students"):
+        kept = rebuild_table(conn, "Students", STUDENTS_V6)
+        print(f"🔧 Table Students mise à niveau ({kept} lignes)")
+        # Les index de Students sont partis avec l'ancienne table
+        migration_004_query_indexes(conn)
+
+    conn.execute("DROP TABLE IF EXISTS students_fts")
+    if not ensure_student_search(conn):
+        print("⚠️ FTS5 indisponible : recherche d'élèves par LIKE en attendant")
+
+
+# (version, description, fonction) - ne jamais modifier une migration publiée,
+# en ajouter une nouvelle à la fin
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "schéma de base", migration_001_base_schema),
+    (2, "mise à niveau des anciennes tables", migration_002_upgrade_legacy_tables),
+    (3, "tables de préférences", migration_003_preferences),
+    (4, "index des requêtes fréquentes", migration_004_query_indexes),
+    (5, "recherche plein texte des élèves", migration_005_student_search),
+    (6, "clé stable de l'index plein texte des élèves", migration_006_student_search_key),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Version du schéma appliquée à la base"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def run_migrations(conn: sqlite3.Connection) -> int:
+    """
+    Applique les migrations en attente, chacune dans sa transaction
+    (le schéma et user_version avancent ensemble ou pas du tout)
+    Retourne le nombre de migrations appliquées
+    """
+    current = get_schema_version(conn)
+    if current > SCHEMA_VERSION:
+        print(f"⚠️ Base en version {current}, application en version {SCHEMA_VERSION}")
+        return 0
+
+    applied = 0
+    for version, description, migrate in MIGRATIONS:
+        if version <= current:
+            continue
+
+        print(f"📦 Migration {version} : {description}")
+        conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            migrate(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied += 1
+
+    return applied
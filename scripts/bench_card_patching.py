@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark des modifications dans les listes de cartes
+Un admin modifie puis supprime un enseignant (Statistiques) et un élève
+(Gestion des élèves) dans des établissements de taille croissante :
+temps, accès à la base et octets envoyés par le clic qui écrit
+(Enregistrer, Supprimer), contre le rechargement complet de l'écran que
+faisaient les anciens gestionnaires
+La page Flet est réelle, seule la connexion au client est simulée
+"""
+
+import sys
+import time
+import asyncio
+import tempfile
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import flet as ft
+
+from bench_overlay import BenchConnection
+from bench_render_batching import find, top_dialog, walk
+from db_manager import db_connection, db_manager
+from sync_manager import sync_manager
+from Zeli_Dialog import OverlayManager, RenderBatcher
+import stats
+import Students
+
+DONNER = {"ident": "admin1", "role": "admin", "name": "Admin"}
+SIZES = [100, 400, 1600]
+CLASSES = ["6A", "6B", "5A", "5B", "4A", "3A"]
+
+
+def prepare(size):
+    """Un établissement avec size enseignants et size élèves"""
+    with db_connection() as conn:
+        conn.executemany(
+            "INSERT INTO User (identifiant, passwords, nom, prenom, email, telephone, etablissement, titre) "
+            "VALUES (?, 'x', ?, 'Prenom', 'a@b.c', '0', 'E', ?)",
+            [("admin1", "Admin", "admin")] + [(f"prof{i:04d}", f"Prof{i:04d}", "prof") for i in range(size)]
+        )
+        conn.executemany("INSERT INTO Teacher (ident, pass, matiere) VALUES (?, 'x', 'Maths')",
+                         [(f"prof{i:04d}",) for i in range(size)])
+        conn.executemany(
+            "INSERT INTO Students (nom, prenom, matricule, date_naissance, sexe, classe, etablissement) "
+            "VALUES (?, ?, ?, '01/01/2012', 'Masculin(M)', ?, 'E')",
+            [(f"Nom{i:04d}", f"Prenom{i}", f"M{i:04d}", CLASSES[i % len(CLASSES)]) for i in range(size)]
+        )
+        conn.commit()
+
+
+def db_accesses():
+    counters = db_manager.stats()
+    return counters["opened"] + counters["reused"]
+
+
+def card_button(page, tooltip, index=1):
+    """Bouton de la carte index (dans l'ordre d'affichage) de la liste du dialog principal"""
+    buttons = [c for c in walk(top_dialog(page)) if isinstance(c, ft.IconButton) and c.tooltip == tooltip]
+    return buttons[index]
+
+
+def open_edit(page):
+    """Modifier sur la carte 2, saisie d'un nouveau nom"""
+    card_button(page, "Modifier").on_click(None)
+    find(top_dialog(page), ft.TextField, lambda c: c.label in ("Nom", "Non")).value = "Renommé"
+
+
+def save(page):
+    find(top_dialog(page), ft.ElevatedButton, lambda c: c.text == "Enregistrer").on_click(None)
+
+
+def open_delete(page):
+    """Supprimer sur la carte 3"""
+    card_button(page, "Supprimer", index=2).on_click(None)
+
+
+def confirm(page):
+    find(top_dialog(page), ft.ElevatedButton, lambda c: c.text == "Supprimer").on_click(None)
+
+
+SCREENS = {
+    "Statistiques (enseignants)": stats.Stats,
+    "Gestion des élèves": Students.Gestion_Eleve,
+}
+
+
+def on_loop(page, action):
+    """Exécute action sur la boucle de la page, comme les effets temporisés (toasts)"""
+    async def run():
+        return action()
+    return asyncio.run_coroutine_threadsafe(run(), page.loop).result()
+
+
+def measure(page, action):
+    """(ms, accès base, octets) d'une interaction"""
+    batcher = RenderBatcher.for_page(page)
+    
+    def interaction():
+        accesses, sent = db_accesses(), batcher.stats["bytes"]
+        start = time.perf_counter()
+        with batcher.batch("mesure"):
+            action()
+        return ((time.perf_counter() - start) * 1000, db_accesses() - accesses, batcher.stats["bytes"] - sent)
+    return on_loop(page, interaction)
+
+
+def run(size):
+    """Coût par écran : rechargement complet (ancien) et modification/suppression sur place"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp, db_manager.use_path(Path(tmp) / "cards.db"):
+        prepare(size)
+        for screen, open_screen in SCREENS.items():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, daemon=True).start()
+            page = ft.Page(BenchConnection(), "bench", loop)
+            on_loop(page, page.update)
+            RenderBatcher.for_page(page).count_bytes()
+            on_loop(page, lambda: open_screen(page, DONNER))
+
+            def reload():
+                # Ancien gestionnaire : fermer l'écran et le rouvrir
+                OverlayManager.for_page(page).close(top_dialog(page))
+                open_screen(page, DONNER)
+
+            # Seul le clic qui écrit est mesuré (l'ouverture du formulaire ne change pas)
+            results[screen] = {"Rechargement de l'écran (avant)": measure(page, reload)}
+            on_loop(page, lambda: open_edit(page))
+            results[screen]["Modification sur place"] = measure(page, lambda: save(page))
+            on_loop(page, lambda: open_delete(page))
+            results[screen]["Suppression sur place"] = measure(page, lambda: confirm(page))
+            names = [c.value for c in walk(top_dialog(page)) if isinstance(c, ft.Text) and "Renommé" in str(c.value)]
+            results[screen]["renamed"] = len(names)
+            loop.call_soon_threadsafe(loop.stop)
+    return results
+
+
+def main():
+    """Point d'entrée"""
+    # Pas de push vers Supabase pendant la mesure
+    sync_manager.notify_local_change = lambda *tables: None
+
+    print("=" * 72)
+    print("MODIFICATION D'UNE CARTE - écran rechargé contre carte patchée")
+    print("=" * 72)
+
+    runs = {size: run(size) for size in SIZES}
+    failures = 0
+    for screen in SCREENS:
+        print(f"\n{screen}")
+        for step in ("Rechargement de l'écran (avant)", "Modification sur place", "Suppression sur place"):
+            line = "  ".join(f"{runs[size][screen][step][0]:7.1f} ms {runs[size][screen][step][1]:>5} accès "
+                             f"{runs[size][screen][step][2] / 1000:7.1f} Ko" for size in SIZES)
+            print(f"   {step:<32} {line}")
+        for size in SIZES:
+            _, edit_accesses, edit_bytes = runs[size][screen]["Modification sur place"]
+            _, delete_accesses, delete_bytes = runs[size][screen]["Suppression sur place"]
+            small = runs[SIZES[0]][screen]["Modification sur place"]
+            small_delete = runs[SIZES[0]][screen]["Suppression sur place"]
+            ok = (runs[size][screen]["renamed"] == 1
+                  and edit_accesses == small[1] and delete_accesses == small_delete[1]
+                  and edit_bytes < 2 * small[2] + 1000 and delete_bytes < 2 * small_delete[2] + 1000)
+            failures += not ok
+            if not ok:
+                print(f"❌ {screen}, {size} lignes : le coût dépend encore de la taille de la liste")
+    print(f"\n   (colonnes : {', '.join(f'{size} lignes' for size in SIZES)})")
+
+    if failures:
+        return 1
+    print("✅ Modification et suppression au même coût quelle que soit la taille de l'établissement")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de contention SQLite : un écrivain de sync + des lecteurs d'interface
+L'écrivain applique de gros lots Notes (comme un pull) pendant que des
+threads font les petites lectures des dialogues ; compare les profils
+de PRAGMA de db_manager (journal de rollback contre WAL)
+"""
+
+import sys
+import time
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import db_manager as dbm
+from db_manager import db_manager, db_connection
+from sync_store import store_remote_rows
+from bench_sync_upsert import make_notes
+
+NB_BATCHES = 4
+BATCH_ROWS = 25000
+NB_READERS = 3
+PROFILES = ["legacy", "wal"]
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def run(batches):
+    """Écrivain + lecteurs sur la base courante ; retourne les mesures"""
+    stop = threading.Event()
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def reader(index):
+        # Lookup indexé, comme check_note_exists
+        key = (f"M{index:06d}", "Mathématiques", "6e0")
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                with db_connection() as conn:
+                    conn.execute(
+                        "SELECT * FROM Notes WHERE matricule = ? AND matiere = ? AND classe = ?", key
+                    ).fetchall()
+            except sqlite3.OperationalError as e:
+                with lock:
+                    errors.append(str(e))
+            with lock:
+                latencies.append(time.perf_counter() - start)
+            time.sleep(0.002)
+
+    readers = [threading.Thread(target=reader, args=(i,)) for i in range(NB_READERS)]
+    for thread in readers:
+        thread.start()
+
+    start = time.perf_counter()
+    for rows in batches:
+        with db_manager.writer() as conn:
+            store_remote_rows(conn, "Notes", "E", rows)
+    write_time = time.perf_counter() - start
+    db_manager.checkpoint()
+
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    return {
+        "write": write_time,
+        "reads": len(latencies),
+        "p50": percentile(latencies, 0.50) * 1000,
+        "p95": percentile(latencies, 0.95) * 1000,
+        "max": max(latencies) * 1000 if latencies else 0.0,
+        "errors": len(errors),
+    }
+
+
+def main():
+    """Point d'entrée"""
+    rows = [{k: v for k, v in row.items() if k != "id"} for row in make_notes(NB_BATCHES * BATCH_ROWS)]
+    batches = [rows[i:i + BATCH_ROWS] for i in range(0, len(rows), BATCH_ROWS)]
+
+    print("=" * 72)
+    print(f"CONTENTION SQLITE - {len(rows):,} lignes en {NB_BATCHES} lots, {NB_READERS} lecteurs")
+    print("=" * 72)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for profile in PROFILES:
+            # Base neuve par profil (les PRAGMA sont appliqués à l'ouverture)
+            dbm.DB_PRAGMA_PROFILE = profile
+            with db_manager.use_path(Path(tmp) / f"{profile}.db"):
+                results[profile] = r = run(batches)
+            print(f"   {profile:<8} écriture {r['write']:5.2f} s | {r['reads']:>6} lectures  "
+                  f"p50 {r['p50']:6.2f} ms  p95 {r['p95']:7.2f} ms  max {r['max']:7.1f} ms  "
+                  f"verrous {r['errors']}")
+
+    if results["wal"]["errors"]:
+        print("❌ Des lectures ont échoué en WAL")
+        return 1
+
+    print(f"✅ Lecteurs : p95 {results['legacy']['p95']:.1f} ms → {results['wal']['p95']:.1f} ms, "
+          f"max {results['legacy']['max']:.0f} ms → {results['wal']['max']:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de la navigation dans la saisie des notes
+Un enseignant passe d'une classe à l'autre avec « Retour » (40 classes
+de 30 élèves) : accès à la base et temps de chaque étape. La première
+visite construit la vue (c'était le coût de chaque « Retour » avant le
+cache), les suivantes la réaffichent ; une écriture de notes ne fait
+reconstruire que la liste de sa classe et la grille, une écriture locale
+dans Students (sync_manager.notify_local_change) invalide les vues
+La page Flet est réelle, seule la connexion au client est simulée
+"""
+
+import sys
+import time
+import asyncio
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import flet as ft
+
+from bench_overlay import BenchConnection
+from bench_render_batching import find, top_dialog
+from db_manager import db_connection, db_manager
+from sync_manager import sync_manager
+import Note
+
+DONNER = {"ident": "prof1", "role": "prof", "pass": "x", "name": "Prof"}
+NB_CLASSES = 40
+NB_STUDENTS = 30
+
+
+def prepare():
+    """Un enseignant de Maths, 40 classes de 30 élèves, des notes déjà saisies"""
+    with db_connection() as conn:
+        conn.execute(
+            "INSERT INTO User (identifiant, passwords, nom, prenom, email, telephone, etablissement, titre) "
+            "VALUES ('prof1', 'x', 'Nom', 'Prenom', 'a@b.c', '0', 'E', 'prof')"
+        )
+        conn.execute("INSERT INTO Teacher (ident, pass, matiere) VALUES ('prof1', 'x', 'Maths')")
+        for k in range(NB_CLASSES):
+            classe = f"C{k:02d}"
+            conn.executemany(
+                "INSERT INTO Students (nom, prenom, matricule, date_naissance, sexe, classe, etablissement) "
+                "VALUES (?, ?, ?, '01/01/2012', 'Masculin(M)', ?, 'E')",
+                [(f"Nom{i:02d}", f"Prenom{i}", f"{classe}-{i}", classe) for i in range(NB_STUDENTS)]
+            )
+            conn.executemany(
+                "INSERT INTO Notes (classe, matricule, matiere, coefficient, note_interrogation, "
+                "note_devoir, note_composition) VALUES (?, ?, 'Maths', '2', '10', '10', '10')",
+                [(classe, f"{classe}-{i}") for i in range(k % NB_STUDENTS)]
+            )
+        conn.commit()
+
+
+def add_student(classe):
+    """Ajout d'un élève par un autre écran (écriture locale, commit puis notification)"""
+    with db_connection() as conn:
+        conn.execute(
+            "INSERT INTO Students (nom, prenom, matricule, date_naissance, sexe, classe, etablissement) "
+            "VALUES ('Nouveau', 'Eleve', ?, '01/01/2012', 'Masculin(M)', ?, 'E')",
+            (f"{classe}-new", classe)
+        )
+        conn.commit()
+    sync_manager.notify_local_change("Students")
+
+
+def db_accesses():
+    stats = db_manager.stats()
+    return stats["opened"] + stats["reused"]
+
+
+def main():
+    """Point d'entrée"""
+    # Pas de push vers Supabase pendant la mesure
+    sync_manager.push_pending = lambda: None
+
+    with tempfile.TemporaryDirectory() as tmp, db_manager.use_path(Path(tmp) / "grading.db"):
+        prepare()
+        page = ft.Page(BenchConnection(), "bench", asyncio.new_event_loop())
+        page.update()
+
+        def open_class(classe):
+            grid = find(top_dialog(page), ft.GridView)
+            card = next(c for c in grid.controls if find(c, ft.Text).value == classe)
+            card.on_click(None)
+
+        def back():
+            find(top_dialog(page), ft.TextButton, lambda c: c.text == "Retour").on_click(None)
+
+        def close():
+            find(top_dialog(page), ft.TextButton, lambda c: c.text == "Fermer").on_click(None)
+
+        # (étape, action, doit réutiliser une vue construite)
+        steps = [
+            ("Ouverture de la saisie", lambda: Note.Saisie_Notes(page, DONNER), False),
+            ("Classe C05", lambda: open_class("C05"), False),
+            ("Retour", back, True),
+            ("Classe C12", lambda: open_class("C12"), False),
+            ("Retour", back, True),
+            ("Classe C05 (déjà vue)", lambda: open_class("C05"), True),
+            ("Retour", back, True),
+            ("Fermer puis rouvrir la saisie", lambda: (close(), Note.Saisie_Notes(page, DONNER)), True),
+            ("Notes écrites en C05", lambda: Note.invalidate_grades("C05", "Maths"), True),
+            ("Classe C12 (non concernée)", lambda: open_class("C12"), True),
+            ("Retour (grille périmée)", back, False),
+            ("Classe C05 (reconstruite)", lambda: open_class("C05"), False),
+            ("Retour", back, True),
+            ("Élève ajouté en C12 (autre écran)", lambda: add_student("C12"), False),
+            ("Classe C12 (reconstruite)", lambda: open_class("C12"), False),
+            ("Retour", back, True),
+        ]
+
+        print("=" * 72)
+        print(f"NAVIGATION - {NB_CLASSES} classes de {NB_STUDENTS} élèves")
+        print("=" * 72)
+
+        failures = 0
+        for name, action, cached in steps:
+            accesses = db_accesses()
+            start = time.perf_counter()
+            action()
+            ms = (time.perf_counter() - start) * 1000
+            accesses = db_accesses() - accesses
+            ok = (accesses == 0) if cached else (accesses > 0)
+            failures += not ok
+            print(f"{'✅' if ok else '❌'} {name:<32} {accesses:>2} accès base {ms:8.2f} ms")
+
+    if failures:
+        print(f"❌ {failures} étape(s) inattendue(s)")
+        return 1
+    print("✅ Allers-retours sans requête ; une écriture ne reconstruit que ce qu'elle touche")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de page.overlay sur une longue session
+Une journée de saisie simulée (écrans ouverts et refermés avec alertes,
+chargements et confirmations) : coût d'un page.update() au fil de la
+session avec OverlayManager, contre l'ancien comportement (dialogs
+seulement passés à open = False, jamais retirés)
+La page Flet est réelle, seule la connexion au client est simulée
+"""
+
+import sys
+import json
+import time
+import asyncio
+import itertools
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import flet as ft
+try:
+    from flet.core.connection import Connection
+    from flet.core.protocol import CommandEncoder, PageCommandResponsePayload, PageCommandsBatchResponsePayload
+except ImportError:
+    # flet < 0.25
+    from flet_core.connection import Connection
+    from flet_core.protocol import CommandEncoder, PageCommandResponsePayload, PageCommandsBatchResponsePayload
+
+from Zeli_Dialog import OverlayManager, ZeliDialog2
+
+NB_SCREENS = 100
+WINDOW = 20
+CARDS_PER_SCREEN = 20
+
+
+class BenchConnection(Connection):
+    """Connexion sans client : attribue les identifiants et mesure les octets envoyés"""
+
+    def __init__(self):
+        super().__init__()
+        self.ids = itertools.count(1)
+        self.sent_bytes = 0
+
+    def send_command(self, session_id, command):
+        return PageCommandResponsePayload(result="", error="")
+
+    def send_commands(self, session_id, commands):
+        self.sent_bytes += len(json.dumps(commands, cls=CommandEncoder))
+        results = [" ".join(f"_{next(self.ids)}" for _ in c.commands)
+                   for c in commands if c.name in ("add", "get")]
+        return PageCommandsBatchResponsePayload(results=results, error="")
+
+
+class LegacyOverlay(OverlayManager):
+    """Ancien comportement : fermer = open = False, rien n'est retiré ni réutilisé"""
+
+    def close(self, dialog):
+        dialog.open = False
+        self.page.update()
+
+    def pooled(self, kind):
+        return None
+
+    def prune(self):
+        pass
+
+
+def open_screen(page):
+    """Un écran type : liste de cartes, alerte, chargement, confirmation"""
+    Dialog = ZeliDialog2(page)
+    main_dialog = Dialog.custom_dialog(
+        title="Liste",
+        content=ft.Column([
+            ft.Container(content=ft.Column([ft.Text(f"Élève {i}"), ft.Text("Classe 6A")]))
+            for i in range(CARDS_PER_SCREEN)
+        ]),
+        actions=[ft.TextButton("Fermer")],
+    )
+    alert = Dialog.alert_dialog(title="Notification", message="Note enregistrée", type="success")
+    Dialog._close_and_callback(alert, None)
+    loading = Dialog.loading_dialog(message="Synchronisation")
+    Dialog.close_dialog(loading)
+    confirm = Dialog.confirm_dialog("Suppression", "Confirmer ?", on_confirm=lambda: None)
+    Dialog._close_and_callback(confirm, None)
+    Dialog.close_dialog(main_dialog)
+
+
+def run(manager_class):
+    """Session complète ; retourne le coût médian de page.update() par fenêtre d'écrans"""
+    conn = BenchConnection()
+    page = ft.Page(conn, "bench", asyncio.new_event_loop())
+    page.update()
+    OverlayManager._managers[page] = manager_class(page)
+
+    windows = []
+    durations = []
+    for screen in range(1, NB_SCREENS + 1):
+        open_screen(page)
+        start = time.perf_counter()
+        page.update()
+        durations.append(time.perf_counter() - start)
+        if screen % WINDOW == 0:
+            durations.sort()
+            windows.append(durations[len(durations) // 2] * 1000)
+            durations = []
+    return windows, len(page.overlay), conn.sent_bytes, OverlayManager._managers[page].stats
+
+
+def stack_dialogs(count):
+    """Dialogs empilés sans être fermés ; retourne le nombre encore ouverts"""
+    page = ft.Page(BenchConnection(), "bench", asyncio.new_event_loop())
+    page.update()
+    Dialog = ZeliDialog2(page)
+    stacked = [Dialog.custom_dialog(title=f"Niveau {i}", content=ft.Text("..."))
+               for i in range(count)]
+    return sum(1 for dialog in stacked if dialog.open and dialog in page.overlay)
+
+
+def main():
+    """Point d'entrée"""
+    print("=" * 72)
+    print(f"OVERLAY - {NB_SCREENS} écrans ouverts puis fermés, médiane par tranche de {WINDOW}")
+    print("=" * 72)
+
+    legacy, legacy_size, legacy_bytes, _ = run(LegacyOverlay)
+    managed, managed_size, managed_bytes, stats = run(OverlayManager)
+
+    print(f"{'écrans':>8} {'avant (ms)':>12} {'après (ms)':>12}")
+    for i, (old, new) in enumerate(zip(legacy, managed), start=1):
+        print(f"{i * WINDOW:>8} {old:>12.3f} {new:>12.3f}")
+    print(f"   Overlay final : {legacy_size} contrôles avant, {managed_size} après")
+    print(f"   Octets envoyés : {legacy_bytes / 1e6:.1f} Mo avant, {managed_bytes / 1e6:.1f} Mo après")
+    print(f"   Dialogs : {stats['shown']} affichés, {stats['reused']} réutilisés, {stats['removed']} retirés")
+
+    growth = managed[-1] / managed[0]
+    if managed_size > OverlayManager.MAX_OVERLAY or growth > 2:
+        print(f"❌ Le coût de page.update() augmente encore (x{growth:.1f}, overlay {managed_size})")
+        return 1
+
+    # Au-delà du plafond, aucun dialog ouvert n'est fermé d'office
+    stacked = OverlayManager.MAX_OVERLAY + 5
+    if stack_dialogs(stacked) != stacked:
+        print("❌ Des dialogs ouverts ont été retirés de l'overlay")
+        return 1
+    print(f"✅ page.update() stable sur la session (x{growth:.1f}), "
+          f"{legacy[-1] / managed[-1]:.0f} fois moins cher qu'avant en fin de session")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
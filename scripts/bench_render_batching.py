@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark du regroupement des mises à jour (RenderBatcher)
+Clics réels dans Gestion_Eleve (suppression confirmée, filtre de classe,
+enregistrement d'un formulaire incomplet) sur une base synthétique :
+mises à jour demandées, allers-retours vers le client et octets envoyés,
+avec et sans regroupement
+La page Flet est réelle, seule la connexion au client est simulée
+"""
+
+import sys
+import asyncio
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import flet as ft
+
+from bench_overlay import BenchConnection
+from db_manager import db_connection, db_manager
+from sync_manager import sync_manager
+from Zeli_Dialog import RenderBatcher
+import Students
+
+DONNER = {"ident": "admin1", "role": "admin", "name": "Admin"}
+CLASSES = ["6A", "6B", "5A"]
+
+
+def prepare():
+    """Un établissement, trois classes, une trentaine d'élèves"""
+    with db_connection() as conn:
+        conn.execute(
+            "INSERT INTO User (identifiant, passwords, nom, prenom, email, telephone, etablissement, titre) "
+            "VALUES ('admin1', 'x', 'Nom', 'Prenom', 'a@b.c', '0', 'E', 'admin')"
+        )
+        conn.executemany("INSERT INTO Class (nom, etablissement) VALUES (?, 'E')", [(c,) for c in CLASSES])
+        conn.executemany(
+            "INSERT INTO Students (nom, prenom, matricule, date_naissance, sexe, classe, etablissement) "
+            "VALUES (?, ?, ?, '01/01/2012', 'Masculin(M)', ?, 'E')",
+            [(f"Nom{i:02d}", f"Prenom{i}", f"M{i:03d}", CLASSES[i % 3]) for i in range(30)]
+        )
+        conn.commit()
+
+
+def walk(control):
+    """Le contrôle et tous ses descendants"""
+    yield control
+    for attr in ("content", "title", "controls", "actions"):
+        child = getattr(control, attr, None)
+        children = child if isinstance(child, list) else [child]
+        for c in children:
+            if isinstance(c, ft.Control):
+                yield from walk(c)
+
+
+def find(root, kind, predicate=lambda c: True):
+    return next(c for c in walk(root) if isinstance(c, kind) and predicate(c))
+
+
+def top_dialog(page):
+    return [c for c in page.overlay if isinstance(c, ft.AlertDialog) and c.open][-1]
+
+
+def interactions(page):
+    """(nom, action) : chaque action simule un clic de l'utilisateur"""
+    def open_delete():
+        find(top_dialog(page), ft.IconButton, lambda c: c.tooltip == "Supprimer").on_click(None)
+
+    def confirm_delete():
+        find(top_dialog(page), ft.ElevatedButton, lambda c: c.text == "Supprimer").on_click(None)
+
+    def filter_class():
+        dropdown = find(top_dialog(page), ft.Dropdown)
+        dropdown.value = CLASSES[1]
+        dropdown.on_change(None)
+
+    def open_form():
+        find(top_dialog(page), ft.ElevatedButton,
+             lambda c: isinstance(c.content, ft.Row) and "Ajouter" in c.content.controls[1].value).on_click(None)
+
+    def save_incomplete_form():
+        find(top_dialog(page), ft.ElevatedButton, lambda c: c.text == "Enregistrer").on_click(None)
+
+    return [
+        ("Demande de suppression", open_delete),
+        ("Suppression confirmée (fermetures + liste rechargée)", confirm_delete),
+        ("Filtre de classe", filter_class),
+        ("Ouverture du formulaire d'ajout", open_form),
+        ("Enregistrement d'un formulaire incomplet", save_incomplete_form),
+    ]
+
+
+def measure(enabled):
+    """Coût de chaque interaction, regroupement activé ou non"""
+    RenderBatcher.enabled = enabled
+    with tempfile.TemporaryDirectory() as tmp, db_manager.use_path(Path(tmp) / "render.db"):
+        prepare()
+        page = ft.Page(BenchConnection(), "bench", asyncio.new_event_loop())
+        page.update()
+        batcher = RenderBatcher.for_page(page)
+        batcher.count_bytes()
+        Students.Gestion_Eleve(page, DONNER)
+
+        results = []
+        for name, action in interactions(page):
+            before = dict(batcher.stats)
+            action()
+            results.append((name, {k: batcher.stats[k] - before[k] for k in ("requested", "sent", "bytes")}))
+    return results
+
+
+def main():
+    """Point d'entrée"""
+    # Pas de push vers Supabase pendant la mesure
+    sync_manager.notify_local_change = lambda *tables: None
+
+    print("=" * 72)
+    print("MISES À JOUR PAR INTERACTION - Gestion des élèves")
+    print("=" * 72)
+
+    without = measure(enabled=False)
+    batched = measure(enabled=True)
+
+    failures = 0
+    for (name, old), (_, new) in zip(without, batched):
+        ok = new["sent"] == 1
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {name}")
+        print(f"      sans regroupement : {old['requested']:>3} demandées, {old['sent']:>3} envois, {old['bytes']:>7} octets")
+        print(f"      avec regroupement : {new['requested']:>3} demandées, {new['sent']:>3} envois, {new['bytes']:>7} octets")
+
+    if failures:
+        print(f"❌ {failures} interaction(s) avec plusieurs allers-retours")
+        return 1
+    total_old = sum(old["sent"] for _, old in without)
+    total_new = sum(new["sent"] for _, new in batched)
+    print(f"✅ Un seul aller-retour par interaction ({total_old} → {total_new} au total)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
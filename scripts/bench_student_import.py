@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de l'import d'élèves
+Rentrée de 1 500 élèves : import d'un CSV (une transaction, une sync)
+contre l'ajout un par un de add_student (SELECT, INSERT, commit et sync
+par élève) ; le fichier contient des lignes invalides à rapporter
+"""
+
+import csv
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from db_manager import db_connection, db_manager
+from sync_manager import sync_manager
+from student_import import import_students
+
+NB_STUDENTS = 1_500
+CLASSES = ["6A", "6B", "5A", "5B", "4A", "3A"]
+# Lignes invalides : numéro de ligne du fichier → motif attendu
+BAD_ROWS = {
+    10: ["Sans", "Classe", "X9", "01/01/2012", "M", "2Z"],
+    20: ["", "Vide", "X10", "01/01/2012", "F", "6A"],
+    30: ["Date", "Fausse", "X11", "2012/31/31", "F", "6A"],
+    40: ["Double", "Matricule", "M0001", "01/01/2012", "M", "6A"],
+    50: ["Deja", "Inscrit", "OLD1", "01/01/2012", "M", "6A"],
+}
+
+
+def write_csv(path):
+    """CSV « Excel français » (séparateur ;) avec des lignes invalides"""
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(["Nom", "Prénom", "Matricule", "Date de naissance", "Sexe", "Classe"])
+        line, i = 2, 0
+        while i < NB_STUDENTS:
+            if line in BAD_ROWS:
+                writer.writerow(BAD_ROWS[line])
+            else:
+                writer.writerow([f"Nom{i}", f"Prénom{i}", f"M{i:04d}", "15/09/2012", "MF"[i % 2],
+                                 CLASSES[i % len(CLASSES)]])
+                i += 1
+            line += 1
+
+
+def prepare():
+    """Classes et un élève déjà inscrit"""
+    with db_connection() as conn:
+        conn.executemany("INSERT INTO Class (nom, etablissement) VALUES (?, 'E')", [(c,) for c in CLASSES])
+        conn.execute("INSERT INTO Students (nom, prenom, matricule, date_naissance, sexe, classe, etablissement) "
+                     "VALUES ('Ancien', 'Eleve', 'OLD1', '01/01/2011', 'Masculin(M)', '6A', 'E')")
+        conn.commit()
+
+
+def one_by_one():
+    """Ancien chemin : un aller-retour complet par élève"""
+    for i in range(NB_STUDENTS):
+        with db_connection() as conn:
+            values = (f"Nom{i}", f"Prénom{i}", f"M{i:04d}", "15/09/2012", "Masculin(M)",
+                      CLASSES[i % len(CLASSES)], "E")
+            if conn.execute(
+                "SELECT * FROM Students WHERE etablissement = ? AND matricule = ? AND nom = ? AND prenom = ?",
+                ("E", values[2], values[0], values[1])
+            ).fetchone():
+                continue
+            conn.execute("INSERT INTO Students (nom, prenom, matricule, date_naissance, sexe, classe, etablissement) "
+                         "VALUES (?, ?, ?, ?, ?, ?, ?)", values)
+            conn.commit()
+            sync_manager.notify_local_change()
+
+
+def count(sql):
+    with db_connection() as conn:
+        return conn.execute(sql).fetchone()[0]
+
+
+def main():
+    """Point d'entrée"""
+    # Compte les réveils de la sync sans pousser vers Supabase
+    syncs = []
+    sync_manager.notify_local_change = lambda *tables: syncs.append(1)
+
+    print("=" * 72)
+    print(f"IMPORT D'ÉLÈVES - {NB_STUDENTS:,} élèves")
+    print("=" * 72)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+
+        with db_manager.use_path(tmp / "one.db"):
+            prepare()
+            start = time.perf_counter()
+            one_by_one()
+            slow = time.perf_counter() - start
+        print(f"   Un par un   : {slow * 1000:8.0f} ms, {len(syncs):>5} sync(s) réveillée(s)")
+
+        csv_path = tmp / "rentree.csv"
+        write_csv(csv_path)
+        with db_manager.use_path(tmp / "bulk.db"):
+            prepare()
+            syncs.clear()
+            start = time.perf_counter()
+            report = import_students(csv_path, "E")
+            fast = time.perf_counter() - start
+            students = count("SELECT COUNT(*) FROM Students WHERE etablissement = 'E'")
+            journal = count("SELECT COUNT(*) FROM sync_changes WHERE table_name = 'Students'")
+        print(f"   Import CSV  : {fast * 1000:8.0f} ms, {len(syncs):>5} sync(s) réveillée(s)")
+        for line, message in report.errors:
+            print(f"      ligne {line} : {message}")
+
+    failures = []
+    if report.imported != NB_STUDENTS or students != NB_STUDENTS + 1:
+        failures.append(f"{report.imported} importés, {students} en base")
+    if [line for line, _ in report.errors] != sorted(BAD_ROWS):
+        failures.append("lignes rejetées inattendues")
+    if len(syncs) != 1:
+        failures.append(f"{len(syncs)} syncs au lieu d'une")
+    if journal < NB_STUDENTS:
+        failures.append(f"{journal} lignes journalisées pour la sync")
+
+    if failures:
+        print(f"❌ {' ; '.join(failures)}")
+        return 1
+    print(f"✅ {report.summary()} en {fast * 1000:.0f} ms (x{slow / fast:.0f}), une seule sync")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
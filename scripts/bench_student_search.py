@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de la recherche d'élèves
+Index plein texte students_fts (préfixes, sans accents) contre le repli
+LIKE sur un établissement synthétique de 10 000 élèves
+"""
+
+import sys
+import time
+import random
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from db_manager import db_manager, db_connection
+import data_access
+from data_access import search_students
+
+NB_STUDENTS = 10_000
+NB_RUNS = 50
+NOMS = ["Dupont", "Lefèvre", "Bérénger", "Gauthier", "Mbappé", "Kouassi", "Nguyễn", "Rousseau",
+        "Fabre", "Ézéchiel", "Traoré", "Ménard", "Lemaître", "Chevalier", "Diallo", "Bœuf"]
+PRENOMS = ["Hélène", "Éric", "Chloé", "Jérôme", "Noël", "Anaïs", "Loïc", "Zoé", "Mathéo",
+           "Inès", "François", "Léa", "Maël", "Aïcha", "Céline", "Raphaël"]
+
+# (saisie, nom attendu dans les résultats ou None)
+QUERIES = [
+    ("hel", "Hélène"),
+    ("helene lef", "Lefèvre"),
+    ("ÉRIC", "Éric"),
+    ("berenger chl", "Bérénger"),
+    ("M0042", None),
+    ("6e3 zoe", "Zoé"),
+]
+
+
+def populate(nb_students, seed=7):
+    """Établissement E avec des noms accentués, plus un second établissement"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(nb_students):
+        rows.append((
+            f"{rng.choice(NOMS)}{'' if i % 3 else ' ' + rng.choice(NOMS)}",
+            rng.choice(PRENOMS),
+            f"M{i:04d}",
+            "01/01/2012",
+            rng.choice("MF"),
+            f"6e{i % 8}",
+            "E" if i % 10 else "F",
+        ))
+    with db_connection() as conn:
+        conn.executemany(
+            "INSERT INTO Students (nom, prenom, matricule, date_naissance, sexe, classe, etablissement) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+        )
+        conn.commit()
+
+
+def timed(text):
+    """Médiane (ms) et résultats d'une recherche"""
+    durations = []
+    for _ in range(NB_RUNS):
+        start = time.perf_counter()
+        results = search_students("E", text)
+        durations.append(time.perf_counter() - start)
+    durations.sort()
+    return durations[len(durations) // 2] * 1000, results
+
+
+def main():
+    """Point d'entrée"""
+    with tempfile.TemporaryDirectory() as tmp, db_manager.use_path(Path(tmp) / "search.db"):
+        populate(NB_STUDENTS)
+
+        print("=" * 72)
+        print(f"RECHERCHE D'ÉLÈVES - {NB_STUDENTS:,} élèves, médiane sur {NB_RUNS} essais")
+        print("=" * 72)
+
+        fts = {}
+        failures = 0
+        for text, expected in QUERIES:
+            ms, results = timed(text)
+            fts[text] = ms
+            found = expected is None or any(expected in f"{r[0]} {r[1]}" for r in results)
+            wrong_school = any(r[6] != "E" for r in results)
+            ok = results and found and not wrong_school
+            failures += not ok
+            print(f"{'✅' if ok else '❌'} FTS5  {text!r:<16} {ms:6.2f} ms  {len(results):>3} résultats")
+
+        # Repli LIKE : même API sans la table d'index
+        with db_connection() as conn:
+            conn.execute("DROP TABLE students_fts")
+            conn.commit()
+        for text, _ in QUERIES:
+            ms, results = timed(text)
+            print(f"   LIKE  {text!r:<16} {ms:6.2f} ms  {len(results):>3} résultats (sensible aux accents)")
+
+    worst = max(fts.values())
+    if failures:
+        print(f"❌ {failures} recherche(s) sans le résultat attendu")
+        return 1
+    print(f"✅ Recherche plein texte : {worst:.2f} ms au pire")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
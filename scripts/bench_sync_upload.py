@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark du push vers PostgREST contre le stand-in local
+Compare un upsert par ligne à l'envoi par paquets (ChunkedUploader),
+avec une ligne invalide pour vérifier la bissection, puis compte les
+requêtes de suppression d'élèves (clé matricule + etablissement) et
+l'envoi hors ligne (pas de bissection, rien n'est marqué en échec)
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from supabase import create_client
+
+from config import SUPABASE_KEY
+from sync_upload import ChunkedUploader, DELETE_CHUNK_SIZE
+from postgrest_standin import start_standin
+from bench_sync_upsert import make_notes
+
+NB_ROWS = 1500
+LATENCY = 0.02
+BAD_VALUE = "NaN-invalide"
+ON_CONFLICT = "matricule,matiere,classe"
+NB_DELETED_STUDENTS = 300
+
+
+def make_items(nb_rows):
+    """Lignes Notes + ids de journal factices, dont une ligne rejetée"""
+    rows = [{k: v for k, v in row.items() if k != "id"} for row in make_notes(nb_rows)]
+    rows[nb_rows // 3]["note_devoir"] = BAD_VALUE
+    return [(row, [i]) for i, row in enumerate(rows)]
+
+
+def push_per_row(client, items):
+    """Ancien comportement : une requête par ligne"""
+    failed = 0
+    for row, _ in items:
+        try:
+            client.table("Notes").upsert(row, on_conflict=ON_CONFLICT).execute()
+        except Exception:
+            failed += 1
+    return failed
+
+
+def main():
+    """Point d'entrée"""
+    nb_rows = int(sys.argv[1]) if len(sys.argv) > 1 else NB_ROWS
+    items = make_items(nb_rows)
+
+    print("=" * 60)
+    print(f"BENCH PUSH POSTGREST - Notes ({nb_rows:,} lignes, latence {LATENCY * 1000:.0f} ms)")
+    print("=" * 60)
+
+    server, store, url = start_standin(latency=LATENCY, reject_value=BAD_VALUE)
+    client = create_client(url, SUPABASE_KEY)
+
+    try:
+        start = time.perf_counter()
+        failed = push_per_row(client, items)
+        elapsed = time.perf_counter() - start
+        print(f"   avant  {elapsed:7.2f} s  {store.requests:>5} requêtes  {failed} en échec")
+        per_row_count = len(store.tables.get("Notes", []))
+
+        store.tables.clear()
+        store.requests = 0
+
+        start = time.perf_counter()
+        result = ChunkedUploader(client).upsert("Notes", items, on_conflict=ON_CONFLICT)
+        elapsed = time.perf_counter() - start
+        print(f"   après  {elapsed:7.2f} s  {store.requests:>5} requêtes  {len(result.failed)} en échec")
+        chunked_count = len(store.tables.get("Notes", []))
+
+        # Suppressions : un établissement, une requête par paquet de matricules
+        store.tables["Students"] = [{"matricule": f"M{i:04d}", "etablissement": "E"}
+                                    for i in range(NB_DELETED_STUDENTS)]
+        store.requests = 0
+        keys = [({"matricule": f"M{i:04d}", "etablissement": "E"}, [i]) for i in range(NB_DELETED_STUDENTS)]
+        deleted = ChunkedUploader(client).delete_keys("Students", ["matricule", "etablissement"], keys)
+        delete_requests = store.requests
+        remaining = len(store.tables["Students"])
+        print(f"   suppression {NB_DELETED_STUDENTS} élèves : {delete_requests} requêtes")
+    finally:
+        server.shutdown()
+
+    if per_row_count != chunked_count or len(result.acknowledged) != nb_rows - 1:
+        print(f"❌ Résultats différents : {per_row_count} != {chunked_count}")
+        return 1
+
+    # Hors ligne (port fermé) : arrêt au premier paquet de chaque requête en vol
+    offline = ChunkedUploader(create_client("http://127.0.0.1:9", SUPABASE_KEY))
+    offline_result = offline.upsert("Notes", items, on_conflict=ON_CONFLICT)
+    print(f"   hors ligne  {offline_result.requests:>5} requêtes  {len(offline_result.failed)} en échec")
+    if (not offline_result.interrupted or offline_result.failed or offline_result.acknowledged
+            or offline_result.requests > offline.max_workers):
+        print("❌ Hors ligne : les paquets ont été coupés ou marqués en échec")
+        return 1
+
+    expected = -(-NB_DELETED_STUDENTS // DELETE_CHUNK_SIZE)
+    if delete_requests != expected or remaining or len(deleted.acknowledged) != NB_DELETED_STUDENTS:
+        print(f"❌ Suppression : {delete_requests} requêtes (attendu {expected}), {remaining} élèves restants")
+        return 1
+
+    print(f"✅ {chunked_count:,} lignes côté serveur, seule la ligne invalide est en échec")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
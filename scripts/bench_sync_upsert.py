@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de l'application locale d'un pull Supabase
+Compare l'ancien chemin ligne à ligne (SELECT puis UPDATE/INSERT)
+à l'upsert groupé (INSERT ... ON CONFLICT DO UPDATE + executemany)
+sur un jeu synthétique de la table Notes
+"""
+
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from db_manager import init_all_tables
+from sync_store import upsert_rows, upsert_rows_legacy
+
+NB_ROWS = 50_000
+MATIERES = ["Mathématiques", "Français", "Anglais", "SVT", "Physique", "Histoire"]
+
+
+def make_notes(nb_rows, seed=42):
+    """Génère des lignes Notes telles que renvoyées par Supabase"""
+    rng = random.Random(seed)
+    now = datetime.now().isoformat()
+    rows = []
+    for i in range(nb_rows):
+        matiere = MATIERES[i % len(MATIERES)]
+        rows.append({
+            "id": i + 1,
+            "classe": f"6e{(i // 600) % 10}",
+            "matricule": f"M{i // len(MATIERES):06d}",
+            "matiere": matiere,
+            "coefficient": "2",
+            "note_interrogation": f"{rng.uniform(0, 20):.2f}",
+            "note_devoir": f"{rng.uniform(0, 20):.2f}",
+            "note_composition": f"{rng.uniform(0, 20):.2f}",
+            "moyenne": f"{rng.uniform(0, 20):.2f}",
+            "date_saisie": now,
+            "periode": "Premier Trimestre",
+            "statut": "en_cours",
+            "date_verrouillage": None,
+            "created_at": now,
+            "updated_at": now,
+        })
+    return rows
+
+
+def run(label, apply_func, rows, db_path):
+    """Applique deux pulls successifs (insertion puis mise à jour)"""
+    conn = sqlite3.connect(db_path)
+    init_all_tables(conn)
+    results = []
+    try:
+        for phase in ("insert", "update"):
+            start = time.perf_counter()
+            apply_func(conn, "Notes", rows)
+            conn.commit()
+            elapsed = time.perf_counter() - start
+            results.append((phase, elapsed))
+        count = conn.execute("SELECT COUNT(*) FROM Notes").fetchone()[0]
+    finally:
+        conn.close()
+
+    for phase, elapsed in results:
+        print(f"   {label:<8} {phase:<7} {elapsed:7.2f} s  {len(rows) / elapsed:>10,.0f} lignes/s")
+    return count
+
+
+def main():
+    """Point d'entrée"""
+    nb_rows = int(sys.argv[1]) if len(sys.argv) > 1 else NB_ROWS
+
+    print("=" * 60)
+    print(f"BENCH UPSERT LOCAL - Notes ({nb_rows:,} lignes)")
+    print("=" * 60)
+
+    rows = [{k: v for k, v in row.items() if k != "id"} for row in make_notes(nb_rows)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_count = run("avant", upsert_rows_legacy, rows, str(Path(tmp) / "legacy.db"))
+        bulk_count = run("après", upsert_rows, rows, str(Path(tmp) / "bulk.db"))
+
+    if legacy_count != bulk_count:
+        print(f"❌ Résultats différents : {legacy_count} != {bulk_count}")
+        return 1
+
+    print(f"✅ {bulk_count:,} lignes identiques dans les deux bases")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark des toasts pendant une rafale d'erreurs
+Une sync qui échoue appelle error_toast en boucle : threads créés et
+page.update() envoyés avec le planificateur unique (ui_scheduler), contre
+l'ancien coût de show_toast (un thread qui dort et 4 page.update() par toast)
+La page Flet est réelle, seule la connexion au client est simulée
+"""
+
+import sys
+import time
+import asyncio
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import flet as ft
+
+from bench_overlay import BenchConnection
+from Zeli_Dialog import ZeliDialog2, ui_scheduler
+
+NB_ERRORS = 60          # erreurs de sync identiques (une par ligne rejetée)
+NB_DISTINCT = 12        # messages différents
+DURATION = 1
+
+
+class CountingConnection(BenchConnection):
+    """Compte les lots de commandes (un par page.update())"""
+
+    def __init__(self):
+        super().__init__()
+        self.updates = 0
+
+    def send_commands(self, session_id, commands):
+        self.updates += 1
+        return super().send_commands(session_id, commands)
+
+
+def main():
+    """Point d'entrée"""
+    conn = CountingConnection()
+    page = ft.Page(conn, "bench", asyncio.new_event_loop())
+    page.update()
+    Dialog = ZeliDialog2(page)
+    conn.updates = 0
+
+    print("=" * 72)
+    print(f"TOASTS - rafale de {NB_ERRORS + NB_DISTINCT} error_toast")
+    print("=" * 72)
+
+    threads_before = threading.active_count()
+    max_threads = threads_before
+    start = time.perf_counter()
+    for i in range(NB_ERRORS):
+        Dialog.error_toast("⚠️ Erreur sync: délai dépassé", duration=DURATION)
+        max_threads = max(max_threads, threading.active_count())
+    for i in range(NB_DISTINCT):
+        Dialog.error_toast(f"Erreur d'ajout: ligne {i}", duration=DURATION)
+        max_threads = max(max_threads, threading.active_count())
+    burst_ms = (time.perf_counter() - start) * 1000
+
+    time.sleep(ui_scheduler.TICK * 3)
+    visible = len(Dialog.toast_container.controls)
+    time.sleep(DURATION + 1)
+    remaining = len(Dialog.toast_container.controls)
+
+    calls = NB_ERRORS + NB_DISTINCT
+    print(f"   Avant : {calls} threads, {calls * 4} page.update()")
+    print(f"   Après : {max_threads - threads_before} thread(s) ajouté(s), {conn.updates} page.update() "
+          f"({ui_scheduler.stats['scheduled']} effets planifiés)")
+    print(f"   Rafale traitée en {burst_ms:.1f} ms, {visible} toast(s) empilés, "
+          f"{remaining} après expiration")
+
+    if max_threads - threads_before > 1 or remaining or conn.updates > calls:
+        print("❌ Les toasts ne sont pas regroupés")
+        return 1
+    print(f"✅ Un seul thread, {calls * 4 / conn.updates:.0f} fois moins de page.update()")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de non-régression des plans de requêtes
+Inventaire des requêtes fréquentes des écrans (Note.py, Students.py,
+stats.py, main.py, import d'élèves) passé à EXPLAIN QUERY PLAN sur une base migrée :
+échoue si l'une d'elles parcourt une table entière ou trie en mémoire
+"""
+
+import sys
+import sqlite3
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from db_manager import init_all_tables
+from data_access import CLASS_OVERVIEW_SQL, CLASS_ROSTER_SQL, STUDENT_SEARCH_SQL, build_student_page_sql
+
+# (origine, requête, paramètres)
+QUERY_INVENTORY = [
+    ("main.find_local_user",
+     "SELECT * FROM User WHERE identifiant = ?", ("prof",)),
+    ("session.SessionContext (User)",
+     "SELECT etablissement FROM User WHERE identifiant = ? AND titre = ?", ("prof", "prof")),
+    ("session.SessionContext (Teacher)",
+     "SELECT matiere FROM Teacher WHERE ident = ?", ("prof",)),
+    ("session.SessionContext (préférences)",
+     "SELECT theme, language FROM User_Preferences WHERE user_id = ?", ("prof",)),
+    ("data_access.get_class_overview",
+     CLASS_OVERVIEW_SQL, ("Maths", "E")),
+    ("data_access.get_class_roster",
+     CLASS_ROSTER_SQL, ("Maths", "E", "6A")),
+    ("Note.check_note_exists",
+     "SELECT * FROM Notes WHERE matricule = ? AND matiere = ? AND classe = ?",
+     ("M1", "Maths", "6A")),
+    ("data_access.get_student_page",
+     build_student_page_sql(False), ("E", "6A", "a", "b", 10, 50)),
+    ("data_access.get_student_page (classe)",
+     build_student_page_sql(True), ("E", "6A", "a", "b", 10, 50)),
+    ("data_access.search_students",
+     STUDENT_SEARCH_SQL.format(classe_filter=""), ('"hel"*', "E", 50)),
+    ("data_access.count_students",
+     "SELECT COUNT(*) FROM Students WHERE etablissement = ? AND classe = ?", ("E", "6A")),
+    ("data_access.get_student_classes",
+     "SELECT classe FROM Students WHERE etablissement = ? GROUP BY classe ORDER BY classe", ("E",)),
+    ("Students.add_student",
+     "SELECT * FROM Class WHERE etablissement = ?", ("E",)),
+    ("Students.save_student",
+     "SELECT * FROM Students WHERE etablissement = ? AND matricule = ? AND nom = ? AND prenom = ?",
+     ("E", "M1", "a", "b")),
+    ("Students.save_changes",
+     "UPDATE Students SET nom = ? WHERE matricule = ? AND etablissement = ?", ("a", "M1", "E")),
+    ("student_import.import_students (Class)",
+     "SELECT nom FROM Class WHERE etablissement = ?", ("E",)),
+    ("student_import.existing_matricules",
+     "SELECT matricule FROM Students WHERE etablissement = ? AND matricule IN (?, ?, ?)",
+     ("E", "M1", "M2", "M3")),
+    ("stats.load_all_admins",
+     "SELECT * FROM User WHERE titre = 'admin'", ()),
+    ("stats.load_school_teachers",
+     "SELECT * FROM User WHERE etablissement = ? AND titre = 'prof'", ("E",)),
+    ("stats.execute_delete_school (Notes)",
+     "DELETE FROM Notes WHERE matricule IN (SELECT matricule FROM Students WHERE etablissement = ?)",
+     ("E",)),
+    ("stats.execute_delete_school (Teacher)",
+     "DELETE FROM Teacher WHERE ident IN (SELECT identifiant FROM User WHERE etablissement = ?)",
+     ("E",)),
+    ("stats.execute_delete_school (Matieres)",
+     "DELETE FROM Matieres WHERE etablissement = ?", ("E",)),
+    ("stats.execute_delete_school (Class)",
+     "DELETE FROM Class WHERE etablissement = ?", ("E",)),
+    ("stats.execute_delete_school (User)",
+     "DELETE FROM User WHERE etablissement = ?", ("E",)),
+]
+
+
+def plan_problems(conn, query, params):
+    """Lignes du plan qui trahissent un parcours complet ou un tri temporaire"""
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+    # Recherche FTS5 (MATCH, ":M" dans le plan) : index plein texte, et le tri
+    # par pertinence ne porte que sur les lignes trouvées
+    fts_match = any("VIRTUAL TABLE INDEX" in row[-1] and ":M" in row[-1] for row in plan)
+    problems = []
+    for row in plan:
+        detail = row[-1]
+        full_scan = (detail.startswith("SCAN ") and "CONSTANT ROW" not in detail
+                     and not ("VIRTUAL TABLE INDEX" in detail and ":M" in detail))
+        temp_sort = "USE TEMP B-TREE" in detail and not fts_match
+        if full_scan or temp_sort:
+            problems.append(detail)
+    return plan, problems
+
+
+def main():
+    """Point d'entrée"""
+    conn = sqlite3.connect(":memory:")
+    init_all_tables(conn)
+
+    print("=" * 72)
+    print(f"PLANS DE REQUÊTES - {len(QUERY_INVENTORY)} requêtes")
+    print("=" * 72)
+
+    failures = 0
+    for origin, query, params in QUERY_INVENTORY:
+        plan, problems = plan_problems(conn, query, params)
+        status = "❌" if problems else "✅"
+        print(f"{status} {origin}")
+        for row in plan:
+            print(f"      {row[-1]}")
+        failures += bool(problems)
+
+    conn.close()
+
+    if failures:
+        print(f"❌ {failures} requête(s) sans index adapté")
+        return 1
+
+    print("✅ Aucune requête ne parcourt une table entière")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mesure des ouvertures de connexions SQLite pendant un rendu de dialogue
+Reproduit le schéma des helpers d'interface (Return, get_teacher_subject,
+check_note_exists : get_db_connection() → requête → close()) sans pool
+puis avec le pool par thread de DatabaseManager
+"""
+
+import sys
+import time
+import tempfile
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import db_manager as dbm
+from db_manager import db_manager, get_db_connection
+
+NB_STUDENTS = 40
+NB_RENDERS = 25
+NB_THREADS = 2
+
+
+def lookup(query, params=()):
+    """Un helper d'interface typique"""
+    con = None
+    try:
+        con = get_db_connection()
+        cur = con.cursor()
+        cur.execute(query, params)
+        return cur.fetchall()
+    finally:
+        if con:
+            con.close()
+
+
+def render_student_list():
+    """Liste d'une classe : 2 lookups généraux + 2 par élève"""
+    lookup("SELECT etablissement FROM User WHERE identifiant = ?", ("prof",))
+    lookup("SELECT matiere FROM Teacher WHERE ident = ?", ("prof",))
+    for i in range(NB_STUDENTS):
+        lookup("SELECT 1 FROM Notes WHERE matricule = ? AND matiere = ? AND classe = ?",
+               (f"M{i}", "Maths", "6A"))
+        lookup("SELECT etablissement FROM User WHERE identifiant = ?", ("prof",))
+
+
+def run(pool_size):
+    """Rendus répétés sur NB_THREADS threads ; retourne (durée, compteurs)"""
+    dbm.DB_POOL_SIZE = pool_size
+    before = db_manager.stats()
+
+    def worker():
+        for _ in range(NB_RENDERS):
+            render_student_list()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(NB_THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    after = db_manager.stats()
+    return elapsed, {k: after[k] - before[k] for k in after}
+
+
+def main():
+    """Point d'entrée"""
+    with tempfile.TemporaryDirectory() as tmp, db_manager.use_path(Path(tmp) / "churn.db"):
+        lookups = NB_THREADS * NB_RENDERS * (2 + 2 * NB_STUDENTS)
+        print("=" * 60)
+        print(f"CONNEXIONS SQLITE - {lookups:,} lookups ({NB_THREADS} threads)")
+        print("=" * 60)
+
+        results = {}
+        for label, pool_size in (("sans pool", 0), ("avec pool", dbm.DB_POOL_SIZE)):
+            elapsed, counts = run(pool_size)
+            results[label] = counts
+            print(f"   {label:<10} {elapsed:6.2f} s  ouvertes {counts['opened']:>5}  "
+                  f"réutilisées {counts['reused']:>5}  fermées {counts['closed']:>5}")
+
+        # Double close() : la connexion reste dans le pool, utilisable
+        before = db_manager.stats()
+        con = get_db_connection()
+        con.close()
+        con.close()
+        get_db_connection().execute("SELECT 1").fetchone()
+        double_close = db_manager.stats()["closed"] - before["closed"]
+
+    if results["avec pool"]["opened"] > NB_THREADS:
+        print("❌ Le pool ouvre encore une connexion par lookup")
+        return 1
+
+    if double_close:
+        print("❌ Un second close() ferme la connexion du pool")
+        return 1
+
+    print(f"✅ {results['sans pool']['opened']:,} ouvertures → {results['avec pool']['opened']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
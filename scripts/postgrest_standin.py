@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Serveur HTTP local imitant PostgREST (/rest/v1) pour tester la synchro
+sans toucher au projet Supabase
+
+Supporte : GET (filtres eq/gt/gte/in, order sur plusieurs colonnes,
+offset/limit), POST (insert et upsert avec on_conflict, corps objet ou
+tableau, updated_at et deleted_at fixés par le serveur), DELETE (filtres)
+Options : latence simulée, valeur qui fait rejeter toute la requête
+
+Usage :
+    python scripts/postgrest_standin.py --port 54321 --latency-ms 40
+    SUPABASE_URL=http://127.0.0.1:54321 python main.py
+"""
+
+import sys
+import json
+import time
+import argparse
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qsl
+
+
+def _split_in_values(raw):
+    """Découpe in.(a,"b,c",d) en liste de valeurs"""
+    values, current, quoted = [], "", False
+    for char in raw.strip("()"):
+        if char == '"':
+            quoted = not quoted
+        elif char == "," and not quoted:
+            values.append(current)
+            current = ""
+        else:
+            current += char
+    values.append(current)
+    return values
+
+
+def _matches(row, filters):
+    for column, operator, value in filters:
+        cell = row.get(column)
+        cell_str = None if cell is None else str(cell)
+        if operator == "eq" and cell_str != value:
+            return False
+        if operator == "gt" and not (cell_str is not None and cell_str > value):
+            return False
+        if operator == "gte" and not (cell_str is not None and cell_str >= value):
+            return False
+        if operator == "in" and cell_str not in _split_in_values(value):
+            return False
+    return True
+
+
+class StandinStore:
+    """Tables en mémoire + compteurs de requêtes"""
+
+    def __init__(self, latency=0.0, reject_value=None):
+        self.tables = {}
+        self.latency = latency
+        self.reject_value = reject_value
+        self.requests = 0
+        self.lock = threading.Lock()
+
+
+def make_handler(store):
+    class Handler(BaseHTTPRequestHandler):
+        # Connexions gardées en vie, comme derrière le proxy Supabase
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _parse(self):
+            url = urlparse(self.path)
+            parts = url.path.strip("/").split("/")
+            table = parts[-1]
+            params = parse_qsl(url.query, keep_blank_values=True)
+            filters, options = [], {}
+            for key, value in params:
+                if key in ("select", "order", "offset", "limit", "on_conflict", "columns"):
+                    options[key] = value
+                elif "." in value:
+                    operator, operand = value.split(".", 1)
+                    filters.append((key, operator, operand))
+            return table, filters, options
+
+        def _reply(self, status, payload=None):
+            body = json.dumps(payload).encode() if payload is not None else b""
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _begin(self):
+            with store.lock:
+                store.requests += 1
+            if store.latency:
+                time.sleep(store.latency)
+
+        def do_GET(self):
+            self._begin()
+            # Le client asynchrone envoie un corps "{}" même en GET
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            table, filters, options = self._parse()
+            with store.lock:
+                rows = [dict(r) for r in store.tables.get(table, []) if _matches(r, filters)]
+            if "order" in options:
+                # order=a,b.desc : tris stables, de la dernière colonne à la première
+                for term in reversed(options["order"].split(",")):
+                    column = term.split(".")[0]
+                    rows.sort(key=lambda r: str(r.get(column) or ""),
+                              reverse=term.endswith(".desc"))
+            offset = int(options.get("offset", 0))
+            limit = options.get("limit")
+            rows = rows[offset:offset + int(limit)] if limit else rows[offset:]
+            self._reply(200, rows)
+
+        def do_POST(self):
+            self._begin()
+            table, _, options = self._parse()
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"[]")
+            rows = payload if isinstance(payload, list) else [payload]
+
+            if store.reject_value is not None:
+                for row in rows:
+                    if store.reject_value in [str(v) for v in row.values()]:
+                        # Comme PostgreSQL : toute la requête est rejetée
+                        self._reply(400, {"code": "22P02", "message": "invalid input value",
+                                          "details": None, "hint": None})
+                        return
+
+            conflict = [c for c in options.get("on_conflict", "").split(",") if c]
+            # Comme les triggers set_server_updated_at / set_server_deleted_at
+            # (voir sync_store)
+            now = datetime.now(timezone.utc).isoformat()
+            for row in rows:
+                if "updated_at" in row:
+                    row["updated_at"] = now
+                if table == "sync_tombstones":
+                    row["deleted_at"] = now
+            with store.lock:
+                existing = store.tables.setdefault(table, [])
+                if conflict:
+                    index = {tuple(r.get(c) for c in conflict): i for i, r in enumerate(existing)}
+                for row in rows:
+                    key = tuple(row.get(c) for c in conflict) if conflict else None
+                    if conflict and key in index:
+                        existing[index[key]].update(row)
+                    else:
+                        existing.append(dict(row))
+                        if conflict:
+                            index[key] = len(existing) - 1
+
+            prefer = self.headers.get("Prefer", "")
+            self._reply(201, None if "return=minimal" in prefer else rows)
+
+        def do_DELETE(self):
+            self._begin()
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            table, filters, _ = self._parse()
+            with store.lock:
+                rows = store.tables.get(table, [])
+                store.tables[table] = [r for r in rows if not _matches(r, filters)]
+            self._reply(200, [])
+
+        def do_PATCH(self):
+            self._reply(405, {"message": "PATCH non supporté"})
+
+    return Handler
+
+
+def start_standin(port=0, latency=0.0, reject_value=None):
+    """
+    Démarre le serveur dans un thread
+    Retourne (serveur, store, url) ; arrêter avec serveur.shutdown()
+    """
+    store = StandinStore(latency=latency, reject_value=reject_value)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(store))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    return server, store, url
+
+
+def main():
+    """Point d'entrée"""
+    parser = argparse.ArgumentParser(description="Stand-in PostgREST local")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    parser.add_argument("--reject-value", default=None)
+    args = parser.parse_args()
+
+    server, _, url = start_standin(args.port, args.latency_ms / 1000, args.reject_value)
+    print(f"✅ Stand-in PostgREST : {url}/rest/v1")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contexte de la session de l'utilisateur connecté
+Établissement, rôle, matière et préférences lus une fois à la connexion
+(au lieu des Return(Ident) des écrans qui relisaient User à chaque appel)
+Rechargé à la demande après invalidate() : sync de User/Teacher ou
+modification locale de la ligne
+"""
+
+import threading
+from typing import Optional
+
+from db_manager import db_connection
+from sync_events import subscribe
+
+CREATOR_IDENT = "Deg"
+
+
+class SessionContext:
+    """Identité et contexte de l'utilisateur connecté"""
+
+    def __init__(self, ident: str, role: str, name: str = ""):
+        self.ident = ident
+        self.role = role
+        self.name = name
+        self._lock = threading.Lock()
+        self._stale = True
+        self._data = {}
+        # Rechargement quand la sync modifie les comptes ou les enseignants
+        self._unsubscribe = subscribe(["User", "Teacher"], lambda table: self.invalidate())
+
+    # ============ CHARGEMENT ============
+
+    def _load(self):
+        """Lit établissement, matière et préférences (une connexion)"""
+        data = {"etablissement": None, "matiere": None, "theme": "light", "language": "fr"}
+
+        with db_connection() as conn:
+            if self.role != "creator":
+                row = conn.execute(
+                    "SELECT etablissement FROM User WHERE identifiant = ? AND titre = ?",
+                    (self.ident, self.role)
+                ).fetchone()
+                data["etablissement"] = row[0] if row else None
+
+            if self.role == "prof":
+                row = conn.execute(
+                    "SELECT matiere FROM Teacher WHERE ident = ?", (self.ident,)
+                ).fetchone()
+                data["matiere"] = row[0] if row else None
+
+            if self.ident == CREATOR_IDENT:
+                row = conn.execute("SELECT theme, language FROM Dev_Preferences WHERE id = 1").fetchone()
+            else:
+                row = conn.execute(
+                    "SELECT theme, language FROM User_Preferences WHERE user_id = ?", (self.ident,)
+                ).fetchone()
+            if row:
+                data["theme"], data["language"] = row[0] or "light", row[1] or "fr"
+
+        return data
+
+    def _get(self, key: str):
+        with self._lock:
+            if self._stale:
+                try:
+                    self._data = self._load()
+                    self._stale = False
+                except Exception as e:
+                    print(f"⚠️ Contexte de session indisponible: {e}")
+            return self._data.get(key)
+
+    def invalidate(self):
+        """La ligne de l'utilisateur a changé : relire au prochain accès"""
+        with self._lock:
+            self._stale = True
+
+    def close(self):
+        """Fin de session : plus de rechargement sur les événements de sync"""
+        self._unsubscribe()
+
+    # ============ ACCÈS ============
+
+    @property
+    def etablissement(self) -> Optional[str]:
+        return self._get("etablissement")
+
+    @property
+    def matiere(self) -> Optional[str]:
+        return self._get("matiere")
+
+    @property
+    def theme(self) -> str:
+        return self._get("theme") or "light"
+
+    @property
+    def language(self) -> str:
+        return self._get("language") or "fr"
+
+
+_current: Optional[SessionContext] = None
+
+
+def start_session(donner: dict) -> SessionContext:
+    """Ouvre la session de l'utilisateur qui vient de se connecter"""
+    global _current
+    if _current:
+        _current.close()
+    _current = SessionContext(donner.get("ident"), donner.get("role"), donner.get("name", ""))
+    return _current
+
+
+def session_for(donner: dict) -> SessionContext:
+    """Session de l'utilisateur décrit par Donner (ouverte si besoin)"""
+    if _current and _current.ident == donner.get("ident") and _current.role == donner.get("role"):
+        return _current
+    return start_session(donner)
+
+
+def invalidate_session(ident: Optional[str] = None):
+    """
+    À appeler après une modification locale d'un compte
+    Sans ident : invalide la session courante quelle qu'elle soit
+    """
+    if _current and (ident is None or ident == _current.ident):
+        _current.invalidate()
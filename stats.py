@@ -1,11 +1,12 @@
 import flet as ft
-from Zeli_Dialog import ZeliDialog2
+from Zeli_Dialog import ZeliDialog2, CardRegistry, batched
 import sqlite3
 import os
 import shutil
 from pathlib import Path
 from time import sleep
 from db_manager import get_db_connection
+from session import session_for, invalidate_session
 
 def Stats(page, Donner=None):
     """Statistiques selon le type d'utilisateur (creator/admin)
@@ -32,25 +33,8 @@ def Stats(page, Donner=None):
         )
         return
     
-    def Return(Ident):
-        """Récupère une information depuis la table User"""
-        con = None
-        try:
-            con = get_db_connection()
-            cur = con.cursor()
-            cur.execute(
-                f"SELECT {Ident} FROM User WHERE identifiant = ? AND titre = ? AND passwords = ?",
-                (Donner.get("ident"), Donner.get("role"), Donner.get("pass"))
-            )
-            donne = cur.fetchall()
-            cur.close()
-            return donne
-        except Exception as e:
-            Dialog.error_toast(f"Erreur de récupération: {str(e)}")
-            return []
-        finally:
-            if con:
-                con.close()
+    # Établissement lu une fois à la connexion
+    session = session_for(Donner)
     
     def create_info_row(label, value):
         """Crée une ligne d'information"""
@@ -115,6 +99,7 @@ def Stats(page, Donner=None):
         tele_field = ft.TextField(label="Téléphone", value=admin[6])
         etabl_field = ft.TextField(label="Établissement", value=admin[7])
         
+        @batched(page)
         def save_changes(e, dialog):
             con = None
             try:
@@ -136,11 +121,22 @@ def Stats(page, Donner=None):
                     ident_field.value
                 ))
                 con.commit()
+                invalidate_session(ident_field.value)
+                cur.execute("SELECT * FROM User WHERE identifiant = ? AND titre = 'admin'", (ident_field.value,))
+                updated = cur.fetchone()
+                
+                # Sync vers Supabase (en arrière-plan, ligne journalisée)
+                try:
+                    from sync_manager import sync_manager
+                    sync_manager.notify_local_change("User")
+                except Exception as e:
+                    Dialog.error_toast(f"⚠️ Erreur sync: {e}")
                 
                 Dialog.info_toast("Modifications enregistrées !")
                 Dialog.close_dialog(dialog)
-                Dialog.close_dialog(main_dialog)
-                Stats(page, Donner)  # Rafraîchir
+                # Seule la carte modifiée est reconstruite
+                if updated:
+                    cards.place(updated)
                 
             except sqlite3.Error as e:
                 Dialog.error_toast(f"Erreur: {str(e)}")
@@ -294,6 +290,7 @@ def Stats(page, Donner=None):
             ]
         )
     
+    @batched(page)
     def execute_delete_admin(admin, dialog):
         """Exécute la suppression d'un admin uniquement"""
         con = None
@@ -304,11 +301,18 @@ def Stats(page, Donner=None):
             
             cur.execute("DELETE FROM User WHERE identifiant = ? AND titre = 'admin'", (admin[1],))
             con.commit()
+            invalidate_session(admin[1])
+            
+            # Sync vers Supabase (en arrière-plan, ligne journalisée)
+            try:
+                from sync_manager import sync_manager
+                sync_manager.notify_local_change("User")
+            except Exception as e:
+                Dialog.error_toast(f"⚠️ Erreur sync: {e}")
             
             Dialog.info_toast("Administrateur supprimé !")
             Dialog.close_dialog(dialog)
-            Dialog.close_dialog(main_dialog)
-            Stats(page, Donner)  # Rafraîchir
+            cards.remove(admin[1])
             
         except sqlite3.Error as e:
             Dialog.error_toast(f"Erreur de suppression: {str(e)}")
@@ -316,6 +320,7 @@ def Stats(page, Donner=None):
             if con:
                 con.close()
     
+    @batched(page)
     def execute_delete_school(school_name, dialog):
         """Exécute la suppression de tout un établissement"""
         con = None
@@ -324,14 +329,15 @@ def Stats(page, Donner=None):
 
             cur = con.cursor()
             
-            # Supprimer tous les utilisateurs de l'établissement
-            cur.execute("DELETE FROM User WHERE etablissement = ?", (school_name,))
-            
-            # Supprimer tous les élèves
-            cur.execute("DELETE FROM Students WHERE etablissement = ?", (school_name,))
+            # ⚠️ Ordre important : Notes et Teacher sont rattachés à
+            # l'établissement via Students et User (suppressions journalisées
+            # avec leur établissement pour être propagées à Supabase)
             
-            # Supprimer toutes les matières
-            cur.execute("DELETE FROM Matieres WHERE etablissement = ?", (school_name,))
+            # Supprimer toutes les notes des élèves
+            cur.execute("""
+                DELETE FROM Notes WHERE (matricule, classe) IN 
+                (SELECT matricule, classe FROM Students WHERE etablissement = ?)
+            """, (school_name,))
             
             # Supprimer les enseignants de la table Teacher
             cur.execute("""
@@ -339,12 +345,30 @@ def Stats(page, Donner=None):
                 (SELECT identifiant FROM User WHERE etablissement = ?)
             """, (school_name,))
             
+            # Supprimer tous les élèves
+            cur.execute("DELETE FROM Students WHERE etablissement = ?", (school_name,))
+            
+            # Supprimer toutes les matières et classes
+            cur.execute("DELETE FROM Matieres WHERE etablissement = ?", (school_name,))
+            cur.execute("DELETE FROM Class WHERE etablissement = ?", (school_name,))
+            
+            # Supprimer tous les utilisateurs de l'établissement
+            cur.execute("DELETE FROM User WHERE etablissement = ?", (school_name,))
+            
             con.commit()
+            invalidate_session()
+            
+            # Sync vers Supabase (en arrière-plan, ligne journalisée)
+            try:
+                from sync_manager import sync_manager
+                sync_manager.notify_local_change("Notes", "Teacher", "Students", "Matieres", "Class", "User")
+            except Exception as e:
+                Dialog.error_toast(f"⚠️ Erreur sync: {e}")
             
             Dialog.info_toast("Établissement supprimé avec toutes ses données !")
             Dialog.close_dialog(dialog)
-            Dialog.close_dialog(main_dialog)
-            Stats(page, Donner)  # Rafraîchir
+            # Cartes de tous les admins de l'établissement
+            cards.remove(*cards.keys_where(lambda admin: admin[7] == school_name))
             
         except sqlite3.Error as e:
             Dialog.error_toast(f"Erreur de suppression: {str(e)}")
@@ -409,8 +433,8 @@ def Stats(page, Donner=None):
     # ==================== FONCTIONS POUR ADMIN (voir les profs) ====================
     def load_school_teachers():
         """Charge les enseignants de l'établissement de l'admin"""
-        Etat = Return("etablissement")
-        if not Etat:
+        etablissement = session.etablissement
+        if not etablissement:
             return []
         
         con = None
@@ -420,7 +444,7 @@ def Stats(page, Donner=None):
             cur = con.cursor()
             cur.execute(
                 "SELECT * FROM User WHERE etablissement = ? AND titre = 'prof'",
-                (Etat[0][0],)
+                (etablissement,)
             )
             return cur.fetchall()
         except:
@@ -487,6 +511,7 @@ def Stats(page, Donner=None):
         tele_field = ft.TextField(label="Téléphone", value=teacher[6])
         etabl_field = ft.TextField(label="Établissement", value=teacher[7], read_only=True, disabled=True)
         
+        @batched(page)
         def save_changes(e, dialog):
             con = None
             try:
@@ -507,18 +532,22 @@ def Stats(page, Donner=None):
                     ident_field.value
                 ))
                 con.commit()
+                invalidate_session(ident_field.value)
+                cur.execute("SELECT * FROM User WHERE identifiant = ? AND titre = 'prof'", (ident_field.value,))
+                updated = cur.fetchone()
                 
-                # NOUVEAU : Sync vers Supabase
+                # NOUVEAU : Sync vers Supabase (en arrière-plan, ligne journalisée)
                 try:
                     from sync_manager import sync_manager
-                    sync_manager.sync_table_to_supabase("User")
+                    sync_manager.notify_local_change("User")
                 except Exception as e:
                     Dialog.error_toast(f"⚠️ Erreur sync: {e}")
             
                 Dialog.info_toast("Modifications enregistrées !")
                 Dialog.close_dialog(dialog)
-                Dialog.close_dialog(main_dialog)
-                Stats(page, Donner)  # Rafraîchir
+                # Seule la carte modifiée est reconstruite
+                if updated:
+                    cards.place(updated)
                 
             except sqlite3.Error as e:
                 Dialog.error_toast(f"Erreur: {str(e)}")
@@ -601,6 +630,7 @@ def Stats(page, Donner=None):
             ]
         )
     
+    @batched(page)
     def execute_delete_teacher(teacher, dialog):
         """Exécute la suppression d'un enseignant"""
         con = None
@@ -609,18 +639,26 @@ def Stats(page, Donner=None):
 
             cur = con.cursor()
             
+            # ⚠️ Teacher avant User : la suppression de Teacher est journalisée
+            # avec l'établissement lu dans User
+            cur.execute("DELETE FROM Teacher WHERE ident = ?", (teacher[1],))
+            
             # Supprimer de User
             cur.execute("DELETE FROM User WHERE identifiant = ? AND titre = 'prof'", (teacher[1],))
             
-            # Supprimer de Teacher
-            cur.execute("DELETE FROM Teacher WHERE ident = ?", (teacher[1],))
-            
             con.commit()
+            invalidate_session(teacher[1])
+            
+            # Sync vers Supabase (en arrière-plan, ligne journalisée)
+            try:
+                from sync_manager import sync_manager
+                sync_manager.notify_local_change("Teacher", "User")
+            except Exception as e:
+                Dialog.error_toast(f"⚠️ Erreur sync: {e}")
             
             Dialog.info_toast("Enseignant supprimé !")
             Dialog.close_dialog(dialog)
-            Dialog.close_dialog(main_dialog)
-            Stats(page, Donner)  # Rafraîchir
+            cards.remove(teacher[1])
             
         except sqlite3.Error as e:
             Dialog.error_toast(f"Erreur de suppression: {str(e)}")
@@ -699,11 +737,8 @@ def Stats(page, Donner=None):
         # ========== VUE CREATOR : Liste des ADMINS ==========
         admins = load_all_admins()
         
-        # Cartes des admins
-        admin_cards = [create_admin_card(admin) for admin in admins]
-        
-        if not admin_cards:
-            admin_cards = [
+        def build_empty_admins():
+            return [
                 ft.Container(
                     content=ft.Column([
                         ft.Icon(ft.Icons.ADMIN_PANEL_SETTINGS, size=60, color=ft.Colors.GREY_400),
@@ -725,15 +760,36 @@ def Stats(page, Donner=None):
                 )
             ]
         
+        total_text = ft.Text(
+            f"Total: {len(admins)} administrateur(s)",
+            size=18,
+            weight=ft.FontWeight.BOLD
+        )
+        
+        def show_total(delta):
+            total_text.value = f"Total: {len(cards)} administrateur(s)"
+            total_text.update()
+        
+        # Cartes des admins, indexées par identifiant
+        admin_list = ft.Column(
+            scroll=ft.ScrollMode.AUTO,
+            height=380,
+            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+        )
+        cards = CardRegistry(
+            admin_list,
+            create_admin_card,
+            key=lambda admin: admin[1],
+            build_empty=build_empty_admins,
+            on_count=show_total,
+        )
+        cards.fill(admins)
+        
         content = ft.Column([
             ft.Container(
                 content=ft.Row([
                     ft.Icon(ft.Icons.ADMIN_PANEL_SETTINGS, color=ft.Colors.RED, size=30),
-                    ft.Text(
-                        f"Total: {len(admins)} administrateur(s)",
-                        size=18,
-                        weight=ft.FontWeight.BOLD
-                    ),
+                    total_text,
                 ],
                 alignment=ft.MainAxisAlignment.CENTER,
                 spacing=10
@@ -743,12 +799,7 @@ def Stats(page, Donner=None):
                 border_radius=10,
             ),
             ft.Divider(),
-            ft.Column(
-                controls=admin_cards,
-                scroll=ft.ScrollMode.AUTO,
-                height=380,
-                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-            ),
+            admin_list,
         ],
         spacing=10,
         horizontal_alignment=ft.CrossAxisAlignment.CENTER,
@@ -773,14 +824,10 @@ def Stats(page, Donner=None):
     elif Donner.get("role") == "admin":
         # ========== VUE ADMIN : Liste des PROFS de son établissement ==========
         teachers = load_school_teachers()
-        etablissement = Return("etablissement")
-        etabl_name = etablissement[0][0] if etablissement else "N/A"
-        
-        # Cartes des enseignants
-        teacher_cards = [create_teacher_card(teacher) for teacher in teachers]
+        etabl_name = session.etablissement or "N/A"
         
-        if not teacher_cards:
-            teacher_cards = [
+        def build_empty_teachers():
+            return [
                 ft.Container(
                     content=ft.Column([
                         ft.Icon(ft.Icons.SCHOOL, size=60, color=ft.Colors.GREY_400),
@@ -803,6 +850,31 @@ def Stats(page, Donner=None):
                 )
             ]
         
+        total_text = ft.Text(
+            f"Total: {len(teachers)} enseignant(s)",
+            size=16,
+            weight=ft.FontWeight.W_500
+        )
+        
+        def show_total(delta):
+            total_text.value = f"Total: {len(cards)} enseignant(s)"
+            total_text.update()
+        
+        # Cartes des enseignants, indexées par identifiant
+        teacher_list = ft.Column(
+            scroll=ft.ScrollMode.AUTO,
+            height=360,
+            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+        )
+        cards = CardRegistry(
+            teacher_list,
+            create_teacher_card,
+            key=lambda teacher: teacher[1],
+            build_empty=build_empty_teachers,
+            on_count=show_total,
+        )
+        cards.fill(teachers)
+        
         content = ft.Column([
             ft.Container(
                 content=ft.Column([
@@ -819,11 +891,7 @@ def Stats(page, Donner=None):
                     ),
                     ft.Row([
                         ft.Icon(ft.Icons.PERSON, color=ft.Colors.GREEN, size=25),
-                        ft.Text(
-                            f"Total: {len(teachers)} enseignant(s)",
-                            size=16,
-                            weight=ft.FontWeight.W_500
-                        ),
+                        total_text,
                     ],
                     alignment=ft.MainAxisAlignment.CENTER,
                     spacing=10
@@ -836,12 +904,7 @@ def Stats(page, Donner=None):
                 border_radius=10,
             ),
             ft.Divider(),
-            ft.Column(
-                controls=teacher_cards,
-                scroll=ft.ScrollMode.AUTO,
-                height=360,
-                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-            ),
+            teacher_list,
         ],
         spacing=10,
         horizontal_alignment=ft.CrossAxisAlignment.CENTER,
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Import d'élèves en masse (fichier CSV ou XLSX)
+Le fichier est lu ligne à ligne et validé par lots : classe existante,
+matricule absent de la base et du fichier (UNIQUE(matricule, etablissement))
+Les lignes valides sont insérées dans une seule transaction, les autres
+sont rapportées avec leur numéro de ligne ; une seule sync est réveillée
+à la fin (les triggers ont journalisé chaque ligne)
+"""
+
+import csv
+import re
+import unicodedata
+from datetime import date, datetime
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config import STUDENT_IMPORT_CHUNK
+from db_manager import db_connection
+
+# Colonnes attendues dans le fichier, dans l'ordre de l'INSERT
+COLUMNS = ("nom", "prenom", "matricule", "date_naissance", "sexe", "classe")
+
+# En-têtes reconnus (minuscules, sans accents ni séparateurs)
+HEADER_ALIASES = {
+    "nom": "nom",
+    "noms": "nom",
+    "prenom": "prenom",
+    "prenoms": "prenom",
+    "matricule": "matricule",
+    "datenaissance": "date_naissance",
+    "datedenaissance": "date_naissance",
+    "naissance": "date_naissance",
+    "sexe": "sexe",
+    "genre": "sexe",
+    "classe": "classe",
+}
+
+# Valeurs de sexe acceptées → valeur du menu de add_student
+SEXES = {
+    "m": "Masculin(M)",
+    "masculin": "Masculin(M)",
+    "masculinm": "Masculin(M)",
+    "garcon": "Masculin(M)",
+    "f": "Feminin(F)",
+    "feminin": "Feminin(F)",
+    "femininf": "Feminin(F)",
+    "fille": "Feminin(F)",
+}
+
+DATE_FORMATS = ("%d/%m/%Y", "%d-%m-%Y", "%Y-%m-%d", "%d/%m/%y")
+
+INSERT_SQL = """
+    INSERT INTO Students (nom, prenom, matricule, date_naissance, sexe, classe, etablissement)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+class ImportReport:
+    """Bilan d'un import : lignes lues, insérées et erreurs par ligne"""
+
+    def __init__(self):
+        self.total = 0
+        self.imported = 0
+        self.errors: List[Tuple[int, str]] = []
+
+    def add_error(self, line: int, message: str):
+        self.errors.append((line, message))
+
+    def summary(self) -> str:
+        return f"{self.imported} élève(s) importé(s) sur {self.total}, {len(self.errors)} ligne(s) rejetée(s)"
+
+
+# ============ LECTURE ============
+
+def normalize(text) -> str:
+    """Minuscules, sans accents ni séparateurs : "Date de naissance" → "datedenaissance" """
+    text = unicodedata.normalize("NFKD", str(text or ""))
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r"[^a-z0-9]", "", text.lower())
+
+
+def map_header(header) -> Dict[int, str]:
+    """Position de chaque colonne attendue ; ValueError s'il en manque"""
+    positions = {}
+    for index, title in enumerate(header):
+        column = HEADER_ALIASES.get(normalize(title))
+        if column and column not in positions.values():
+            positions[index] = column
+
+    missing = [c for c in COLUMNS if c not in positions.values()]
+    if missing:
+        raise ValueError(f"Colonne(s) absente(s) de l'en-tête : {', '.join(missing)}")
+    return positions
+
+
+def read_csv(path: Path) -> Iterator[Tuple[int, list]]:
+    """Lignes d'un CSV (séparateur ; , ou tabulation détecté) avec leur numéro"""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=";,\t")
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.reader(f, dialect)
+        for row in reader:
+            yield reader.line_num, row
+
+
+def read_xlsx(path: Path) -> Iterator[Tuple[int, tuple]]:
+    """Lignes de la première feuille d'un classeur (openpyxl en lecture seule)"""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("Lecture des fichiers .xlsx impossible : installez openpyxl (pip install openpyxl)")
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for line, row in enumerate(workbook.active.iter_rows(values_only=True), start=1):
+            yield line, row
+    finally:
+        workbook.close()
+
+
+READERS = {".csv": read_csv, ".txt": read_csv, ".xlsx": read_xlsx, ".xlsm": read_xlsx}
+
+
+def read_rows(path) -> Iterator[Tuple[int, Dict[str, object]]]:
+    """
+    Lignes du fichier sous forme {colonne: valeur brute}, une à la fois
+    (le fichier n'est jamais chargé en entier) ; les lignes vides sont sautées
+    """
+    path = Path(path)
+    reader = READERS.get(path.suffix.lower())
+    if reader is None:
+        raise ValueError(f"Format non pris en charge : {path.suffix or path.name} (CSV ou XLSX attendu)")
+
+    positions = None
+    for line, row in reader(path):
+        if not any(str(v).strip() for v in row if v is not None):
+            continue
+        if positions is None:
+            positions = map_header(row)
+            continue
+        yield line, {column: (row[i] if i < len(row) else None) for i, column in positions.items()}
+
+    if positions is None:
+        raise ValueError("Fichier vide")
+
+
+def chunks(iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# ============ VALIDATION ============
+
+def clean_text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        # Matricules numériques lus par openpyxl (12345.0)
+        value = int(value)
+    return str(value).strip()
+
+
+def clean_date(value) -> Optional[str]:
+    """Date au format de add_student (31/10/2012) ou None si illisible"""
+    if isinstance(value, (datetime, date)):
+        return value.strftime("%d/%m/%Y")
+    text = clean_text(value)
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).strftime("%d/%m/%Y")
+        except ValueError:
+            continue
+    return None
+
+
+def clean_row(raw: Dict[str, object], classes) -> Tuple[Optional[tuple], Optional[str]]:
+    """Valeurs prêtes pour l'INSERT, ou le motif du rejet"""
+    values = {column: clean_text(raw.get(column)) for column in COLUMNS}
+
+    empty = [column for column in COLUMNS if not values[column]]
+    if empty:
+        return None, f"champ(s) obligatoire(s) vide(s) : {', '.join(empty)}"
+
+    birth = clean_date(raw.get("date_naissance"))
+    if birth is None:
+        return None, f"date de naissance illisible : {values['date_naissance']} (JJ/MM/AAAA attendu)"
+    values["date_naissance"] = birth
+
+    sexe = SEXES.get(normalize(values["sexe"]))
+    if sexe is None:
+        return None, f"sexe inconnu : {values['sexe']} (M ou F attendu)"
+    values["sexe"] = sexe
+
+    if values["classe"] not in classes:
+        return None, f"classe inexistante : {values['classe']}"
+
+    return tuple(values[column] for column in COLUMNS), None
+
+
+def existing_matricules(conn, etablissement: str, matricules: List[str]) -> set:
+    """Matricules du lot déjà présents dans l'établissement (index UNIQUE)"""
+    if not matricules:
+        return set()
+    marks = ", ".join("?" for _ in matricules)
+    rows = conn.execute(
+        f"SELECT matricule FROM Students WHERE etablissement = ? AND matricule IN ({marks})",
+        [etablissement] + matricules
+    ).fetchall()
+    return {row[0] for row in rows}
+
+
+# ============ IMPORT ============
+
+def import_students(path, etablissement: str, chunk_size: int = STUDENT_IMPORT_CHUNK,
+                    notify: bool = True) -> ImportReport:
+    """
+    Importe les élèves du fichier dans l'établissement
+    Les lignes invalides sont rapportées (numéro de ligne du fichier) sans
+    bloquer les autres ; une erreur de lecture annule tout l'import
+    Lève ValueError si le fichier est illisible (format, en-tête)
+    """
+    report = ImportReport()
+    seen: Dict[str, int] = {}
+
+    with db_connection() as conn:
+        classes = {row[0] for row in conn.execute(
+            "SELECT nom FROM Class WHERE etablissement = ?", (etablissement,)
+        ).fetchall()}
+
+        conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for chunk in chunks(read_rows(path), chunk_size):
+                report.total += len(chunk)
+
+                valid = []
+                for line, raw in chunk:
+                    values, error = clean_row(raw, classes)
+                    if error:
+                        report.add_error(line, error)
+                        continue
+                    matricule = values[2]
+                    if matricule in seen:
+                        report.add_error(line, f"matricule {matricule} en double (déjà ligne {seen[matricule]})")
+                        continue
+                    seen[matricule] = line
+                    valid.append((line, values))
+
+                taken = existing_matricules(conn, etablissement, [v[2] for _, v in valid])
+                rows = []
+                for line, values in valid:
+                    if values[2] in taken:
+                        report.add_error(line, f"matricule {values[2]} déjà attribué dans l'établissement")
+                    else:
+                        rows.append(values + (etablissement,))
+
+                conn.executemany(INSERT_SQL, rows)
+                report.imported += len(rows)
+
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    report.errors.sort()
+    print(f"📥 Import élèves : {report.summary()}")
+
+    if report.imported and notify:
+        # Une seule sync pour tout le lot : le push envoie le journal par paquets
+        try:
+            from sync_manager import sync_manager
+            sync_manager.notify_local_change("Students")
+        except Exception as e:
+            print(f"⚠️ Erreur sync: {e}")
+
+    return report
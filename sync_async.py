@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Synchronisation depuis la boucle asyncio de Flet
+Client PostgREST asynchrone (httpx : pool de connexions, keep-alive, HTTP/2)
+La logique reste celle de SyncManager (watermarks, journal, pierres
+tombales, paquets) : elle tourne dans un thread (asyncio.to_thread) et
+chaque requête .execute() est renvoyée sur la boucle d'événements
+La boucle de Flet n'est jamais bloquée, ni par SQLite ni par le réseau
+
+Usage depuis Flet :
+    page.run_task(async_sync_manager.sync_school, etablissement)
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+import httpx
+from postgrest import AsyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
+
+from config import (
+    SUPABASE_URL, SUPABASE_KEY, SYNC_WORKERS,
+    SYNC_HTTP_MAX_CONNECTIONS, SYNC_HTTP_KEEPALIVE,
+)
+from sync_manager import SyncManager
+
+
+class PooledPostgrestClient(AsyncPostgrestClient):
+    """AsyncPostgrestClient dont le pool de connexions est borné (config)"""
+
+    def create_session(self, base_url, headers, timeout, verify=True, proxy=None):
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            verify=verify,
+            proxy=proxy,
+            follow_redirects=True,
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=SYNC_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=SYNC_HTTP_KEEPALIVE,
+            ),
+        )
+
+
+class LoopQuery:
+    """
+    Requête PostgREST asynchrone utilisable depuis un thread
+    Les méthodes de construction (.select, .eq, .order...) passent telles
+    quelles ; .execute() s'exécute sur la boucle du client et attend le
+    résultat
+    ⚠️ Jamais depuis le thread de la boucle elle-même (blocage)
+    """
+
+    def __init__(self, query, loop: asyncio.AbstractEventLoop):
+        self._query = query
+        self._loop = loop
+
+    def __getattr__(self, name):
+        attr = getattr(self._query, name)
+        if not callable(attr):
+            return attr
+
+        def build(*args, **kwargs):
+            return LoopQuery(attr(*args, **kwargs), self._loop)
+        return build
+
+    def execute(self):
+        return asyncio.run_coroutine_threadsafe(self._query.execute(), self._loop).result()
+
+
+class LoopClient:
+    """Client au format de SyncManager (.table(nom)) au-dessus d'un client asynchrone"""
+
+    def __init__(self, client: AsyncPostgrestClient, loop: asyncio.AbstractEventLoop):
+        self._client = client
+        self._loop = loop
+
+    def table(self, table_name: str) -> LoopQuery:
+        return LoopQuery(self._client.table(table_name), self._loop)
+
+
+class AsyncSyncManager:
+    """
+    Synchronisation SQLite local <-> Supabase en coroutines
+    Adaptateur d'entrées/sorties : chaque méthode délègue à SyncManager
+
+    Args:
+        url: URL du projet Supabase
+        key: Clé API
+        max_workers: Nombre de tables synchronisées simultanément
+    """
+
+    def __init__(self, url: str = SUPABASE_URL, key: str = SUPABASE_KEY,
+                 max_workers: int = SYNC_WORKERS):
+        self.url = url
+        self.key = key
+        self.timings: Dict[str, float] = {}
+        self.last_remote_changes = 0
+        self.last_sync: Optional[datetime] = None
+        self._client: Optional[PooledPostgrestClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._engine: Optional[SyncManager] = None
+        self._max_workers = max_workers
+
+    # ============ CLIENT HTTP ============
+
+    @property
+    def client(self) -> PooledPostgrestClient:
+        """
+        Client de la boucle courante, créé au premier appel
+        ⚠️ Les connexions httpx sont liées à leur boucle : nouvelle boucle,
+        nouveau client
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            headers = {
+                **DEFAULT_POSTGREST_CLIENT_HEADERS,
+                "apiKey": self.key,
+                "Authorization": f"Bearer {self.key}",
+            }
+            self._client = PooledPostgrestClient(f"{self.url}/rest/v1", headers=headers)
+            self._loop = loop
+            self._engine = None
+        return self._client
+
+    @property
+    def engine(self) -> SyncManager:
+        """SyncManager branché sur le client de la boucle courante"""
+        client = self.client
+        if self._engine is None:
+            self._engine = SyncManager(LoopClient(client, self._loop),
+                                       max_workers=self._max_workers)
+        return self._engine
+
+    async def aclose(self):
+        """Ferme les connexions HTTP gardées en vie"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
+            self._engine = None
+
+    async def _run(self, method: str, *args, **kwargs):
+        """Exécute une méthode de SyncManager hors de la boucle d'événements"""
+        return await asyncio.to_thread(getattr(self.engine, method), *args, **kwargs)
+
+    # ============ PULL / PUSH ============
+
+    async def pull(self, table_name: str, filter_col: str = None,
+                   filter_val: str = None, incremental: bool = True) -> int:
+        """Voir SyncManager.sync_table_from_supabase"""
+        return await self._run("sync_table_from_supabase", table_name,
+                               filter_col, filter_val, incremental)
+
+    async def pull_tombstones(self, etablissement: str) -> int:
+        """Voir SyncManager.sync_tombstones_from_supabase"""
+        return await self._run("sync_tombstones_from_supabase", etablissement)
+
+    async def push(self, table_name: str) -> bool:
+        """Voir SyncManager.sync_table_to_supabase"""
+        return await self._run("sync_table_to_supabase", table_name)
+
+    async def sync_account(self, table_name: str, column: str, value: str) -> int:
+        """Voir SyncManager.sync_account"""
+        return await self._run("sync_account", table_name, column, value)
+
+    # ============ ÉTABLISSEMENT ============
+
+    async def sync_all_accounts(self):
+        """Tous les comptes User puis Teacher (vue créateur, toutes écoles)"""
+        engine = self.engine
+        self.timings = await asyncio.to_thread(
+            engine.scheduler.run, ["User", "Teacher"], engine.sync_table_from_supabase
+        )
+
+    async def sync_school(self, etablissement: str, tables=None, push: bool = True,
+                          on_table_done: Optional[Callable[[str, float], None]] = None):
+        """
+        Cycle complet pour un établissement (voir SyncManager.sync_cycle)
+        on_table_done est appelé sur la boucle d'événements, pas dans le thread
+        Retourne la durée de chaque table (secondes)
+        """
+        callback = None
+        if on_table_done:
+            loop = asyncio.get_running_loop()
+
+            def callback(table, elapsed):
+                loop.call_soon_threadsafe(on_table_done, table, elapsed)
+
+        engine = self.engine
+        timings = await asyncio.to_thread(engine.sync_cycle, etablissement, tables,
+                                          push=push, on_table_done=callback)
+
+        self.timings = timings
+        self.last_remote_changes = engine.last_remote_changes
+        self.last_sync = datetime.now()
+        return timings
+
+
+# Instance globale
+async_sync_manager = AsyncSyncManager()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Événements de synchronisation pour l'interface
+Les vues s'abonnent à des tables et se rafraîchissent quand elles arrivent,
+quel que soit le moteur (SyncManager ou AsyncSyncManager)
+Les caches de vues peuvent aussi suivre les écritures locales (tables_written)
+"""
+
+import threading
+from typing import Callable, Dict, Iterable, List, Set
+
+_listeners: Dict[str, List[Callable[[str], None]]] = {}
+_local_listeners: Dict[str, List[Callable[[str], None]]] = {}
+_pending: Set[str] = set()
+_lock = threading.Lock()
+
+
+def subscribe(tables: Iterable[str], callback: Callable[[str], None],
+              local_writes: bool = False) -> Callable[[], None]:
+    """
+    Appelle callback(table) à chaque fois qu'une des tables reçoit des données
+    local_writes=True : aussi après chaque écriture locale dans ces tables
+    (les vues qui patchent leurs cartes elles-mêmes n'en ont pas besoin)
+    Retourne la fonction de désabonnement (à appeler à la fermeture de la vue)
+    """
+    tables = list(tables)
+    registries = [_listeners, _local_listeners] if local_writes else [_listeners]
+    with _lock:
+        for registry in registries:
+            for table in tables:
+                registry.setdefault(table, []).append(callback)
+
+    def unsubscribe():
+        with _lock:
+            for registry in registries:
+                for table in tables:
+                    if callback in registry.get(table, []):
+                        registry[table].remove(callback)
+
+    return unsubscribe
+
+
+def set_pending(tables: Iterable[str]):
+    """Marque des tables comme en cours de chargement"""
+    with _lock:
+        _pending.update(tables)
+
+
+def is_pending(table: str) -> bool:
+    """La table est-elle encore en cours de chargement ?"""
+    with _lock:
+        return table in _pending
+
+
+def table_synced(table: str, changed: int = 0):
+    """
+    À appeler par les moteurs quand une table est synchronisée
+    Les vues abonnées ne sont prévenues que si des lignes ont changé
+    """
+    with _lock:
+        was_pending = table in _pending
+        _pending.discard(table)
+        callbacks = list(_listeners.get(table, []))
+
+    if not changed and not was_pending:
+        return
+
+    _notify(table, callbacks)
+
+
+def tables_written(tables: Iterable[str]):
+    """À appeler après une écriture locale (commit fait) dans ces tables"""
+    for table in dict.fromkeys(tables):
+        with _lock:
+            callbacks = list(_local_listeners.get(table, []))
+        _notify(table, callbacks)
+
+
+def _notify(table: str, callbacks):
+    for callback in callbacks:
+        try:
+            callback(table)
+        except Exception as e:
+            print(f"⚠️ Rafraîchissement {table} impossible: {e}")
@@ -1,26 +1,60 @@
-import sqlite3
 import threading
 import time
 from datetime import datetime
 from supabase import create_client, Client
-from typing import Optional, Dict, Any
+from typing import Any, Callable, Dict, Optional
 import json
 
-from config import SUPABASE_URL, SUPABASE_KEY, SYNC_INTERVAL
-from db_manager import get_db_connection, init_all_tables
+from config import (
+    SUPABASE_URL, SUPABASE_KEY, SYNC_INTERVAL, SYNC_WORKERS,
+    SYNC_MIN_INTERVAL, SYNC_MAX_INTERVAL, SYNC_ACTIVE_WINDOW, SYNC_DEBOUNCE,
+)
+from db_manager import db_manager, get_db_connection, init_all_tables
+from sync_store import (
+    get_watermark, store_remote_rows, get_table_spec, collect_pending_push,
+    acknowledge_changes, build_tombstone_items, store_remote_tombstones,
+    pull_since, pull_order, TOMBSTONES_TABLE,
+)
+from sync_upload import ChunkedUploader
+from sync_scheduler import TableSyncScheduler
+from sync_events import table_synced, tables_written
+
+# Taille des pages lors d'un pull (max-rows par défaut de PostgREST sur Supabase)
+PULL_PAGE_SIZE = 1000
+
+# Tables d'un cycle de synchronisation automatique
+SYNC_CYCLE_TABLES = ["Students", "Matieres", "Teacher", "Notes", "Class", "User"]
 
 
 class SyncManager:
-    """Gestionnaire de synchronisation entre SQLite local et Supabase"""
+    """
+    Gestionnaire de synchronisation entre SQLite local et Supabase
     
-    def __init__(self):
-        self.supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+    Args:
+        client: Client PostgREST (.table(nom)...execute()) ; par défaut le
+                client Supabase synchrone (voir sync_async pour le client asyncio)
+        max_workers: Nombre de tables synchronisées simultanément
+    """
+    
+    def __init__(self, client=None, max_workers: int = SYNC_WORKERS):
+        self.use_client(client or create_client(SUPABASE_URL, SUPABASE_KEY))
+        self.scheduler = TableSyncScheduler(max_workers)
         self.sync_thread: Optional[threading.Thread] = None
         self.is_syncing = False
         self.last_sync: Optional[datetime] = None
+        self.last_remote_changes = 0
+        self._last_local_change: Optional[float] = None
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._push_lock = threading.Lock()
         
     # ============ CONNEXION & INITIALISATION ============
     
+    def use_client(self, client):
+        """Change de client PostgREST (l'envoi par paquets suit)"""
+        self.supabase: Client = client
+        self.uploader = ChunkedUploader(client)
+    
     def get_local_connection(self):
         """Obtenir une connexion à la base locale"""
         return get_db_connection()
@@ -31,46 +65,68 @@ class SyncManager:
     
     # ============ SYNC AU LOGIN ============
     
-    def sync_on_login(self, callback=None):
+    def sync_on_login(self, identifiant: str, callback=None):
         """
         Synchronisation lors de la connexion
-        1. Charge TOUS les Users
+        ✅ Ne télécharge QUE le compte qui se connecte (User + Teacher)
+        Les autres comptes de l'établissement arrivent après la connexion
+        (pull de User filtré par établissement)
         """
         try:
-            print("🔄 Sync au login - Chargement Users...")
+            print(f"🔄 Sync au login - Compte {identifiant}...")
             
-            # Charger tous les users et des prof
-            self.sync_table_from_supabase("User")
-            self.sync_table_from_supabase("Teacher")
+            self.sync_account("User", "identifiant", identifiant)
+            self.sync_account("Teacher", "ident", identifiant)
             
             if callback:
-                callback("Users chargés")
+                callback("Compte chargé")
             
             print("✅ Sync login terminé")
             return True
             
         except Exception as e:
+            # Hors ligne : la connexion se fait avec la copie locale
             print(f"❌ Erreur sync login: {e}")
             return False
     
+    def sync_account(self, table_name: str, column: str, value: str) -> int:
+        """
+        Télécharge les lignes dont column = value (filtre côté serveur)
+        ⚠️ N'avance pas le watermark : ce n'est pas un pull complet de la table
+        """
+        response = self.supabase.table(table_name).select("*").eq(column, value).execute()
+        rows = [{k: v for k, v in row.items() if k != 'id'} for row in response.data or []]
+        
+        if rows:
+            with db_manager.writer() as conn:
+                store_remote_rows(conn, table_name, "", rows, advance_watermark=False)
+        
+        return len(rows)
+    
     def sync_etablissement_data(self, etablissement: str, callback=None):
         """
         Charge toutes les données d'un établissement spécifique
+        ✅ Tables indépendantes chargées en parallèle (voir sync_scheduler)
         """
         try:
             print(f"🔄 Chargement données: {etablissement}")
             
-            tables = ["Students", "Matieres", "Teacher", "Notes", "Class"]
+            tables = ["User", "Students", "Matieres", "Teacher", "Notes", "Class"]
             
-            for table in tables:
+            # Suppressions distantes d'abord
+            deleted = self.sync_tombstones_from_supabase(etablissement)
+            
+            def pull(table):
                 if callback:
                     callback(f"Chargement {table}...")
-                
-                self.sync_table_from_supabase(
+                changed = self.sync_table_from_supabase(
                     table, 
                     filter_col="etablissement",
                     filter_val=etablissement
                 )
+                table_synced(table, changed + deleted)
+            
+            self.scheduler.run(tables, pull)
             
             print(f"✅ Données {etablissement} chargées")
             return True
@@ -79,98 +135,145 @@ class SyncManager:
             print(f"❌ Erreur sync établissement: {e}")
             return False
     
+    def sync_cycle(self, etablissement: str, tables=None, push: bool = True,
+                   on_table_done: Optional[Callable[[str, float], None]] = None):
+        """
+        Un cycle complet de synchronisation (push puis pull de chaque table)
+        Le push passe d'abord : une correction locale récente n'est jamais
+        écrasée par l'ancienne valeur re-téléchargée (voir store_remote_rows)
+        Les tables indépendantes tournent en parallèle : la durée du cycle
+        est celle de la chaîne de dépendances la plus lente
+        push=False : pull seul (chargement initial d'un établissement)
+        
+        Retourne la durée de chaque table (secondes) ;
+        last_remote_changes = nombre de lignes modifiées à distance
+        """
+        tables = tables or SYNC_CYCLE_TABLES
+        
+        # Suppressions distantes d'abord
+        changes = {"_tombstones": self.sync_tombstones_from_supabase(etablissement)}
+        # Un push interrompu (hors ligne) arrête les push suivants du cycle
+        push_stopped = threading.Event()
+        if not push:
+            push_stopped.set()
+        
+        def sync_table(table):
+            if not push_stopped.is_set() and not self.sync_table_to_supabase(
+                table,
+                filter_col="etablissement",
+                filter_val=etablissement
+            ):
+                push_stopped.set()
+            # User aussi filtré : seuls les comptes de l'établissement
+            changes[table] = self.sync_table_from_supabase(
+                table,
+                filter_col="etablissement",
+                filter_val=etablissement
+            )
+            table_synced(table, changes[table] + changes["_tombstones"])
+        
+        timings = self.scheduler.run(tables, sync_table, on_table_done)
+        
+        self.last_remote_changes = sum(changes.values())
+        self._checkpoint()
+        
+        details = ", ".join(f"{t} {d:.1f}s" for t, d in timings.items())
+        print(f"⏱️ Cycle {self.scheduler.last_duration:.1f}s ({details})")
+        return timings
+    
+    @property
+    def table_timings(self) -> Dict[str, float]:
+        """Durée de chaque table lors du dernier cycle (secondes)"""
+        return dict(self.scheduler.timings)
+    
     # ============ SYNC TABLES ============
     
     def sync_table_from_supabase(self, table_name: str, 
                                   filter_col: str = None, 
-                                  filter_val: str = None):
+                                  filter_val: str = None,
+                                  incremental: bool = True):
         """
         Synchronise une table depuis Supabase vers local
         ✅ IMPORTANT: Ignore les colonnes 'id' de Supabase
+        ✅ Incrémental : ne demande que les lignes dont updated_at >= watermark
+           (watermark par table et par établissement dans sync_metadata,
+           moins PULL_OVERLAP ; updated_at est fixé par le serveur)
+        
+        Retourne le nombre de lignes modifiées à distance depuis le dernier pull
         """
+        scope = filter_val if (filter_col and filter_val) else ""
+        
         try:
-            # Récupérer depuis Supabase
-            query = self.supabase.table(table_name).select("*")
-            
-            if filter_col and filter_val:
-                query = query.eq(filter_col, filter_val)
+            watermark = None
+            if incremental:
+                conn = self.get_local_connection()
+                try:
+                    watermark = get_watermark(conn, table_name, scope)
+                finally:
+                    conn.close()
             
-            response = query.execute()
-            remote_data = response.data
+            # Récupérer depuis Supabase (par pages, triées par updated_at)
+            remote_data = self._fetch_remote_rows(table_name, filter_col, filter_val, watermark)
             
             if not remote_data:
                 print(f"ℹ️ Aucune donnée pour {table_name}")
-                return
+                return 0
             
-            # Insérer/Mettre à jour en local
-            conn = self.get_local_connection()
-            cursor = conn.cursor()
-            
-            for row in remote_data:
-                # ✅ SUPPRIMER 'id' DE SUPABASE (on n'en a pas besoin localement)
-                row_data = {k: v for k, v in row.items() if k != 'id'}
-                
-                # Mettre à jour updated_at
-                row_data['updated_at'] = datetime.now().isoformat()
-                
-                # Déterminer la clé unique selon la table
-                if table_name == "User":
-                    unique_check = "identifiant = ?"
-                    unique_val = (row_data.get('identifiant'),)
-                elif table_name == "Students":
-                    unique_check = "matricule = ? AND etablissement = ?"
-                    unique_val = (row_data.get('matricule'), row_data.get('etablissement'))
-                elif table_name == "Notes":
-                    unique_check = "matricule = ? AND matiere = ? AND classe = ?"
-                    unique_val = (row_data.get('matricule'), row_data.get('matiere'), row_data.get('classe'))
-                elif table_name in ["Matieres", "Class"]:
-                    unique_check = "nom = ? AND etablissement = ?"
-                    unique_val = (row_data.get('nom'), row_data.get('etablissement'))
-                elif table_name == "Teacher":
-                    unique_check = "ident = ?"
-                    unique_val = (row_data.get('ident'),)
-                elif table_name == "Trimestre_moyen_save":
-                    unique_check = "matricule = ? AND annee_scolaire = ? AND periode = ?"
-                    unique_val = (row_data.get('matricule'), row_data.get('annee_scolaire'), row_data.get('periode'))
-                else:
-                    unique_check = None
-                
-                if unique_check:
-                    # Vérifier si la ligne existe déjà
-                    cursor.execute(f"SELECT 1 FROM {table_name} WHERE {unique_check}", unique_val)
-                    exists = cursor.fetchone()
-                    
-                    if exists:
-                        # UPDATE
-                        set_clause = ', '.join([f"{k} = ?" for k in row_data.keys()])
-                        values = list(row_data.values()) + list(unique_val)
-                        cursor.execute(f"UPDATE {table_name} SET {set_clause} WHERE {unique_check}", values)
-                    else:
-                        # INSERT
-                        columns = ', '.join(row_data.keys())
-                        placeholders = ', '.join(['?' for _ in row_data])
-                        cursor.execute(
-                            f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})",
-                            list(row_data.values())
-                        )
-                else:
-                    # INSERT simple
-                    columns = ', '.join(row_data.keys())
-                    placeholders = ', '.join(['?' for _ in row_data])
-                    cursor.execute(
-                        f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})",
-                        list(row_data.values())
-                    )
+            # ✅ SUPPRIMER 'id' DE SUPABASE (on n'en a pas besoin localement)
+            # updated_at distant conservé : il sert de watermark
+            rows = [{k: v for k, v in row.items() if k != 'id'} for row in remote_data]
             
-            conn.commit()
-            conn.close()
+            # Upsert groupé + watermark dans la même transaction
+            with db_manager.writer() as conn:
+                store_remote_rows(conn, table_name, scope, rows)
             
             print(f"✅ {table_name}: {len(remote_data)} lignes synchronisées")
             
+            # Lignes réellement nouvelles (le watermark lui-même est re-téléchargé)
+            return sum(1 for row in rows if not watermark or (row.get('updated_at') or '') > watermark)
+            
         except Exception as e:
             print(f"❌ Erreur sync {table_name}: {e}")
             import traceback
             traceback.print_exc()
+            return 0
+    
+    def _fetch_remote_rows(self, table_name: str, filter_col: str = None,
+                           filter_val: str = None, watermark: str = None,
+                           order_col: str = "updated_at"):
+        """
+        Récupère les lignes distantes modifiées depuis le watermark
+        Pagination explicite (PostgREST limite le nombre de lignes par réponse)
+        """
+        rows = []
+        offset = 0
+        
+        while True:
+            query = self.supabase.table(table_name).select("*")
+            
+            if filter_col and filter_val:
+                query = query.eq(filter_col, filter_val)
+            
+            if watermark:
+                # gte sur watermark - PULL_OVERLAP : les lignes déjà reçues
+                # sont re-téléchargées, l'upsert étant idempotent
+                query = query.gte(order_col, pull_since(watermark))
+            
+            # Clé en départage : des pages stables sous updated_at égaux
+            for column in pull_order(table_name, order_col):
+                query = query.order(column)
+            
+            response = query.range(
+                offset, offset + PULL_PAGE_SIZE - 1
+            ).execute()
+            page_rows = response.data or []
+            rows.extend(page_rows)
+            
+            if len(page_rows) < PULL_PAGE_SIZE:
+                break
+            offset += PULL_PAGE_SIZE
+        
+        return rows
     
     def sync_table_to_supabase(self, table_name: str, 
                                filter_col: str = None, 
@@ -178,94 +281,153 @@ class SyncManager:
         """
         Synchronise une table depuis local vers Supabase
         ✅ IMPORTANT: N'envoie QUE les colonnes existantes (sans 'id')
+        ✅ N'envoie que les lignes journalisées dans sync_changes (triggers)
+        
+        filter_col/filter_val sont conservés pour compatibilité : le journal
+        ne contient déjà que les lignes modifiées sur ce poste
+        
+        Retourne False si l'envoi a été interrompu (hors ligne, erreur
+        serveur) : le reste du journal attend le prochain cycle
         """
+        spec = get_table_spec(table_name)
+        if not spec or not spec.get("track"):
+            print(f"ℹ️ {table_name} n'est pas suivie pour le push")
+            return True
+        
         try:
             conn = self.get_local_connection()
-            cursor = conn.cursor()
+            try:
+                upsert_items, delete_items = collect_pending_push(conn, table_name)
+            finally:
+                conn.close()
             
-            # Récupérer données locales modifiées
-            query = f"SELECT * FROM {table_name}"
-            params = []
+            if not upsert_items and not delete_items:
+                print(f"ℹ️ Aucune donnée à syncer pour {table_name}")
+                return True
             
-            if filter_col and filter_val:
-                query += f" WHERE {filter_col} = ?"
-                params.append(filter_val)
+            on_conflict = ",".join(spec["conflict"])
+            acknowledged = []
             
-            cursor.execute(query, params)
-            columns = [description[0] for description in cursor.description]
-            local_data = cursor.fetchall()
+            try:
+                # Upsert par paquets, requêtes simultanées bornées
+                result = self.uploader.upsert(table_name, upsert_items, on_conflict=on_conflict)
+                acknowledged.extend(result.acknowledged)
+                if result.interrupted:
+                    return False
+                
+                # Suppressions par paquets, précédées de leurs pierres tombales
+                deleted = self._push_deletes(table_name, spec, delete_items)
+                acknowledged.extend(deleted.acknowledged)
+                if deleted.interrupted:
+                    return False
+            finally:
+                # Ce qui a été confirmé n'est pas renvoyé, même en cas d'erreur
+                self._acknowledge(acknowledged)
             
-            conn.close()
+            print(f"✅ {table_name}: {result.synced} synced ({result.requests} requêtes), "
+                  f"{deleted.synced} supprimés, {result.skipped} doublons ignorés, "
+                  f"{len(result.failed) + len(deleted.failed)} en échec")
+            return True
             
-            if not local_data:
-                print(f"ℹ️ Aucune donnée à syncer pour {table_name}")
-                return
+        except Exception as e:
+            print(f"❌ Erreur sync vers Supabase {table_name}: {e}")
+            import traceback
+            traceback.print_exc()
+            return True
+    
+    def _push_deletes(self, table_name: str, spec: Dict[str, Any], delete_items):
+        """
+        Propage des suppressions locales
+        1. Écrit les pierres tombales (les autres postes les appliqueront)
+        2. Supprime les lignes distantes par paquets de clés
+        Une suppression n'est confirmée que si les deux étapes ont réussi
+        """
+        tombstones = build_tombstone_items(table_name, delete_items)
+        written = self.uploader.upsert(
+            TOMBSTONES_TABLE, tombstones, on_conflict="table_name,row_key"
+        )
+        if written.interrupted:
+            return written
+        written_ids = set(written.acknowledged)
+        
+        keys = [
+            (json.loads(row_key), change_ids)
+            for row_key, change_ids, _ in delete_items
+            if written_ids.issuperset(change_ids)
+        ]
+        return self.uploader.delete_keys(table_name, list(spec["conflict"]), keys)
+    
+    def sync_tombstones_from_supabase(self, etablissement: str):
+        """
+        Applique les suppressions faites sur d'autres postes
+        ✅ Incrémental : seules les pierres tombales depuis le dernier passage
+        ⚠️ À lancer AVANT le pull des tables (une ligne recréée depuis revient)
+        """
+        try:
+            conn = self.get_local_connection()
+            try:
+                watermark = get_watermark(conn, TOMBSTONES_TABLE, etablissement)
+            finally:
+                conn.close()
             
-            synced_count = 0
-            skipped_count = 0
+            tombstones = self._fetch_remote_rows(
+                TOMBSTONES_TABLE, "etablissement", etablissement, watermark,
+                order_col="deleted_at"
+            )
+            if not tombstones:
+                return 0
             
-            for row in local_data:
-                row_dict = dict(zip(columns, row))
-                
-                # ✅ Supprimer 'id' local avant d'envoyer à Supabase
-                local_id = row_dict.pop('id', None)
-                
-                # Mettre à jour updated_at
-                row_dict['updated_at'] = datetime.now().isoformat()
-                
-                try:
-                    # Utiliser upsert pour gérer les doublons
-                    self.supabase.table(table_name).upsert(row_dict).execute()
-                    synced_count += 1
-                    
-                except Exception as e:
-                    # Si c'est un doublon, ignorer et continuer
-                    if 'duplicate key' in str(e).lower() or '23505' in str(e):
-                        print(f"⚠️ Doublon ignoré dans {table_name}")
-                        skipped_count += 1
-                    else:
-                        print(f"❌ Erreur upsert: {e}")
-                        raise
+            with db_manager.writer() as conn:
+                deleted = store_remote_tombstones(conn, etablissement, tombstones)
             
-            print(f"✅ {table_name}: {synced_count} synced, {skipped_count} doublons ignorés")
+            print(f"✅ Suppressions distantes: {deleted} lignes retirées")
+            return deleted
             
         except Exception as e:
-            print(f"❌ Erreur sync vers Supabase {table_name}: {e}")
+            print(f"❌ Erreur sync suppressions: {e}")
             import traceback
             traceback.print_exc()
+            return 0
+    
+    def _checkpoint(self):
+        """Recopie dans base.db les pages WAL écrites pendant le cycle"""
+        try:
+            db_manager.checkpoint()
+        except Exception as e:
+            print(f"⚠️ Checkpoint WAL impossible: {e}")
+    
+    def _acknowledge(self, change_ids):
+        """Marque comme traitées les modifications envoyées à Supabase"""
+        if not change_ids:
+            return
+        with db_manager.writer() as conn:
+            acknowledge_changes(conn, change_ids)
+            conn.commit()
     
     # ============ SYNC AUTOMATIQUE ============
     
     def start_auto_sync(self, etablissement: str):
-        """Démarre la synchronisation automatique"""
+        """
+        Démarre la synchronisation automatique
+        ✅ Réveil immédiat (avec anti-rebond) après une écriture locale
+        ✅ Recul exponentiel quand rien ne change à distance
+        ✅ Intervalle court pendant une période de saisie active
+        """
         if self.is_syncing:
             print("⚠️ Sync déjà en cours")
             return
         
         self.is_syncing = True
+        self._stop_event.clear()
+        self._wake_event.clear()
         
         def sync_loop():
+            interval = SYNC_INTERVAL
             while self.is_syncing:
                 try:
                     print(f"🔄 Sync auto - {datetime.now()}")
                     
-                    tables = ["Students", "Matieres", "Teacher", "Notes", "Class", "User"]
-                    
-                    for table in tables:
-                        if table == "User":
-                            self.sync_table_from_supabase(table)
-                            self.sync_table_to_supabase(table)
-                        else:
-                            self.sync_table_from_supabase(
-                                table,
-                                filter_col="etablissement",
-                                filter_val=etablissement
-                            )
-                            self.sync_table_to_supabase(
-                                table,
-                                filter_col="etablissement",
-                                filter_val=etablissement
-                            )
+                    self.sync_cycle(etablissement)
                     
                     self.last_sync = datetime.now()
                     print(f"✅ Sync auto terminé - {self.last_sync}")
@@ -273,15 +435,85 @@ class SyncManager:
                 except Exception as e:
                     print(f"❌ Erreur sync auto: {e}")
                 
-                time.sleep(SYNC_INTERVAL)
+                interval = self._next_interval(interval)
+                print(f"⏳ Prochaine sync dans {interval:.0f}s")
+                self._wait_for_next_cycle(interval)
         
         self.sync_thread = threading.Thread(target=sync_loop, daemon=True)
         self.sync_thread.start()
         print("✅ Sync automatique démarré")
     
+    def _next_interval(self, interval: float) -> float:
+        """Calcule l'attente avant le prochain cycle"""
+        if self.last_remote_changes:
+            # Des données arrivent : revenir au rythme normal
+            interval = SYNC_INTERVAL
+        else:
+            # Rien de neuf à distance : reculer
+            interval = min(interval * 2, SYNC_MAX_INTERVAL)
+        
+        recent_activity = (
+            self._last_local_change is not None
+            and time.monotonic() - self._last_local_change < SYNC_ACTIVE_WINDOW
+        )
+        if recent_activity:
+            interval = min(interval, SYNC_MIN_INTERVAL)
+        
+        return interval
+    
+    def _wait_for_next_cycle(self, interval: float):
+        """
+        Attend l'échéance, un arrêt ou une écriture locale
+        Après une écriture, attend SYNC_DEBOUNCE s sans nouvelle écriture
+        """
+        deadline = time.monotonic() + interval
+        while self.is_syncing:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if self._wake_event.wait(timeout=remaining):
+                # Anti-rebond : regrouper une rafale de saisies
+                while self.is_syncing:
+                    self._wake_event.clear()
+                    if not self._stop_event.wait(timeout=SYNC_DEBOUNCE) and not self._wake_event.is_set():
+                        return
+                return
+    
+    def notify_local_change(self, *tables: str):
+        """
+        À appeler après une écriture locale (les triggers l'ont déjà journalisée)
+        tables : tables écrites, pour les caches de vues abonnés (sync_events)
+        Réveille la sync automatique, ou pousse en arrière-plan si elle est arrêtée
+        ✅ Ne bloque jamais l'interface
+        """
+        self._last_local_change = time.monotonic()
+        tables_written(tables)
+        
+        if self.is_syncing:
+            self._wake_event.set()
+        else:
+            threading.Thread(target=self.push_pending, daemon=True).start()
+    
+    def push_pending(self):
+        """Pousse toutes les tables suivies qui ont des modifications en attente"""
+        with self._push_lock:
+            conn = self.get_local_connection()
+            try:
+                tables = [row[0] for row in conn.execute(
+                    "SELECT DISTINCT table_name FROM sync_changes"
+                ).fetchall()]
+            finally:
+                conn.close()
+            
+            for table in tables:
+                if not self.sync_table_to_supabase(table):
+                    break
+    
     def stop_auto_sync(self):
-        """Arrête la synchronisation automatique"""
+        """Arrête la synchronisation automatique (interrompt l'attente)"""
         self.is_syncing = False
+        self._stop_event.set()
+        self._wake_event.set()
         if self.sync_thread:
             self.sync_thread.join(timeout=5)
         print("🛑 Sync automatique arrêté")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ordonnanceur de synchronisation par table
+Lance en parallèle les tables indépendantes (nombre de workers borné)
+en respectant les dépendances du registre (Class → Students → Notes)
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Iterable, List, Optional
+
+from config import SYNC_WORKERS
+from sync_store import get_table_spec
+
+
+class TableSyncScheduler:
+    """
+    Exécute une tâche par table dans un pool de threads
+
+    Args:
+        max_workers: Nombre de tables synchronisées simultanément
+    """
+
+    def __init__(self, max_workers: int = SYNC_WORKERS):
+        self.max_workers = max(1, max_workers)
+        self.timings: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.last_duration: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def dependencies(tables: Iterable[str]) -> Dict[str, List[str]]:
+        """Dépendances du registre, restreintes aux tables demandées"""
+        tables = list(tables)
+        deps = {}
+        for table in tables:
+            spec = get_table_spec(table) or {}
+            deps[table] = [d for d in spec.get("depends_on", ()) if d in tables and d != table]
+        return deps
+
+    def run(self, tables: Iterable[str], task: Callable[[str], None],
+            on_table_done: Optional[Callable[[str, float], None]] = None) -> Dict[str, float]:
+        """
+        Synchronise les tables et retourne la durée de chacune (secondes)
+        Une table en erreur ne bloque pas celles qui en dépendent :
+        elles travaillent simplement avec les données locales déjà présentes
+        """
+        tables = list(dict.fromkeys(tables))
+        deps = self.dependencies(tables)
+        remaining = set(tables)
+        done = set()
+        timings: Dict[str, float] = {}
+        errors: Dict[str, str] = {}
+
+        def timed(table):
+            start = time.perf_counter()
+            try:
+                task(table)
+            except Exception as e:
+                errors[table] = str(e)
+                print(f"❌ Erreur sync {table}: {e}")
+            return table, time.perf_counter() - start
+
+        cycle_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            running = {}
+            while remaining or running:
+                ready = [t for t in tables if t in remaining and all(d in done for d in deps[t])]
+                for table in ready:
+                    remaining.discard(table)
+                    running[pool.submit(timed, table)] = table
+
+                if not running:
+                    # Dépendance circulaire : on lance le reste tel quel
+                    deps = {t: [] for t in tables}
+                    continue
+
+                finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    del running[future]
+                    table, elapsed = future.result()
+                    timings[table] = elapsed
+                    done.add(table)
+                    if on_table_done:
+                        on_table_done(table, elapsed)
+
+        with self._lock:
+            self.timings = timings
+            self.errors = errors
+            self.last_duration = time.perf_counter() - cycle_start
+
+        return timings
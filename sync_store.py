@@ -0,0 +1,540 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Accès SQLite local pour la synchronisation Supabase
+Registre déclaratif des tables synchronisées + upsert groupé
+Watermarks de pull + journal des modifications locales (push)
+Pierres tombales pour propager les suppressions
+"""
+
+import json
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+# Registre déclaratif des tables synchronisées
+# "conflict" = contrainte UNIQUE locale (voir migrations.SCHEMA)
+# utilisée comme cible de ON CONFLICT(...) DO UPDATE
+# "track" = modifications locales journalisées dans sync_changes (push)
+# "scope" = expression SQL de l'établissement d'une ligne ({row} = NEW/OLD)
+# "depends_on" = tables à synchroniser avant celle-ci (ordonnanceur)
+SYNC_TABLES: Dict[str, Dict[str, Any]] = {
+    "User": {
+        "conflict": ("identifiant",), "track": True,
+        "scope": '{row}."etablissement"',
+    },
+    "Students": {
+        "conflict": ("matricule", "etablissement"), "track": True,
+        "scope": '{row}."etablissement"',
+        "depends_on": ("Class",),
+    },
+    "Matieres": {
+        "conflict": ("nom", "etablissement"), "track": True,
+        "scope": '{row}."etablissement"',
+    },
+    "Teacher": {
+        "conflict": ("ident",), "track": True,
+        "scope": '(SELECT etablissement FROM "User" WHERE identifiant = {row}."ident")',
+        "depends_on": ("User",),
+    },
+    "Notes": {
+        "conflict": ("matricule", "matiere", "classe"), "track": True,
+        # Pas de colonne etablissement : l'élève de cette classe (un même
+        # matricule peut exister dans deux établissements)
+        "scope": ('(SELECT etablissement FROM Students WHERE matricule = {row}."matricule"'
+                  ' AND classe = {row}."classe")'),
+        "depends_on": ("Students",),
+    },
+    "Class": {
+        "conflict": ("nom", "etablissement"), "track": True,
+        "scope": '{row}."etablissement"',
+    },
+    "Trimestre_moyen_save": {
+        "conflict": ("matricule", "annee_scolaire", "periode"), "track": False,
+    },
+}
+
+# Table distante des suppressions (pierres tombales), à créer dans Supabase :
+#   CREATE TABLE sync_tombstones (
+#       table_name TEXT NOT NULL,
+#       row_key TEXT NOT NULL,
+#       etablissement TEXT,
+#       deleted_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+#       PRIMARY KEY (table_name, row_key)
+#   );
+#   CREATE INDEX ON sync_tombstones (etablissement, deleted_at);
+# deleted_at est fixé par le serveur, aussi quand une pierre tombale est
+# réécrite (ON CONFLICT) : le watermark ne dépend pas de l'horloge des postes
+#   CREATE OR REPLACE FUNCTION set_server_deleted_at() RETURNS trigger AS $$
+#   BEGIN
+#       NEW.deleted_at := clock_timestamp();
+#       RETURN NEW;
+#   END $$ LANGUAGE plpgsql;
+#   CREATE TRIGGER trg_server_deleted_at BEFORE INSERT OR UPDATE ON sync_tombstones
+#       FOR EACH ROW EXECUTE FUNCTION set_server_deleted_at();
+TOMBSTONES_TABLE = "sync_tombstones"
+
+# updated_at distant fixé par le serveur (le watermark ne dépend pas de
+# l'horloge des postes : modifications hors ligne, horloges décalées).
+# À créer dans Supabase pour chaque table de SYNC_TABLES :
+#   CREATE OR REPLACE FUNCTION set_server_updated_at() RETURNS trigger AS $$
+#   BEGIN
+#       NEW.updated_at := clock_timestamp();
+#       RETURN NEW;
+#   END $$ LANGUAGE plpgsql;
+#   CREATE TRIGGER trg_server_updated_at BEFORE INSERT OR UPDATE ON "Notes"
+#       FOR EACH ROW EXECUTE FUNCTION set_server_updated_at();
+#   CREATE INDEX ON "Notes" (updated_at);
+
+# Recouvrement du pull incrémental : une transaction validée après une
+# autre peut porter un updated_at plus ancien. Les lignes déjà reçues sont
+# re-téléchargées (l'upsert est idempotent)
+PULL_OVERLAP = timedelta(minutes=2)
+
+# Nombre de lignes envoyées par executemany
+UPSERT_CHUNK_SIZE = 500
+
+
+def get_table_spec(table_name: str) -> Optional[Dict[str, Any]]:
+    """Retourne la définition d'une table synchronisée (ou None)"""
+    return SYNC_TABLES.get(table_name)
+
+
+def get_local_columns(conn: sqlite3.Connection, table_name: str) -> List[str]:
+    """Liste des colonnes de la table locale"""
+    cursor = conn.execute(f'PRAGMA table_info("{table_name}")')
+    return [col[1] for col in cursor.fetchall()]
+
+
+def build_upsert_sql(table_name: str, columns: List[str], conflict: Iterable[str]) -> str:
+    """Construit un INSERT ... ON CONFLICT(...) DO UPDATE pour une table"""
+    conflict = list(conflict)
+    col_list = ", ".join(f'"{c}"' for c in columns)
+    placeholders = ", ".join("?" for _ in columns)
+    updates = [c for c in columns if c not in conflict]
+
+    sql = f'INSERT INTO "{table_name}" ({col_list}) VALUES ({placeholders})'
+    conflict_list = ", ".join(f'"{c}"' for c in conflict)
+    if updates:
+        set_clause = ", ".join(f'"{c}" = excluded."{c}"' for c in updates)
+        sql += f" ON CONFLICT({conflict_list}) DO UPDATE SET {set_clause}"
+    else:
+        sql += f" ON CONFLICT({conflict_list}) DO NOTHING"
+    return sql
+
+
+def _iter_chunks(items: List[Any], size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def upsert_rows(conn: sqlite3.Connection, table_name: str,
+                rows: List[Dict[str, Any]],
+                chunk_size: int = UPSERT_CHUNK_SIZE) -> int:
+    """
+    Upsert groupé de lignes distantes dans une table locale
+    ✅ Une seule requête préparée, executemany par paquets
+    ⚠️ Ne fait pas de commit : l'appelant gère la transaction
+
+    Retourne le nombre de lignes traitées
+    """
+    if not rows:
+        return 0
+
+    spec = get_table_spec(table_name)
+    local_columns = set(get_local_columns(conn, table_name))
+    # Les colonnes distantes inconnues en local sont ignorées
+    columns = [c for c in rows[0].keys() if c in local_columns]
+
+    if not spec or not all(c in columns for c in spec["conflict"]):
+        return upsert_rows_legacy(conn, table_name, rows)
+
+    sql = build_upsert_sql(table_name, columns, spec["conflict"])
+
+    try:
+        for chunk in _iter_chunks(rows, chunk_size):
+            conn.executemany(sql, [tuple(row.get(c) for c in columns) for row in chunk])
+    except sqlite3.OperationalError as e:
+        # Ancienne base sans contrainte UNIQUE : ON CONFLICT impossible
+        if "ON CONFLICT" not in str(e):
+            raise
+        print(f"⚠️ {table_name}: contrainte UNIQUE absente, mode ligne à ligne")
+        return upsert_rows_legacy(conn, table_name, rows)
+
+    return len(rows)
+
+
+def upsert_rows_legacy(conn: sqlite3.Connection, table_name: str,
+                       rows: List[Dict[str, Any]]) -> int:
+    """
+    Ancien chemin ligne à ligne : SELECT 1 puis UPDATE ou INSERT
+    Conservé pour les tables sans contrainte UNIQUE (et pour comparaison)
+    """
+    spec = get_table_spec(table_name)
+    local_columns = set(get_local_columns(conn, table_name))
+    cursor = conn.cursor()
+
+    for row in rows:
+        row_data = {k: v for k, v in row.items() if k in local_columns}
+
+        if spec:
+            unique_check = " AND ".join(f'"{c}" = ?' for c in spec["conflict"])
+            unique_val = tuple(row_data.get(c) for c in spec["conflict"])
+
+            cursor.execute(f'SELECT 1 FROM "{table_name}" WHERE {unique_check}', unique_val)
+            if cursor.fetchone():
+                set_clause = ", ".join(f'"{k}" = ?' for k in row_data.keys())
+                values = list(row_data.values()) + list(unique_val)
+                cursor.execute(f'UPDATE "{table_name}" SET {set_clause} WHERE {unique_check}', values)
+                continue
+
+        columns = ", ".join(f'"{k}"' for k in row_data.keys())
+        placeholders = ", ".join("?" for _ in row_data)
+        cursor.execute(
+            f'INSERT INTO "{table_name}" ({columns}) VALUES ({placeholders})',
+            list(row_data.values())
+        )
+
+    return len(rows)
+
+
+# ============ WATERMARKS (sync_metadata) ============
+
+def get_watermark(conn: sqlite3.Connection, table_name: str, scope: str = "") -> Optional[str]:
+    """Retourne le dernier updated_at distant appliqué pour (table, scope)"""
+    row = conn.execute(
+        "SELECT watermark FROM sync_metadata WHERE table_name = ? AND scope = ?",
+        (table_name, scope or "")
+    ).fetchone()
+    return row[0] if row else None
+
+
+def set_watermark(conn: sqlite3.Connection, table_name: str, scope: str,
+                  watermark: Optional[str], status: str = "ok"):
+    """
+    Enregistre le watermark d'une table
+    ⚠️ À appeler dans la même transaction que l'upsert des lignes
+    """
+    conn.execute("""
+        INSERT INTO sync_metadata (table_name, scope, last_sync, watermark, sync_status)
+        VALUES (?, ?, CURRENT_TIMESTAMP, ?, ?)
+        ON CONFLICT(table_name, scope) DO UPDATE SET
+            last_sync = excluded.last_sync,
+            watermark = COALESCE(excluded.watermark, sync_metadata.watermark),
+            sync_status = excluded.sync_status
+    """, (table_name, scope or "", watermark, status))
+
+
+def pull_since(watermark: Optional[str]) -> Optional[str]:
+    """Borne basse du pull incrémental : watermark moins PULL_OVERLAP"""
+    if not watermark:
+        return None
+    try:
+        since = datetime.fromisoformat(watermark) - PULL_OVERLAP
+    except ValueError:
+        return watermark
+    return since.isoformat()
+
+
+def pull_order(table_name: str, order_col: str = "updated_at") -> List[str]:
+    """
+    Tri de la pagination du pull : order_col puis la clé de la table
+    Sans départage unique, deux pages peuvent se chevaucher ou sauter des lignes
+    """
+    if table_name == TOMBSTONES_TABLE:
+        return [order_col, "table_name", "row_key"]
+    spec = get_table_spec(table_name)
+    return [order_col] + [c for c in (spec["conflict"] if spec else ()) if c != order_col]
+
+
+def max_updated_at(rows: List[Dict[str, Any]]) -> Optional[str]:
+    """Plus grand updated_at (horloge distante) d'un lot de lignes"""
+    values = [row["updated_at"] for row in rows if row.get("updated_at")]
+    return max(values) if values else None
+
+
+def pending_keys(conn: sqlite3.Connection, table_name: str) -> set:
+    """Clés (tuples des colonnes de conflit) qui ont des modifications locales non envoyées"""
+    spec = get_table_spec(table_name)
+    if not spec or not spec.get("track"):
+        return set()
+    conflict = list(spec["conflict"])
+    cursor = conn.execute(
+        "SELECT DISTINCT row_key FROM sync_changes WHERE table_name = ?", (table_name,)
+    )
+    return {tuple(json.loads(row_key).get(c) for c in conflict) for (row_key,) in cursor.fetchall()}
+
+
+def store_remote_rows(conn: sqlite3.Connection, table_name: str, scope: str,
+                      rows: List[Dict[str, Any]], advance_watermark: bool = True):
+    """
+    Applique un lot de lignes distantes et avance le watermark
+    Une seule transaction : en cas d'erreur, ni lignes ni watermark
+    ✅ Les lignes modifiées localement et pas encore envoyées ne sont pas
+       écrasées : la modification locale part au prochain push
+    advance_watermark=False pour un lot partiel (quelques lignes ciblées) :
+    le prochain pull incrémental ne doit pas sauter les lignes plus anciennes
+    Retourne le nombre de lignes appliquées
+    """
+    pending = pending_keys(conn, table_name)
+    if pending:
+        conflict = get_table_spec(table_name)["conflict"]
+        applied = [row for row in rows if tuple(row.get(c) for c in conflict) not in pending]
+    else:
+        applied = rows
+
+    try:
+        with applying_remote(conn):
+            upsert_rows(conn, table_name, applied)
+        if advance_watermark:
+            set_watermark(conn, table_name, scope, max_updated_at(rows))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return len(applied)
+
+
+# ============ JOURNAL DES MODIFICATIONS LOCALES (sync_changes) ============
+
+def _key_json_sql(prefix: str, conflict: Iterable[str]) -> str:
+    """json_object(...) de la clé unique pour NEW/OLD dans un trigger"""
+    pairs = ", ".join(f"'{c}', {prefix}.\"{c}\"" for c in conflict)
+    return f"json_object({pairs})"
+
+
+def build_change_triggers(table_name: str, spec: Dict[str, Any]) -> List[str]:
+    """
+    Triggers INSERT/UPDATE/DELETE qui alimentent sync_changes
+    ✅ Inactifs pendant l'application d'un pull (sync_guard.applying = 1)
+    ✅ L'UPDATE rafraîchit aussi updated_at (sauf s'il a été fourni)
+    ✅ L'établissement de la ligne est noté (pierres tombales par établissement)
+    """
+    conflict = list(spec["conflict"])
+    new_key = _key_json_sql("NEW", conflict)
+    old_key = _key_json_sql("OLD", conflict)
+    scope = spec.get("scope", "NULL")
+    new_scope = scope.format(row="NEW")
+    old_scope = scope.format(row="OLD")
+    guard = "(SELECT applying FROM sync_guard WHERE id = 1) = 0"
+
+    return [
+        f"""
+        CREATE TRIGGER trg_sync_{table_name}_insert
+        AFTER INSERT ON "{table_name}"
+        WHEN {guard}
+        BEGIN
+            INSERT INTO sync_changes (table_name, row_key, operation, scope)
+            VALUES ('{table_name}', {new_key}, 'upsert', {new_scope});
+        END
+        """,
+        f"""
+        CREATE TRIGGER trg_sync_{table_name}_update
+        AFTER UPDATE ON "{table_name}"
+        WHEN {guard}
+        BEGIN
+            -- Clé modifiée : l'ancienne ligne doit disparaître côté distant
+            INSERT INTO sync_changes (table_name, row_key, operation, scope)
+            SELECT '{table_name}', {old_key}, 'delete', {old_scope}
+            WHERE {old_key} <> {new_key};
+            INSERT INTO sync_changes (table_name, row_key, operation, scope)
+            VALUES ('{table_name}', {new_key}, 'upsert', {new_scope});
+            UPDATE "{table_name}"
+            SET updated_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now')
+            WHERE rowid = NEW.rowid AND NEW.updated_at IS OLD.updated_at;
+        END
+        """,
+        f"""
+        CREATE TRIGGER trg_sync_{table_name}_delete
+        AFTER DELETE ON "{table_name}"
+        WHEN {guard}
+        BEGIN
+            INSERT INTO sync_changes (table_name, row_key, operation, scope)
+            VALUES ('{table_name}', {old_key}, 'delete', {old_scope});
+        END
+        """,
+    ]
+
+
+def install_change_tracking(conn: sqlite3.Connection):
+    """Crée sync_changes, sync_guard et les triggers des tables suivies"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sync_changes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            row_key TEXT NOT NULL,
+            operation TEXT NOT NULL,
+            scope TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    if "scope" not in get_local_columns(conn, "sync_changes"):
+        conn.execute("ALTER TABLE sync_changes ADD COLUMN scope TEXT")
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_sync_changes_table
+        ON sync_changes(table_name, id)
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sync_guard (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            applying INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    conn.execute("INSERT OR IGNORE INTO sync_guard (id, applying) VALUES (1, 0)")
+
+    # Triggers recréés à chaque démarrage : leur définition suit le registre
+    for table_name, spec in SYNC_TABLES.items():
+        for operation in ("insert", "update", "delete"):
+            conn.execute(f"DROP TRIGGER IF EXISTS trg_sync_{table_name}_{operation}")
+        if not spec.get("track"):
+            continue
+        for sql in build_change_triggers(table_name, spec):
+            conn.execute(sql)
+
+
+@contextmanager
+def applying_remote(conn: sqlite3.Connection):
+    """
+    Désactive la journalisation pendant l'application de données distantes
+    ⚠️ À utiliser dans la transaction du pull : les autres connexions
+    ne voient jamais applying = 1
+    """
+    conn.execute("UPDATE sync_guard SET applying = 1 WHERE id = 1")
+    try:
+        yield conn
+    finally:
+        conn.execute("UPDATE sync_guard SET applying = 0 WHERE id = 1")
+
+
+def get_pending_changes(conn: sqlite3.Connection, table_name: str) -> Dict[str, Tuple[str, List[int], Optional[str]]]:
+    """
+    Modifications en attente d'une table, regroupées par clé
+    Retourne {row_key: (dernière opération, [ids du journal], établissement)}
+    """
+    pending: Dict[str, Tuple[str, List[int], Optional[str]]] = {}
+    cursor = conn.execute(
+        "SELECT id, row_key, operation, scope FROM sync_changes WHERE table_name = ? ORDER BY id",
+        (table_name,)
+    )
+    for change_id, row_key, operation, scope in cursor.fetchall():
+        ids = pending[row_key][1] if row_key in pending else []
+        ids.append(change_id)
+        pending[row_key] = (operation, ids, scope)
+    return pending
+
+
+def load_rows_by_key(conn: sqlite3.Connection, table_name: str,
+                     row_keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """Lit l'état courant des lignes locales désignées par leur clé JSON"""
+    spec = get_table_spec(table_name)
+    conflict = list(spec["conflict"])
+    where = " AND ".join(f'"{c}" = ?' for c in conflict)
+    cursor = conn.execute(f'SELECT * FROM "{table_name}" LIMIT 0')
+    columns = [d[0] for d in cursor.description]
+
+    rows = {}
+    for row_key in row_keys:
+        key = json.loads(row_key)
+        found = conn.execute(
+            f'SELECT * FROM "{table_name}" WHERE {where}',
+            tuple(key.get(c) for c in conflict)
+        ).fetchone()
+        if found:
+            rows[row_key] = dict(zip(columns, found))
+    return rows
+
+
+def collect_pending_push(conn: sqlite3.Connection, table_name: str):
+    """
+    Prépare le push d'une table à partir du journal
+    Retourne (upserts, suppressions) :
+        upserts = [(ligne sans 'id', [ids du journal])]
+        suppressions = [(row_key, [ids du journal], établissement)]
+    """
+    pending = get_pending_changes(conn, table_name)
+    upsert_keys = [k for k, (op, _, _) in pending.items() if op == "upsert"]
+    local_rows = load_rows_by_key(conn, table_name, upsert_keys)
+
+    upsert_items = []
+    delete_items = []
+    for row_key, (operation, change_ids, scope) in pending.items():
+        row_dict = local_rows.get(row_key)
+
+        if operation == "delete" or row_dict is None:
+            # Ligne supprimée localement
+            delete_items.append((row_key, change_ids, scope))
+            continue
+
+        # ✅ Supprimer 'id' local avant d'envoyer à Supabase
+        row_dict = dict(row_dict)
+        row_dict.pop('id', None)
+        upsert_items.append((row_dict, change_ids))
+
+    return upsert_items, delete_items
+
+
+def acknowledge_changes(conn: sqlite3.Connection, change_ids: List[int]):
+    """Retire du journal les modifications confirmées par Supabase"""
+    for chunk in _iter_chunks(list(change_ids), UPSERT_CHUNK_SIZE):
+        placeholders = ", ".join("?" for _ in chunk)
+        conn.execute(f"DELETE FROM sync_changes WHERE id IN ({placeholders})", chunk)
+
+
+# ============ PIERRES TOMBALES (suppressions distantes) ============
+
+def apply_tombstones(conn: sqlite3.Connection, tombstones: List[Dict[str, Any]]) -> int:
+    """
+    Applique en local des suppressions venues de Supabase
+    ⚠️ À appeler dans applying_remote() : ne doit pas être re-journalisé
+    """
+    deleted = 0
+    for tombstone in tombstones:
+        spec = get_table_spec(tombstone.get("table_name"))
+        if not spec:
+            continue
+        conflict = list(spec["conflict"])
+        key = json.loads(tombstone["row_key"])
+        where = " AND ".join(f'"{c}" = ?' for c in conflict)
+        cursor = conn.execute(
+            f'DELETE FROM "{tombstone["table_name"]}" WHERE {where}',
+            tuple(key.get(c) for c in conflict)
+        )
+        deleted += cursor.rowcount
+    return deleted
+
+
+def build_tombstone_items(table_name: str, delete_items):
+    """
+    Pierres tombales à envoyer pour des suppressions du journal
+    Sans deleted_at : le serveur le fixe (trigger set_server_deleted_at)
+    """
+    return [
+        ({
+            "table_name": table_name,
+            "row_key": row_key,
+            "etablissement": scope,
+        }, change_ids)
+        for row_key, change_ids, scope in delete_items
+    ]
+
+
+def store_remote_tombstones(conn: sqlite3.Connection, scope: str,
+                            tombstones: List[Dict[str, Any]]) -> int:
+    """Applique des pierres tombales et avance leur watermark (une transaction)"""
+    try:
+        with applying_remote(conn):
+            deleted = apply_tombstones(conn, tombstones)
+        set_watermark(conn, TOMBSTONES_TABLE, scope, max_deleted_at(tombstones))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return deleted
+
+
+def max_deleted_at(tombstones: List[Dict[str, Any]]) -> Optional[str]:
+    """Plus grand deleted_at d'un lot de pierres tombales"""
+    values = [t["deleted_at"] for t in tombstones if t.get("deleted_at")]
+    return max(values) if values else None
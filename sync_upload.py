@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Envoi groupé vers Supabase (PostgREST)
+Upsert par paquets de lignes, requêtes simultanées bornées,
+bissection des paquets rejetés pour isoler les lignes fautives
+(hors ligne ou erreur serveur : l'envoi s'arrête, le journal est gardé)
+Suppressions par paquets de clés
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from postgrest.exceptions import APIError
+from postgrest.types import ReturnMethod
+
+from config import SYNC_UPLOAD_CHUNK_SIZE, SYNC_UPLOAD_WORKERS
+
+# Clés par requête de suppression (filtre in.(...) dans l'URL)
+DELETE_CHUNK_SIZE = 100
+
+# Codes d'erreur qui visent toute la requête, pas une ligne : PostgreSQL
+# 08 (connexion), 53 (ressources), 57 (arrêt, délai), 58 (système),
+# XX (interne) ; PostgREST PGRST0xx (base injoignable), PGRST3xx (jeton)
+REQUEST_ERROR_PREFIXES = ("08", "53", "57", "58", "XX", "PGRST0", "PGRST3")
+
+
+def is_duplicate_error(error: Exception) -> bool:
+    """Erreur de clé dupliquée PostgreSQL (23505)"""
+    message = str(error)
+    return 'duplicate key' in message.lower() or '23505' in message
+
+
+def is_row_rejection(error: Exception) -> bool:
+    """
+    Paquet refusé par PostgREST à cause de son contenu (réponse 4xx) :
+    la bissection peut isoler les lignes fautives. Une erreur de transport
+    (hors ligne, délai dépassé) ou de serveur (5xx) ne dépend pas des lignes
+    """
+    if not isinstance(error, APIError):
+        return False
+    code = error.code
+    if isinstance(code, int):
+        # Réponse non JSON : le code est le statut HTTP
+        return 400 <= code < 500
+    return bool(code) and not str(code).startswith(REQUEST_ERROR_PREFIXES)
+
+
+def delete_in_column(key_columns: List[str], items) -> str:
+    """
+    Colonne de la clé qui part en filtre in.(...) : celle qui a le plus de
+    valeurs distinctes (matricule, nom...). Les autres (etablissement,
+    classe, matiere) servent à regrouper les clés
+    """
+    return max(key_columns, key=lambda c: len({key.get(c) for key, _ in items}))
+
+
+def delete_batches(key_columns: List[str], items, chunk_size: int):
+    """
+    Regroupe des clés sur leurs colonnes de portée, puis découpe en paquets
+    Retourne [(valeurs des colonnes de portée, [(clé, ids du journal)])]
+    """
+    in_column = delete_in_column(key_columns, items)
+    scope_columns = [c for c in key_columns if c != in_column]
+    groups: Dict[tuple, List[Tuple[Dict[str, Any], List[int]]]] = {}
+    for key, change_ids in items:
+        scope = tuple(key.get(c) for c in scope_columns)
+        groups.setdefault(scope, []).append((key, change_ids))
+
+    # Les valeurs passent dans l'URL : paquets plus petits que pour l'upsert
+    size = max(1, min(chunk_size, DELETE_CHUNK_SIZE))
+    batches = []
+    for scope, group in groups.items():
+        for i in range(0, len(group), size):
+            batches.append((scope, group[i:i + size]))
+    return batches
+
+
+class UploadResult:
+    """Bilan d'un envoi : identifiants du journal confirmés et lignes en échec"""
+
+    def __init__(self):
+        self.acknowledged: List[int] = []
+        self.synced = 0
+        self.skipped = 0
+        self.failed: List[Tuple[Dict[str, Any], str]] = []
+        self.requests = 0
+        # Erreur de transport ou de serveur : envoi arrêté, reste dans le journal
+        self.interrupted: Optional[str] = None
+
+    def merge(self, other: "UploadResult"):
+        self.acknowledged.extend(other.acknowledged)
+        self.synced += other.synced
+        self.skipped += other.skipped
+        self.failed.extend(other.failed)
+        self.requests += other.requests
+        self.interrupted = self.interrupted or other.interrupted
+
+
+class ChunkedUploader:
+    """
+    Upsert par paquets vers une API PostgREST
+
+    Args:
+        client: Client Supabase (ou tout objet exposant .table(nom).upsert(...))
+        chunk_size: Nombre de lignes par requête
+        max_workers: Nombre de requêtes simultanées
+    """
+
+    def __init__(self, client, chunk_size: int = SYNC_UPLOAD_CHUNK_SIZE,
+                 max_workers: int = SYNC_UPLOAD_WORKERS):
+        self.client = client
+        self.chunk_size = max(1, chunk_size)
+        self.max_workers = max(1, max_workers)
+
+    def upsert(self, table_name: str, items: List[Tuple[Dict[str, Any], List[int]]],
+               on_conflict: str = "") -> UploadResult:
+        """
+        Envoie des lignes en upsert
+
+        Args:
+            table_name: Table distante
+            items: Liste de (ligne, ids du journal sync_changes associés)
+            on_conflict: Colonnes de la contrainte unique ("a,b")
+        """
+        result = UploadResult()
+        if not items:
+            return result
+
+        chunks = [items[i:i + self.chunk_size] for i in range(0, len(items), self.chunk_size)]
+
+        if len(chunks) == 1 or self.max_workers == 1:
+            for chunk in chunks:
+                result.merge(self._send_chunk(table_name, chunk, on_conflict))
+                if result.interrupted:
+                    break
+            return result
+
+        stop = threading.Event()
+
+        def send(chunk):
+            # Après une interruption, les paquets restants ne partent pas
+            if stop.is_set():
+                return UploadResult()
+            chunk_result = self._send_chunk(table_name, chunk, on_conflict)
+            if chunk_result.interrupted:
+                stop.set()
+            return chunk_result
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as pool:
+            for chunk_result in pool.map(send, chunks):
+                result.merge(chunk_result)
+
+        return result
+
+    def _send_chunk(self, table_name: str, chunk, on_conflict: str) -> UploadResult:
+        """
+        Envoie un paquet ; en cas de rejet de lignes, le coupe en deux et
+        recommence. Hors ligne ou erreur serveur : arrêt sans bissection
+        """
+        result = UploadResult()
+        result.requests += 1
+
+        try:
+            self.client.table(table_name).upsert(
+                [row for row, _ in chunk],
+                on_conflict=on_conflict,
+                returning=ReturnMethod.minimal,
+            ).execute()
+            result.synced += len(chunk)
+            for _, change_ids in chunk:
+                result.acknowledged.extend(change_ids)
+            return result
+
+        except Exception as e:
+            if not is_row_rejection(e):
+                print(f"📴 Envoi {table_name} interrompu: {e}")
+                result.interrupted = str(e)
+                return result
+
+            if len(chunk) > 1:
+                middle = len(chunk) // 2
+                result.merge(self._send_chunk(table_name, chunk[:middle], on_conflict))
+                if not result.interrupted:
+                    result.merge(self._send_chunk(table_name, chunk[middle:], on_conflict))
+                return result
+
+            row, change_ids = chunk[0]
+            if is_duplicate_error(e):
+                # Si c'est un doublon, ignorer et continuer
+                print(f"⚠️ Doublon ignoré dans {table_name}")
+                result.skipped += 1
+                result.acknowledged.extend(change_ids)
+            else:
+                print(f"❌ Erreur upsert {table_name}: {e}")
+                result.failed.append((row, str(e)))
+            return result
+
+    def delete_keys(self, table_name: str, key_columns: List[str],
+                    items: List[Tuple[Dict[str, Any], List[int]]]) -> UploadResult:
+        """
+        Supprime des lignes distantes par clé, par paquets
+        Les clés sont regroupées sur leurs colonnes de portée et la colonne
+        la plus variée part en filtre in.(...) : une requête pour tout un paquet
+
+        Args:
+            table_name: Table distante
+            key_columns: Colonnes de la contrainte unique
+            items: Liste de (clé {colonne: valeur}, ids du journal associés)
+        """
+        result = UploadResult()
+        if not items:
+            return result
+
+        in_column = delete_in_column(key_columns, items)
+        scope_columns = [c for c in key_columns if c != in_column]
+        batches = delete_batches(key_columns, items, self.chunk_size)
+        stop = threading.Event()
+
+        def send(batch):
+            scope, group = batch
+            batch_result = UploadResult()
+            if stop.is_set():
+                return batch_result
+            batch_result.requests += 1
+            try:
+                query = self.client.table(table_name).delete(returning=ReturnMethod.minimal)
+                for column, value in zip(scope_columns, scope):
+                    query = query.eq(column, value)
+                query.in_(in_column, [key.get(in_column) for key, _ in group]).execute()
+                batch_result.synced += len(group)
+                for _, change_ids in group:
+                    batch_result.acknowledged.extend(change_ids)
+            except Exception as e:
+                if is_row_rejection(e):
+                    print(f"❌ Erreur suppression {table_name}: {e}")
+                    batch_result.failed.extend((key, str(e)) for key, _ in group)
+                else:
+                    print(f"📴 Suppression {table_name} interrompue: {e}")
+                    batch_result.interrupted = str(e)
+                    stop.set()
+            return batch_result
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as pool:
+            for batch_result in pool.map(send, batches):
+                result.merge(batch_result)
+
+        return result
+